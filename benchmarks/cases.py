@@ -0,0 +1,77 @@
+"""
+Спільні сценарії для перевірки та бенчмарків екстракторів:
+фікстура + виклик методу парсера, що розбирає її HTML
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(ROOT, 'benchmarks', 'fixtures')
+EXPECTED_FILE = os.path.join(FIXTURES_DIR, 'expected.json')
+sys.path.insert(0, ROOT)
+
+from topovi_parser import TopoviParser  # noqa: E402
+from ascale_parser import AscaleParser  # noqa: E402
+from sapienstone_parser import SapienstoneParser  # noqa: E402
+from product_store import ProductStore  # noqa: E402
+
+# (назва, фікстура, виклик екстрактора)
+CASES = [
+    ('topovi.parse_product_list[small]', 'topovi_listing_small.html',
+     lambda parsers, html: parsers['topovi'].parse_product_list(html)),
+    ('topovi.parse_product_list[50 blocks]', 'topovi_listing_50.html',
+     lambda parsers, html: parsers['topovi'].parse_product_list(html)),
+    ('topovi.extract_product_detail', 'topovi_detail.html',
+     lambda parsers, html: parsers['topovi'].extract_product_detail(html, 'Керамограніт')),
+    ('ascale.extract_collections', 'ascale_collections.html',
+     lambda parsers, html: parsers['ascale'].extract_collections(html)),
+    ('ascale.extract_collection_products', 'ascale_collection.html',
+     lambda parsers, html: parsers['ascale'].extract_collection_products(html, 'Collection')),
+    ('ascale.extract_product_detail', 'ascale_detail.html',
+     lambda parsers, html: parsers['ascale'].extract_product_detail(html)),
+    ('sapienstone.extract_catalog_products', 'sapienstone_catalog.html',
+     lambda parsers, html: parsers['sapienstone'].extract_catalog_products(html)),
+    ('sapienstone.extract_product_detail', 'sapienstone_detail.html',
+     lambda parsers, html: parsers['sapienstone'].extract_product_detail(html)),
+]
+
+
+def create_parsers():
+    """
+    Парсери без браузера: результат, прогрес і сховище товарів (разом з чергою помилок) -
+    у тимчасовій теці, тож у робочу теку нічого не пишеться (метрики й журнал браузерів
+    записуються лише після parse_all / з browser_log)
+    """
+    tmp = tempfile.mkdtemp(prefix='extractors-')
+    store = ProductStore(os.path.join(tmp, 'products.sqlite'))
+    parsers = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for site, parser_class in (('topovi', TopoviParser), ('ascale', AscaleParser),
+                                   ('sapienstone', SapienstoneParser)):
+            parsers[site] = parser_class(output_file=os.path.join(tmp, f'{site}.xlsx'),
+                                         progress_file=os.path.join(tmp, f'{site}.json'),
+                                         store=store)
+    return parsers
+
+
+def load_fixture(name):
+    """Читає HTML фікстуру"""
+    with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def load_expected():
+    """Результати екстракторів базової версії парсерів (див. make_expected.py): {'commit', 'cases'}"""
+    with open(EXPECTED_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def run_quiet(extract, parsers, html):
+    """Викликає екстрактор, приглушуючи його print"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return extract(parsers, html)
@@ -0,0 +1,64 @@
+"""
+Перевірка екстракторів і вимір прискорення: обидва шляхи розбору - повний html.parser
+і швидкий (lxml + SoupStrainer) - мають давати ті самі результати, що й екстрактори
+базової версії парсерів (fixtures/expected.json, див. make_expected.py)
+Запуск: python benchmarks/check_extractors.py [повторів]
+"""
+
+import json
+import sys
+import time
+from cases import CASES, create_parsers, load_expected, load_fixture, run_quiet
+import html_parsing
+
+# Прискорення, менше за це, варто розглядати окремо: час іде не на розбір HTML
+MIN_SPEEDUP = 1.5
+
+
+def timed(extract, parsers, html, repeat):
+    """Результат екстрактора та середній час одного виклику, мс"""
+    result = run_quiet(extract, parsers, html)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run_quiet(extract, parsers, html)
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    parsers = create_parsers()
+    baseline = load_expected()
+    failures = 0
+    slow = []
+
+    print(f"Бекенд: {html_parsing.BACKEND}, очікувані результати - коміт {baseline['commit']}\n")
+    print(f"{'екстрактор':45} {'html.parser':>12} {'швидкий':>10} {'x':>6}")
+
+    for name, fixture, extract in CASES:
+        html = load_fixture(fixture)
+        expected = baseline['cases'].get(name)
+
+        html_parsing.FAST = False
+        legacy, legacy_ms = timed(extract, parsers, html, repeat)
+        html_parsing.FAST = True
+        fast, fast_ms = timed(extract, parsers, html, repeat)
+
+        # Порівняння у вигляді JSON, як збережено очікувані результати
+        ok = expected is not None and all(json.loads(json.dumps(result)) == expected for result in (legacy, fast))
+        if not ok:
+            failures += 1
+        speedup = legacy_ms / fast_ms
+        if speedup < MIN_SPEEDUP:
+            slow.append(f"{name} ({speedup:.1f}x)")
+        print(f"{'✅' if ok else '❌'} {name:43} {legacy_ms:10.1f}мс {fast_ms:8.1f}мс {speedup:5.1f}x")
+
+    if slow:
+        print(f"\n⚠️ Прискорення менше {MIN_SPEEDUP}x: {', '.join(slow)}")
+    if failures:
+        print(f"\n❌ Результати відрізняються від базової версії: {failures}")
+        sys.exit(1)
+    print("\n✅ Результати збігаються з базовою версією")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Перевірка спільної черги URL (UrlFrontier):
+кілька процесів одночасно беруть товари в оренду з однієї бази - жоден товар
+не видається двічі і всі видаються; прострочена оренда процесу, що впав, повертається в чергу
+Запуск: python benchmarks/check_frontier.py [процесів] [товарів]
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from url_frontier import UrlFrontier, LEASED  # noqa: E402
+
+SITE = 'check'
+
+
+def lease_all(path, results):
+    """Воркер: бере оренди порціями, доки черга не спорожніє, і завершує їх"""
+    frontier = UrlFrontier(path)
+    leased = []
+    while True:
+        batch = frontier.lease(SITE, limit=7)
+        if not batch:
+            break
+        leased += [url for url, _ in batch]
+        frontier.complete(SITE, [url for url, _ in batch])
+    frontier.close()
+    results.put(leased)
+
+
+def check_concurrent_leases(path, processes, products):
+    """Паралельні оренди без дублікатів і пропусків"""
+    frontier = UrlFrontier(path)
+    urls = [f'https://example.com/p/{index}' for index in range(products)]
+    frontier.add_many(SITE, [(url, {'product': {'url': url}, 'context': None}) for url in urls])
+    frontier.close()
+
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=lease_all, args=(path, results)) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    leased = [url for _ in workers for url in results.get(timeout=60)]
+    for worker in workers:
+        worker.join()
+
+    duplicates = len(leased) - len(set(leased))
+    missing = len(set(urls) - set(leased))
+    print(f"{'✅' if not duplicates and not missing else '❌'} {processes} процесів: видано {len(leased)} "
+          f"з {products}, дублікатів {duplicates}, пропущено {missing}")
+    return not duplicates and not missing
+
+
+def check_expired_lease(path):
+    """Оренда воркера, що впав, після терміну дістається іншому, а до терміну - ні"""
+    crashed = UrlFrontier(path, owner='crashed', lease_seconds=0.5)
+    crashed.add_many(SITE, [('https://example.com/expired', {'product': {}, 'context': None})])
+    first = crashed.lease(SITE, urls=['https://example.com/expired'])
+
+    survivor = UrlFrontier(path, owner='survivor')
+    early = survivor.lease(SITE, urls=['https://example.com/expired'])
+    time.sleep(0.6)
+    reclaimed = survivor.lease(SITE, urls=['https://example.com/expired'])
+    owner = survivor.conn.execute('SELECT lease_owner, state FROM frontier WHERE url = ?',
+                                  ('https://example.com/expired',)).fetchone()
+    crashed.close()
+    survivor.close()
+
+    ok = len(first) == 1 and not early and len(reclaimed) == 1 and owner == ('survivor', LEASED)
+    print(f"{'✅' if ok else '❌'} прострочена оренда: до терміну {len(early)}, після - {len(reclaimed)}, "
+          f"власник {owner[0]}")
+    return ok
+
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    products = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [
+            check_concurrent_leases(os.path.join(tmp, 'concurrent.sqlite'), processes, products),
+            check_expired_lease(os.path.join(tmp, 'expired.sqlite')),
+        ]
+
+    if not all(results):
+        print("\n❌ Черга видає товари неправильно")
+        sys.exit(1)
+    print("\n✅ Черга працює правильно")
+
+
+if __name__ == "__main__":
+    main()
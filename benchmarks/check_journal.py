@@ -0,0 +1,74 @@
+"""
+Перевірка журналу прогресу (ProgressJournal) після аварійного завершення:
+обірваний останній запис обрізається, нові записи не злипаються з ним,
+а знімок і журнал разом відновлюють усі оброблені URL
+Запуск: python benchmarks/check_journal.py
+"""
+
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from progress_journal import ProgressJournal  # noqa: E402
+
+CASES = [
+    # (назва, вміст журналу перед запуском, очікуваний вміст після truncate_torn_tail)
+    ('порожній журнал', b'', b''),
+    ('цілі записи', b'{"url": "a"}\n{"url": "b"}\n', b'{"url": "a"}\n{"url": "b"}\n'),
+    ('обірваний запис', b'{"url": "a"}\n{"url": "b', b'{"url": "a"}\n'),
+    ('обірваний єдиний запис', b'{"url": "a', b''),
+]
+
+
+def check_truncate(tmp):
+    """truncate_torn_tail на кожному з CASES"""
+    failures = 0
+    for name, before, expected in CASES:
+        journal = ProgressJournal(os.path.join(tmp, 'truncate.json'))
+        with open(journal.journal_file, 'wb') as f:
+            f.write(before)
+        journal.truncate_torn_tail()
+        with open(journal.journal_file, 'rb') as f:
+            actual = f.read()
+        status = '✅' if actual == expected else '❌'
+        if actual != expected:
+            failures += 1
+        print(f"{status} {name:25} {len(before):4} → {len(actual):4} байтів")
+    return failures == 0
+
+
+def check_recovery(tmp):
+    """Знімок + журнал з обірваним хвостом -> дописування -> повне відновлення"""
+    snapshot_file = os.path.join(tmp, 'recovery.json')
+    journal = ProgressJournal(snapshot_file, compact_every=2)
+    journal.load()
+    journal.append(['a', 'b'])  # стискається у знімок
+    journal.append(['c'])
+    with open(journal.journal_file, 'ab') as f:
+        f.write(b'{"url": "torn')
+
+    journal = ProgressJournal(snapshot_file, compact_every=100)
+    loaded = journal.load()
+    journal.append(['d'])
+    recovered = ProgressJournal(snapshot_file).load()
+
+    ok = loaded == {'a', 'b', 'c'} and recovered == {'a', 'b', 'c', 'd'}
+    print(f"{'✅' if ok else '❌'} відновлення після збою: {sorted(loaded)} → {sorted(recovered)}")
+    return ok
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [check_truncate(tmp), check_recovery(tmp)]
+
+    if not all(results):
+        print("\n❌ Журнал прогресу відновлюється неправильно")
+        sys.exit(1)
+    print("\n✅ Журнал прогресу відновлюється правильно")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Перевірка класифікації помилок політики повторів (retry_policy.classify):
+кожен клас помилки Selenium, requests та aiohttp потрапляє у свій клас повтору
+Запуск: python benchmarks/check_retry.py
+"""
+
+import asyncio
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import aiohttp  # noqa: E402
+import requests  # noqa: E402
+import urllib3  # noqa: E402
+from selenium.common.exceptions import (WebDriverException, TimeoutException, InvalidSessionIdException,  # noqa: E402
+                                        NoSuchWindowException, NoSuchElementException,
+                                        StaleElementReferenceException, JavascriptException)
+from retry_policy import classify, NAVIGATION, SESSION, HTTP_ERROR, FATAL  # noqa: E402
+
+
+def http_error(status):
+    """requests.HTTPError з відповіддю зі статусом status"""
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(response=response)
+
+
+def client_error(status):
+    """aiohttp.ClientResponseError зі статусом status"""
+    return aiohttp.ClientResponseError(None, (), status=status)
+
+
+CASES = [
+    # (назва, помилка, очікуваний клас)
+    ('InvalidSessionIdException', InvalidSessionIdException('invalid session id'), SESSION),
+    ('NoSuchWindowException', NoSuchWindowException('no such window'), SESSION),
+    ('TimeoutException', TimeoutException('page load'), NAVIGATION),
+    ('NoSuchElementException', NoSuchElementException('.title'), FATAL),
+    ('StaleElementReferenceException', StaleElementReferenceException('stale'), FATAL),
+    ('JavascriptException', JavascriptException('undefined'), FATAL),
+    ('WebDriverException[chrome not reachable]', WebDriverException('chrome not reachable'), SESSION),
+    ('WebDriverException[timed out]', WebDriverException('timed out receiving message'), NAVIGATION),
+    ('WebDriverException[net::ERR_]', WebDriverException('net::ERR_CONNECTION_REFUSED'), HTTP_ERROR),
+    ('WebDriverException[невідома]', WebDriverException('unknown error'), SESSION),
+    ('urllib3 MaxRetryError', urllib3.exceptions.MaxRetryError(None, '/session'), SESSION),
+    ('requests.HTTPError[503]', http_error(503), HTTP_ERROR),
+    ('requests.HTTPError[429]', http_error(429), HTTP_ERROR),
+    ('requests.HTTPError[404]', http_error(404), FATAL),
+    ('requests.HTTPError[без відповіді]', requests.HTTPError(), HTTP_ERROR),
+    ('requests.ConnectionError', requests.ConnectionError(), HTTP_ERROR),
+    ('requests.Timeout', requests.Timeout(), HTTP_ERROR),
+    ('aiohttp.ClientResponseError[500]', client_error(500), HTTP_ERROR),
+    ('aiohttp.ClientResponseError[429]', client_error(429), HTTP_ERROR),
+    ('aiohttp.ClientResponseError[403]', client_error(403), FATAL),
+    ('aiohttp.ClientConnectionError', aiohttp.ClientConnectionError(), HTTP_ERROR),
+    ('asyncio.TimeoutError', asyncio.TimeoutError(), HTTP_ERROR),
+    ('ValueError', ValueError('bad html'), FATAL),
+]
+
+
+def main():
+    failures = 0
+    for name, error, expected in CASES:
+        actual = classify(error)
+        status = '✅' if actual == expected else '❌'
+        if actual != expected:
+            failures += 1
+        print(f"{status} {name:45} {actual:12} (очікувано {expected})")
+
+    if failures:
+        print(f"\n❌ Неправильно класифіковано: {failures}")
+        sys.exit(1)
+    print("\n✅ Усі помилки класифіковано правильно")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+Наскрізний бенчмарк парсерів на локальному сервері-замінику (fake_sites.py)
+Повний parse_all (або parse_all_async) кожного парсера: товарів за хвилину,
+час за фазами (список, детальні сторінки, розбір HTML, запис у сховище, експорт)
+Сервер кожного сайту працює окремим процесом, щоб не ділити GIL з парсером
+Запуск:
+    python benchmarks/e2e.py --products 60 --latency 0.1 --error-rate 0.02
+    python benchmarks/e2e.py --sites topovi --mode async --save benchmarks/e2e.json
+"""
+
+from datetime import datetime
+import argparse
+import contextlib
+import subprocess
+import tempfile
+import threading
+import inspect
+import platform
+import time
+import json
+import sys
+import os
+import requests
+from cases import ROOT
+from run_benchmarks import git_commit
+from topovi_parser import TopoviParser
+from ascale_parser import AscaleParser
+from sapienstone_parser import SapienstoneParser
+
+BENCHMARKS_DIR = os.path.join(ROOT, 'benchmarks')
+
+# Сайт: (клас парсера, {метод: фаза})
+# Фази вкладені: розбір HTML входить і в список, і в детальні сторінки,
+# перевірка картинок - у запис у сховище;
+# детальні сторінки - сумарний час воркерів (разом з паузою між товарами).
+# У parse_all_async Ascale і Sapienstone список і детальні сторінки йдуть одним
+# crawl_async, тож для них окремо видно лише розбір, запис і експорт
+SITES = {
+    'topovi': (TopoviParser, {
+        'list_products': 'listing',
+        'fetch_product': 'detail',
+        'crawl_details_async': 'detail',
+        'extract_product_cards': 'parse',
+        'detail_fields_from_html': 'parse',
+    }),
+    'ascale': (AscaleParser, {
+        'get_collection_urls': 'listing',
+        'parse_collection_page': 'listing',
+        'fetch_product': 'detail',
+        'extract_collections': 'parse',
+        'extract_collection_products': 'parse',
+        'detail_fields_from_html': 'parse',
+    }),
+    'sapienstone': (SapienstoneParser, {
+        'parse_catalog_page': 'listing',
+        'fetch_product': 'detail',
+        'extract_catalog_products': 'parse',
+        'detail_fields_from_html': 'parse',
+    }),
+}
+
+# Фази, спільні для всіх парсерів (очікування картинок - лише з --images)
+COMMON_PHASES = {'finish_images': 'images'}
+
+WRITER_PHASES = {'flush': 'store', 'export': 'export'}
+
+PHASE_NAMES = {
+    'listing': 'список товарів',
+    'detail': 'детальні сторінки',
+    'parse': 'розбір HTML',
+    'store': 'запис у сховище',
+    'verify': 'перевірка картинок',
+    'images': 'докачування картинок',
+    'export': 'експорт у Excel',
+    'close': 'закриття',
+}
+
+# Режими завантаження: 'http' - без браузера, 'browser' - як у main() парсерів
+PROFILES = {
+    'http': {
+        'topovi': {'fetch_modes': {'detail': 'http'}, 'listing_mode': 'pages'},
+        'ascale': {'fetch_modes': {'collections': 'http', 'collection': 'http', 'detail': 'http'}},
+        'sapienstone': {'fetch_modes': {'catalog': 'http', 'detail': 'http'}},
+    },
+    'browser': {
+        'topovi': {},
+        'ascale': {'fetch_modes': {'collection': 'http'}},
+        'sapienstone': {'fetch_modes': {'detail': 'http'}},
+    },
+}
+
+
+class PhaseTimer:
+    """Сумарний час і кількість викликів методів за фазами (потокобезпечно)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.seconds = {}
+        self.calls = {}
+
+    def wrap(self, obj, name, phase):
+        """Замінює метод об'єкта обгорткою, що рахує його час у фазі phase"""
+        method = getattr(obj, name)
+
+        if inspect.iscoroutinefunction(method):
+            async def timed_async(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await method(*args, **kwargs)
+                finally:
+                    self.add(phase, time.perf_counter() - started)
+
+            setattr(obj, name, timed_async)
+            return
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.add(phase, time.perf_counter() - started)
+
+        setattr(obj, name, timed)
+
+    def add(self, phase, seconds):
+        """Додає час одного виклику"""
+        with self.lock:
+            self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+            self.calls[phase] = self.calls.get(phase, 0) + 1
+
+    def result(self):
+        """Фази у порядку PHASE_NAMES: {фаза: {'seconds', 'calls'}}"""
+        return {phase: {'seconds': round(self.seconds[phase], 3), 'calls': self.calls[phase]}
+                for phase in PHASE_NAMES if phase in self.seconds}
+
+
+@contextlib.contextmanager
+def fake_site(site, args):
+    """Запускає fake_sites.py окремим процесом і повертає (адреса входу, функція статистики)"""
+    command = [sys.executable, '-u', os.path.join(BENCHMARKS_DIR, 'fake_sites.py'), site,
+               '--products', str(args.products), '--latency', str(args.latency),
+               '--jitter', str(args.jitter), '--error-rate', str(args.error_rate)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    try:
+        entry_url = process.stdout.readline().strip()
+        if not entry_url:
+            raise RuntimeError(f"Сервер {site} не запустився")
+        base_url = entry_url[:entry_url.index('/', len('http://'))]
+        yield entry_url, lambda: requests.get(base_url + '/__stats', timeout=5).json()
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def run_site(site, args, workdir):
+    """Повний парсинг одного сайту, повертає результат для JSON"""
+    parser_class, phases = SITES[site]
+    timer = PhaseTimer()
+    log_file = os.path.join(workdir, f'{site}.log')
+
+    with fake_site(site, args) as (entry_url, server_stats), open(log_file, 'w', encoding='utf-8') as log:
+        quiet = contextlib.ExitStack()
+        if not args.verbose:
+            quiet.enter_context(contextlib.redirect_stdout(log))
+            quiet.enter_context(contextlib.redirect_stderr(log))
+
+        with quiet:
+            parser = parser_class(workers=args.workers, rate_limit=args.rate_limit,
+                                  http_concurrency=args.http_concurrency,
+                                  images_dir='images' if args.images else None,
+                                  verify_images=args.verify_images, retry_backoff=args.retry_backoff,
+                                  **PROFILES[args.profile][site])
+
+            for name, phase in dict(phases, **COMMON_PHASES).items():
+                timer.wrap(parser, name, phase)
+            for name, phase in WRITER_PHASES.items():
+                timer.wrap(parser.writer, name, phase)
+            if parser.image_probe is not None:
+                timer.wrap(parser.image_probe, 'verify_rows', 'verify')
+
+            target = {'Керамограніт': entry_url} if site == 'topovi' else entry_url
+            run = parser.parse_all_async if args.mode == 'async' else parser.parse_all
+
+            started = time.perf_counter()
+            try:
+                run(target)
+            finally:
+                wall = time.perf_counter() - started
+                closing = time.perf_counter()
+                products = parser.writer.store.count(site)
+                _, dead = parser.writer.store.failure_counts(site)
+                parser.close()
+                timer.add('close', time.perf_counter() - closing)
+
+        stats = server_stats()
+
+    return {
+        'products': products,
+        'dead': dead,
+        'seconds': round(wall, 3),
+        'products_per_min': round(products / wall * 60, 1) if wall else 0.0,
+        'phases': timer.result(),
+        'server': stats,
+        'log': log_file,
+    }
+
+
+def print_site(site, result):
+    """Друкує результат сайту"""
+    server = result['server']
+    print(f"\n🌐 {site}: {result['products']} товарів за {result['seconds']:.1f} с "
+          f"→ {result['products_per_min']:.0f} товарів/хв")
+    if result.get('dead'):
+        print(f"   ☠️ остаточно невдалих товарів: {result['dead']}")
+    print(f"   сервер: {server['requests']} запитів, {server['errors']} помилок 503, "
+          f"{server['not_found']} 404, {server['bytes'] / 1024 / 1024:.1f} МБ")
+    for phase, stats in result['phases'].items():
+        share = stats['seconds'] / result['seconds'] if result['seconds'] else 0.0
+        print(f"   {PHASE_NAMES[phase]:20} {stats['seconds']:8.2f} с {stats['calls']:6} викликів {share:7.0%}")
+
+
+def compare(results, baseline, threshold):
+    """Друкує зміну товарів/хв відносно базового результату, повертає кількість регресій"""
+    print(f"\nПорівняння з {baseline.get('commit') or 'базовим'} ({baseline.get('created_at')}):")
+    regressions = 0
+    for site, result in results['sites'].items():
+        base = baseline['sites'].get(site)
+        if not base or not base['products_per_min']:
+            continue
+        delta = result['products_per_min'] / base['products_per_min'] - 1
+        regressed = delta < -threshold
+        if regressed:
+            regressions += 1
+        print(f"{'❌' if regressed else '  '} {site:15} {base['products_per_min']:8.0f} → "
+              f"{result['products_per_min']:8.0f} товарів/хв ({delta:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Наскрізний бенчмарк парсерів на локальному сервері")
+    parser.add_argument('--sites', nargs='+', choices=sorted(SITES), default=list(SITES))
+    parser.add_argument('--mode', choices=['pool', 'async'], default='pool',
+                        help="pool - parse_all з пулом воркерів, async - parse_all_async")
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='http',
+                        help="http - без браузера, browser - режими як у main() (потрібен Chrome)")
+    parser.add_argument('--products', type=int, default=36, help="товарів на кожному сайті")
+    parser.add_argument('--latency', type=float, default=0.05, help="затримка відповіді сервера, с")
+    parser.add_argument('--jitter', type=float, default=0.0, help="випадкова надбавка до затримки, с")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="частка відповідей 503")
+    parser.add_argument('--retry-backoff', type=float, default=1.0,
+                        help="пауза перед повтором товарів з черги помилок, с")
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--rate-limit', type=float, default=2.0, help="запитів/с asyncio рушія")
+    parser.add_argument('--http-concurrency', type=int, default=4)
+    parser.add_argument('--images', action='store_true', help="завантажувати картинки товарів у images/")
+    parser.add_argument('--verify-images', action='store_true',
+                        help="перевіряти URL картинок Range запитами перед записом")
+    parser.add_argument('--verbose', action='store_true', help="не приховувати вивід парсерів")
+    parser.add_argument('--save', metavar='FILE', help="зберегти результат у JSON")
+    parser.add_argument('--compare', metavar='FILE', help="порівняти з базовим JSON")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="допустиме падіння товарів/хв (частка), інакше код виходу 1")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='e2e-')
+    print(f"📁 Робоча тека (результати, журнали парсерів): {workdir}")
+
+    results = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'settings': {key: value for key, value in vars(args).items()
+                     if key not in ('sites', 'verbose', 'save', 'compare', 'threshold')},
+        'sites': {},
+    }
+
+    # Файли парсерів (Excel, прогрес, сховище, журнали браузера) - у робочій теці
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        for site in args.sites:
+            results['sites'][site] = run_site(site, args, workdir)
+            print_site(site, results['sites'][site])
+    finally:
+        os.chdir(cwd)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Результат збережено: {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Локальний сервер-замінник topovi.com.ua, ascale.es і sapienstone.com
+Сторінки будуються генераторами фікстур (make_fixtures.py) з адресою сервера в посиланнях:
+пагінація 'Load more' у Topovi (?page=N, 404 за останньою сторінкою), lazy-картинки,
+затримка відповіді та випадкові помилки 503 для перевірки повторів;
+картинки - невеликі JPEG з розміром у пікселях за текою (/320/, /540/, /1280/),
+збільшених (1280) версій картинок без посилання на сторінці Topovi немає (404); Range запити
+Статистика запитів: GET /__stats
+Запуск: python benchmarks/fake_sites.py topovi --port 8701 --products 120 --latency 0.2 --error-rate 0.05
+"""
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import argparse
+import hashlib
+import posixpath
+import struct
+import threading
+import random
+import time
+import json
+import re
+import make_fixtures as fixtures
+
+# Сторінка, з якої починається парсинг кожного сайту
+ENTRY_PATHS = {
+    'topovi': '/stones/brands=keralini',
+    'ascale': '/en/collections/',
+    'sapienstone': '/collections',
+}
+
+# Розмір картинки (ширина, висота) за текою розміру в шляху
+IMAGE_SIZES = {'320': (320, 213), '540': (540, 360), '1280': (1280, 853)}
+DEFAULT_IMAGE_SIZE = (800, 600)
+
+LOAD_MORE_BUTTON = '<button class="btn load-more">Показати ще</button>'
+
+# Кнопка 'Load more' для браузера: наступна сторінка дописується в список
+LOAD_MORE_JS = """<script>
+document.querySelector('.btn.load-more').addEventListener('click', function () {
+    const button = this;
+    const next = Number(button.dataset.page || 1) + 1;
+    const url = new URL(location.href);
+    url.searchParams.set('page', next);
+    fetch(url).then(response => response.ok ? response.text() : null).then(html => {
+        if (!html) { button.remove(); return; }
+        const doc = new DOMParser().parseFromString(html, 'text/html');
+        const list = document.querySelector('.stones_list');
+        doc.querySelectorAll('.stone_card').forEach(card => list.appendChild(card));
+        button.dataset.page = next;
+        if (!doc.querySelector('.btn.load-more')) button.remove();
+    });
+});
+</script>"""
+
+
+def fake_jpeg(path):
+    """Невеликий JPEG: заголовки JFIF і SOF0 з розміром за текою, вміст - за назвою файлу"""
+    size_dir = posixpath.basename(posixpath.dirname(path))
+    width, height = IMAGE_SIZES.get(size_dir, DEFAULT_IMAGE_SIZE)
+    seed = hashlib.sha1(posixpath.basename(path).encode('utf-8')).digest()
+    return (b'\xff\xd8'
+            + b'\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00'
+            + b'\xff\xc0\x00\x11\x08' + struct.pack('>HH', height, width)
+            + b'\x03\x01\x22\x00\x02\x11\x01\x03\x11\x01'
+            + seed * 64 + b'\xff\xd9')
+
+
+class FakeSite:
+    def __init__(self, site, products=36, per_page=12, latency=0.0, jitter=0.0, error_rate=0.0, seed=0):
+        """
+        site - 'topovi', 'ascale' або 'sapienstone'
+        products - кількість товарів на сайті
+        per_page - товарів на сторінці списку Topovi / у колекції Ascale
+        latency / jitter - затримка кожної відповіді, с (jitter - випадкова надбавка до неї)
+        error_rate - частка запитів, на які сервер відповідає 503
+        """
+        if site not in ENTRY_PATHS:
+            raise ValueError(f"Невідомий сайт '{site}'")
+
+        self.site = site
+        self.products = products
+        self.per_page = per_page
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.pages = {}
+        self.stats = {'requests': 0, 'errors': 0, 'not_found': 0, 'bytes': 0}
+
+    def pages_count(self):
+        """Кількість сторінок списку Topovi або колекцій Ascale"""
+        return -(-self.products // self.per_page)
+
+    def render(self, path, query, base):
+        """HTML сторінки (bytes для картинки) або None, якщо такої сторінки немає"""
+        rng = random.Random(f'{path}?{query}')
+
+        if posixpath.splitext(path)[1] in ('.jpg', '.jpeg', '.png'):
+            # На детальній сторінці 1280 є лише у парних картинок галереї, решта вгадується парсером
+            if self.site == 'topovi' and re.search(r'/1280/g\d*[13579]\.jpg$', path):
+                return None
+            return fake_jpeg(path)
+
+        if self.site == 'topovi':
+            match = re.search(r'/colors/stone-(\d+)$', path)
+            if match:
+                return fixtures.topovi_detail(rng, base=base) if int(match.group(1)) < self.products else None
+            if path == ENTRY_PATHS['topovi']:
+                page = int(parse_qs(query).get('page', ['1'])[0])
+                if not 1 <= page <= self.pages_count():
+                    return None
+                start = (page - 1) * self.per_page
+                html = fixtures.topovi_listing(1, rng, per_block=min(self.per_page, self.products - start),
+                                               start=start, base=base)
+                if page == self.pages_count():
+                    return html.replace(LOAD_MORE_BUTTON, '')
+                return html.replace('</body>', LOAD_MORE_JS + '\n</body>')
+
+        elif self.site == 'ascale':
+            if path == ENTRY_PATHS['ascale']:
+                return fixtures.ascale_collections(rng, count=self.pages_count(), base=base)
+            match = re.fullmatch(r'/en/collection/collection-(\d+)/', path)
+            if match and int(match.group(1)) < self.pages_count():
+                start = int(match.group(1)) * self.per_page
+                return fixtures.ascale_collection(rng, count=min(self.per_page, self.products - start),
+                                                  start=start, base=base)
+            match = re.fullmatch(r'/en/product/product-(\d+)/', path)
+            if match and int(match.group(1)) < self.products:
+                return fixtures.ascale_detail(rng, base=base)
+
+        elif self.site == 'sapienstone':
+            if path == ENTRY_PATHS['sapienstone']:
+                return fixtures.sapienstone_catalog(rng, count=self.products)
+            match = re.fullmatch(r'/en/collections/stone-(\d+)', path)
+            if match and int(match.group(1)) < self.products:
+                return fixtures.sapienstone_detail(rng)
+
+        return None
+
+    def page(self, path, query, base):
+        """HTML сторінки з кешу (генерація не повинна входити в час відповіді)"""
+        key = (path, query)
+        with self.lock:
+            if key not in self.pages:
+                self.pages[key] = self.render(path, query, base)
+            return self.pages[key]
+
+    def respond(self, path, query, base):
+        """(HTTP статус, HTML або bytes картинки) з урахуванням затримки та штучних помилок"""
+        with self.lock:
+            delay = self.latency + self.rng.uniform(0, self.jitter)
+            failed = self.rng.random() < self.error_rate
+            self.stats['requests'] += 1
+        time.sleep(delay)
+
+        if failed:
+            with self.lock:
+                self.stats['errors'] += 1
+            return 503, '<html><body><h1>503 Service Unavailable</h1></body></html>'
+
+        body = self.page(path, query, base)
+        with self.lock:
+            if body is None:
+                self.stats['not_found'] += 1
+            else:
+                self.stats['bytes'] += len(body) if isinstance(body, bytes) else len(body.encode('utf-8'))
+        if body is None:
+            return 404, '<html><body><h1>404 Not Found</h1></body></html>'
+        return 200, body
+
+
+class FakeSiteServer:
+    def __init__(self, site, host='127.0.0.1', port=0, **options):
+        """Багатопотоковий HTTP сервер для FakeSite (port=0 - будь-який вільний порт)"""
+        self.site = FakeSite(site, **options)
+        fake_site = self.site
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                parts = urlparse(self.path)
+                if parts.path == '/__stats':
+                    with fake_site.lock:
+                        status, body = 200, json.dumps(fake_site.stats)
+                    content_type = 'application/json'
+                else:
+                    base = f'http://{self.headers.get("Host", self.server.server_address[0])}'
+                    status, body = fake_site.respond(parts.path, parts.query, base)
+                    content_type = 'image/jpeg' if isinstance(body, bytes) else 'text/html; charset=utf-8'
+
+                payload = body if isinstance(body, bytes) else body.encode('utf-8')
+                content_range = None
+                match = re.fullmatch(r'bytes=(\d+)-(\d*)', self.headers.get('Range', ''))
+                if status == 200 and isinstance(body, bytes) and match:
+                    first = int(match.group(1))
+                    last = min(int(match.group(2) or len(payload) - 1), len(payload) - 1)
+                    content_range = f'bytes {first}-{last}/{len(payload)}'
+                    status, payload = 206, payload[first:last + 1]
+
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                if content_range:
+                    self.send_header('Content-Range', content_range)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        """Адреса сервера"""
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def entry_url(self):
+        """Сторінка, з якої починається парсинг сайту"""
+        return self.url + ENTRY_PATHS[self.site.site]
+
+    def start(self):
+        """Запускає сервер у фоновому потоці"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Зупиняє сервер"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальний сервер-замінник сайтів для бенчмарків")
+    parser.add_argument('site', choices=sorted(ENTRY_PATHS))
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--products', type=int, default=36)
+    parser.add_argument('--per-page', type=int, default=12)
+    parser.add_argument('--latency', type=float, default=0.0, help="затримка відповіді, с")
+    parser.add_argument('--jitter', type=float, default=0.0, help="випадкова надбавка до затримки, с")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="частка відповідей 503")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeSiteServer(args.site, host=args.host, port=args.port, products=args.products,
+                            per_page=args.per_page, latency=args.latency, jitter=args.jitter,
+                            error_rate=args.error_rate, seed=args.seed)
+    # Перший рядок виводу - адреса сторінки входу (її читає e2e.py)
+    print(server.entry_url, flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
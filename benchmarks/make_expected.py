@@ -0,0 +1,117 @@
+"""
+Генератор очікуваних результатів екстракторів (fixtures/expected.json)
+Екстрактори базової версії парсерів (за замовчуванням - перший коміт репозиторію)
+завантажуються з git і розбирають фікстури через фальшивий драйвер, тож
+check_extractors.py порівнює поточний код з оригінальним, а не сам із собою
+Запуск: python benchmarks/make_expected.py [коміт]
+"""
+
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import types
+from bs4 import BeautifulSoup
+from cases import CASES, EXPECTED_FILE, ROOT, load_fixture
+
+# URL сторінок для базових методів (впливають лише на повідомлення)
+DETAIL_URL = 'https://example.com/product'
+LISTING_URL = 'https://example.com/listing'
+
+# Сценарій -> (модуль, виклик методу базового парсера)
+BASELINE_CALLS = {
+    'topovi.parse_product_list[small]': ('topovi_parser', lambda parser: parser.parse_product_list(
+        parser.driver.page_source)),
+    'topovi.parse_product_list[50 blocks]': ('topovi_parser', lambda parser: parser.parse_product_list(
+        parser.driver.page_source)),
+    'topovi.extract_product_detail': ('topovi_parser', lambda parser: parser.parse_product_detail(
+        DETAIL_URL, 'Керамограніт')),
+    'ascale.extract_collections': ('ascale_parser', lambda parser: parser.get_collection_urls(LISTING_URL)),
+    'ascale.extract_collection_products': ('ascale_parser', lambda parser: parser.parse_collection_page(
+        LISTING_URL, 'Collection')),
+    'ascale.extract_product_detail': ('ascale_parser', lambda parser: parser.parse_product_detail(DETAIL_URL)),
+    'sapienstone.extract_catalog_products': ('sapienstone_parser', lambda parser: parser.parse_catalog_page(
+        LISTING_URL)),
+    'sapienstone.extract_product_detail': ('sapienstone_parser', lambda parser: parser.parse_product_detail(
+        DETAIL_URL)),
+}
+
+# Атрибути, які базові парсери задають у __init__ (без запуску браузера)
+BASELINE_ATTRIBUTES = {
+    'sapienstone_parser': {'base_url': 'https://www.sapienstone.com'},
+}
+
+
+class FakeDriver:
+    """
+    Драйвер, що на будь-яку сторінку віддає HTML фікстури; прокрутка, як у браузері,
+    запускає lazy-load: src картинок замінюється на data-lazy-src з класом lazyloaded
+    (фікстури - HTML з сервера, який базові парсери бачили лише після прокрутки)
+    """
+
+    def __init__(self, html):
+        self.page_source = html
+
+    def get(self, url):
+        pass
+
+    def execute_script(self, script, *args):
+        if 'scrollTo' in script:
+            soup = BeautifulSoup(self.page_source, 'html.parser')
+            for img in soup.find_all('img', attrs={'data-lazy-src': True}):
+                img['src'] = img['data-lazy-src']
+                img['class'] = img.get('class', []) + ['lazyloaded']
+            self.page_source = str(soup)
+        return None
+
+
+def root_commit():
+    """Перший коміт репозиторію"""
+    return subprocess.run(['git', 'rev-list', '--max-parents=0', 'HEAD'], cwd=ROOT, capture_output=True,
+                          text=True, check=True).stdout.split()[0]
+
+
+def load_baseline(module_name, commit):
+    """Модуль парсера з коміту commit; паузи time.sleep вимкнені"""
+    source = subprocess.run(['git', 'show', f'{commit}:{module_name}.py'], cwd=ROOT, capture_output=True,
+                            check=True).stdout.decode('utf-8')
+    module = types.ModuleType(f'baseline_{module_name}')
+    exec(compile(source, f'{commit}:{module_name}.py', 'exec'), module.__dict__)
+    module.time = types.SimpleNamespace(sleep=lambda seconds: None)
+    return module
+
+
+def baseline_parser(module):
+    """Екземпляр базового парсера без __init__ (браузер і прогрес не потрібні)"""
+    parser_class = next(value for name, value in vars(module).items()
+                        if name.endswith('Parser') and isinstance(value, type))
+    parser = parser_class.__new__(parser_class)
+    parser.processed_urls = set()
+    for name, value in BASELINE_ATTRIBUTES.get(module.__name__[len('baseline_'):], {}).items():
+        setattr(parser, name, value)
+    return parser
+
+
+def main():
+    commit = sys.argv[1] if len(sys.argv) > 1 else root_commit()
+    modules = {}
+    expected = {}
+
+    for name, fixture, _ in CASES:
+        module_name, call = BASELINE_CALLS[name]
+        if module_name not in modules:
+            modules[module_name] = load_baseline(module_name, commit)
+        parser = baseline_parser(modules[module_name])
+        parser.driver = FakeDriver(load_fixture(fixture))
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected[name] = call(parser)
+        print(f"✅ {name}")
+
+    with open(EXPECTED_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'commit': commit[:7], 'cases': expected}, f, ensure_ascii=False, indent=1)
+    print(f"\n💾 {EXPECTED_FILE} (коміт {commit[:7]})")
+
+
+if __name__ == "__main__":
+    main()
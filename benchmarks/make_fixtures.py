@@ -0,0 +1,196 @@
+"""
+Генератор HTML фікстур для перевірки та бенчмарків екстракторів
+Сторінки повторюють структуру topovi.com.ua, ascale.es і sapienstone.com
+разом з "шумом" (head, меню, скрипти, футер), як у реальних сторінках
+Запуск: python benchmarks/make_fixtures.py
+"""
+
+import os
+import random
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Адреси сайтів у посиланнях (fake_sites.py підставляє адресу локального сервера)
+TOPOVI_URL = 'https://topovi.com.ua'
+ASCALE_URL = 'https://www.ascale.es'
+
+SURFACES = ['Polished', 'Matt', 'Lappato', 'Feel', 'Natural', 'Velvet', 'Structured', 'Cashmere', 'Silk']
+
+
+def page(title, body, rng):
+    """Обгортка сторінки з важким head, меню та футером"""
+    links = ''.join(
+        f'<link rel="stylesheet" href="/wp-content/cache/min/1/style-{i}.css?ver={rng.randint(1, 999)}" media="all">\n'
+        for i in range(30)
+    )
+    script_data = ','.join(f'{{"id":{i},"html":"<div class=\\"stone_card\\">{i}</div>"}}' for i in range(200))
+    menu = ''.join(
+        f'<li class="menu-item menu-item-{i}"><a href="/menu/{i}/">Пункт меню {i} &amp; ще</a>'
+        f'<ul class="sub-menu">' + ''.join(f'<li><a href="/menu/{i}/{j}/">Підпункт {j}</a></li>' for j in range(8)) +
+        '</ul></li>\n'
+        for i in range(25)
+    )
+    footer = ''.join(f'<div class="footer-col"><h4>Колонка {i}</h4><p>Текст футера {i} &copy; 2024</p></div>'
+                     for i in range(12))
+    return f"""<!DOCTYPE html>
+<html lang="uk">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+{links}
+<style>.stone_card{{display:block}} .swiper-slide{{width:100%}}</style>
+<script type="application/json" id="state">[{script_data}]</script>
+<script>window.dataLayer = window.dataLayer || []; if (a < b && c > d) {{ document.write('<div class="x">'); }}</script>
+</head>
+<body class="page-template">
+<!-- header -->
+<header class="site-header"><nav><ul class="menu">{menu}</ul></nav>
+<svg width="24" height="24" viewBox="0 0 24 24"><path d="M0 0h24v24H0z" fill="none"/></svg></header>
+<main>
+{body}
+</main>
+<footer class="site-footer">{footer}</footer>
+<script src="/wp-includes/js/jquery/jquery.min.js"></script>
+</body>
+</html>
+"""
+
+
+def topovi_card(i, rng, base=TOPOVI_URL):
+    slug = f'stone-{i}'
+    return f"""<div class="stone_card col-md-3" data-id="{i}">
+  <a class="info" href="{base}/stones/keramicheskie-shirokoformatnye-plity/keralini/colors/{slug}">
+    <img class="stone_cover lazy" src="{base}/storage/stones/320/{slug}.jpg" alt="{slug}">
+  </a>
+  <div class="stone_text">
+    <p class="stone_name" title="Stone {i} &quot;Ultra&quot;">Stone {i}</p>
+    <p class="stone_company">Keralini</p>
+  </div>
+  <div class="additional-info">
+    <div class="additional-info__title">Поверхня: <span> {rng.choice(SURFACES)} </span></div>
+    <div class="additional-info__size"><span>3200x1600</span></div>
+  </div>
+</div>
+"""
+
+
+def topovi_listing(blocks, rng, per_block=12, start=0, base=TOPOVI_URL):
+    cards = ''.join(topovi_card(i, rng, base) for i in range(start, start + blocks * per_block))
+    body = f"""<section class="catalog"><h1>Керамограніт Keralini</h1>
+<div class="stones_list row">{cards}</div>
+<button class="btn load-more">Показати ще</button></section>"""
+    return page('Topovi - каталог', body, rng)
+
+
+def topovi_detail(rng, base=TOPOVI_URL):
+    images = ''.join(
+        '<div class="item"><img data-fancybox="gallery" '
+        + (f'href="{base}/storage/stones/1280/g{i}.jpg" ' if i % 2 == 0 else '')
+        + f'src="{base}/storage/stones/{rng.choice(["320", "540"])}/g{i}.jpg"></div>'
+        for i in range(7)
+    )
+    body = f"""<div class="product"><div class="breadcrumbs"><a href="/">Головна</a> / <span>Камінь</span></div>
+<h1> KRL-{rng.randint(1000, 9999)} Aurora Black </h1>
+<div class="gallery"><div class="gellery_for slider">{images}</div>
+<div class="gellery_nav">{images}</div></div>
+<div class="description"><p>Опис товару з <b>розміткою</b> та <i>стилями</i>.</p></div></div>"""
+    return page('Topovi - товар', body, rng)
+
+
+def ascale_collections(rng, count=40, base=ASCALE_URL):
+    blocks = ''.join(
+        f"""<div class="jet-listing-grid__item jet-listing-dynamic-post-{i}" data-post-id="{i}">
+  <a href="{base}/en/collection/collection-{i}/" data-element_type="container" class="elementor-element e-con">
+    <div class="elementor-widget-image"><img src="{base}/wp-content/uploads/c{i}.jpg"></div>
+    <div class="elementor-widget-heading"><h3 class="elementor-heading-title elementor-size-default"> Collection {i} </h3></div>
+  </a>
+</div>
+""" for i in range(count))
+    body = f'<div class="jet-listing-grid"><div class="jet-listing-grid__items">{blocks}</div></div>'
+    return page('Ascale - collections', body, rng)
+
+
+def ascale_collection(rng, count=24, start=0, base=ASCALE_URL):
+    cards = []
+    for i in range(start, start + count):
+        lazy = i % 3 == 0
+        img = (f'<img class="attachment-large lazyloaded" src="{base}/wp-content/uploads/p{i}.jpg">'
+               if not lazy else
+               f'<img class="attachment-large" src="data:image/svg+xml,%3Csvg%3E%3C/svg%3E" '
+               f'data-lazy-src="{base}/wp-content/uploads/p{i}.jpg">')
+        cards.append(f"""<div class="jet-listing-grid__item" data-post-id="{i}">
+  <div class="elementor-widget-image">{img}</div>
+  <div class="elementor-widget-heading"><h3 class="elementor-heading-title">
+    <a href="{base}/en/product/product-{i}/">Product {i} Calacatta</a></h3></div>
+  <div class="elementor-element description"><div class="elementor-widget-container">
+    <p>Porcelain slab {i}.</p><p>Thickness <strong>6 mm</strong> &amp; 12 mm.</p></div></div>
+</div>
+""")
+    body = f'<div class="jet-listing-grid"><div class="jet-listing-grid__items">{"".join(cards)}</div></div>'
+    return page('Ascale - collection', body, rng)
+
+
+def ascale_detail(rng, base=ASCALE_URL):
+    slides = ''.join(
+        f'<div class="swiper-slide{" swiper-slide-duplicate" if i in (0, 6) else ""}" data-swiper-slide-index="{i}">'
+        f'<figure class="swiper-slide-inner"><img class="swiper-slide-image" src="data:image/svg+xml,%3Csvg%3E" '
+        f'data-lazy-src="{base}/wp-content/uploads/slide{i}.jpg" alt="slide"></figure></div>'
+        for i in range(7)
+    )
+    rows = ''.join(
+        f"""<div class="elementor-element jedv-enabled--yes e-con">
+  <div class="elementor-widget-heading"><span class="elementor-heading-title">160x320</span></div>
+  <div class="elementor-widget-heading"><span class="elementor-heading-title">6 mm</span></div>
+  <div class="elementor-widget-heading"><span class="elementor-heading-title"> {rng.choice(SURFACES)}, {rng.choice(SURFACES)} </span></div>
+</div>
+""" for _ in range(3))
+    body = f"""<div class="elementor-widget-image-carousel"><div class="swiper"><div class="swiper-wrapper">{slides}</div></div></div>
+<div class="formats">{rows}</div>"""
+    return page('Ascale - product', body, rng)
+
+
+def sapienstone_catalog(rng, count=150):
+    containers = ''.join(
+        f"""<div class="col product-container">
+  <a href="/en/collections/stone-{i}"><img src="/images/thumbs/stone-{i}.jpg" alt="Stone {i}"></a>
+  <p><strong> Stone {i} </strong><br><i>{rng.choice(SURFACES)}</i></p>
+</div>
+""" for i in range(count))
+    body = f'<div class="container"><div class="row products">{containers}</div></div>'
+    return page('Sapienstone - collections', body, rng)
+
+
+def sapienstone_detail(rng):
+    slides = ''.join(
+        f'<div class="slick-slide{" slick-cloned" if i == 0 else ""}" data-slick-index="{i}">'
+        f'<a href="/images/big/slide-{i}.jpg"><img src="/images/thumb/slide-{i}.jpg"></a></div>'
+        for i in range(6)
+    )
+    body = f"""<div class="product-gallery"><div class="slick-slider"><div class="slick-list">
+<div class="slick-track" style="opacity: 1; width: 5000px;">{slides}</div></div></div></div>"""
+    return page('Sapienstone - product', body, rng)
+
+
+FIXTURES = {
+    'topovi_listing_small.html': lambda rng: topovi_listing(1, rng),
+    'topovi_listing_50.html': lambda rng: topovi_listing(50, rng),
+    'topovi_detail.html': topovi_detail,
+    'ascale_collections.html': ascale_collections,
+    'ascale_collection.html': ascale_collection,
+    'ascale_detail.html': ascale_detail,
+    'sapienstone_catalog.html': sapienstone_catalog,
+    'sapienstone_detail.html': sapienstone_detail,
+}
+
+
+def main():
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for name, build in FIXTURES.items():
+        html = build(random.Random(name))
+        with open(os.path.join(FIXTURES_DIR, name), 'w', encoding='utf-8') as f:
+            f.write(html)
+        print(f"✅ {name}: {len(html) / 1024:.0f} КБ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Мікробенчмарк екстракторів на фікстурах: пропускна здатність (сторінок/с),
+p50/p95 часу розбору однієї сторінки та пікова пам'ять (tracemalloc)
+Результати зберігаються в JSON, який можна порівняти з базовим з іншого коміту
+Запуск:
+    python benchmarks/run_benchmarks.py --save benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json
+"""
+
+from datetime import datetime
+import argparse
+import platform
+import subprocess
+import tracemalloc
+import time
+import json
+import sys
+import os
+from cases import CASES, ROOT, create_parsers, load_fixture, run_quiet
+import html_parsing
+
+BASELINE_FILE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+
+
+def percentile(samples, fraction):
+    """Перцентиль відсортованої вибірки (найближчий ранг)"""
+    index = max(0, min(len(samples) - 1, round(fraction * len(samples)) - 1))
+    return samples[index]
+
+
+def peak_memory(extract, parsers, html):
+    """Пікове виділення пам'яті за один виклик екстрактора, КБ"""
+    tracemalloc.start()
+    try:
+        run_quiet(extract, parsers, html)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def measure(extract, parsers, html, repeat, warmup):
+    """Статистика одного сценарію: час кожного виклику окремо, пам'ять - окремим прогоном"""
+    for _ in range(warmup):
+        run_quiet(extract, parsers, html)
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run_quiet(extract, parsers, html)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+
+    return {
+        'pages_per_s': round(1000 * len(samples) / sum(samples), 1),
+        'p50_ms': round(percentile(samples, 0.50), 3),
+        'p95_ms': round(percentile(samples, 0.95), 3),
+        'peak_kb': round(peak_memory(extract, parsers, html), 1),
+        'fixture_kb': round(len(html.encode('utf-8')) / 1024, 1),
+    }
+
+
+def git_commit():
+    """Короткий хеш поточного коміту або None"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(repeat, warmup, only=None):
+    """Проганяє всі сценарії (або ті, що містять only у назві) і повертає результат для JSON"""
+    parsers = create_parsers()
+    cases = {}
+
+    print(f"Бекенд: {html_parsing.BACKEND}, повторів: {repeat}\n")
+    print(f"{'сценарій':40} {'стор/с':>8} {'p50':>9} {'p95':>9} {'пам`ять':>9}")
+
+    for name, fixture, extract in CASES:
+        if only and only not in name:
+            continue
+        stats = measure(extract, parsers, load_fixture(fixture), repeat, warmup)
+        cases[name] = stats
+        print(f"{name:40} {stats['pages_per_s']:8.1f} {stats['p50_ms']:7.2f}мс {stats['p95_ms']:7.2f}мс "
+              f"{stats['peak_kb']:7.0f}КБ")
+
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'backend': html_parsing.BACKEND,
+        'repeat': repeat,
+        'cases': cases,
+    }
+
+
+def compare(result, baseline, threshold):
+    """Друкує зміни відносно базового результату, повертає кількість регресій"""
+    print(f"\nПорівняння з {baseline.get('commit') or 'базовим'} ({baseline.get('created_at')}):")
+    print(f"{'сценарій':40} {'p50':>8} {'p95':>8} {'пам`ять':>8}")
+
+    regressions = 0
+    for name, stats in result['cases'].items():
+        base = baseline['cases'].get(name)
+        if base is None:
+            print(f"{name:40} {'новий':>8}")
+            continue
+
+        deltas = [(stats[key] - base[key]) / base[key] if base[key] else 0.0
+                  for key in ('p50_ms', 'p95_ms', 'peak_kb')]
+        # p95 шумить сильніше, тож регресією вважаються лише p50 і пам'ять
+        regressed = deltas[0] > threshold or deltas[2] > threshold
+        if regressed:
+            regressions += 1
+        print(f"{'❌' if regressed else '  '}{name:38} " + ' '.join(f"{delta:+7.0%}" for delta in deltas))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Мікробенчмарк екстракторів на HTML фікстурах")
+    parser.add_argument('--repeat', type=int, default=50, help="вимірів на сценарій")
+    parser.add_argument('--warmup', type=int, default=3, help="прогрівних викликів на сценарій")
+    parser.add_argument('--only', help="лише сценарії, що містять цей рядок")
+    parser.add_argument('--save', metavar='FILE', help="зберегти результат у JSON")
+    parser.add_argument('--compare', metavar='FILE', nargs='?', const=BASELINE_FILE,
+                        help="порівняти з базовим JSON (за замовчуванням benchmarks/baseline.json)")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="допустиме погіршення p50 або пам'яті (частка), інакше код виходу 1")
+    args = parser.parse_args()
+
+    result = run(args.repeat, args.warmup, args.only)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Результат збережено: {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ Регресій: {regressions}")
+            sys.exit(1)
+        print("\n✅ Без регресій")
+
+
+if __name__ == "__main__":
+    main()
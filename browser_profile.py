@@ -0,0 +1,99 @@
+"""
+Полегшений профіль браузера
+Блокування картинок, шрифтів, медіа та сторонніх трекерів через Chrome DevTools
+(атрибути src/href лишаються в DOM, але самі файли не завантажуються)
+та облік часу завантаження і трафіку сторінок
+"""
+
+import threading
+
+# Шаблони URL для Network.setBlockedURLs ('*' - будь-які символи)
+RESOURCE_PATTERNS = {
+    'images': ['*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*', '*.avif*', '*.svg*', '*.ico*', '*.bmp*'],
+    'fonts': ['*.woff*', '*.woff2*', '*.ttf*', '*.otf*', '*.eot*', '*fonts.googleapis.com*', '*fonts.gstatic.com*'],
+    'media': ['*.mp4*', '*.webm*', '*.ogg*', '*.mp3*', '*.m3u8*', '*youtube.com/embed*', '*player.vimeo.com*'],
+    'trackers': [
+        '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*googlesyndication.com*',
+        '*facebook.net*', '*connect.facebook.com*', '*hotjar.com*', '*clarity.ms*', '*mc.yandex.*',
+        '*tiktok.com*', '*linkedin.com/px*', '*cookiebot.com*', '*tawk.to*', '*jivosite.com*',
+    ],
+}
+
+# Вага сторінки за Resource Timing API: (передано байтів, кількість запитів).
+# Для сторонніх ресурсів без Timing-Allow-Origin браузер повертає 0, тож оцінка знизу
+PAGE_WEIGHT_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+const bytes = resources.reduce((sum, r) => sum + (r.transferSize || 0), nav ? nav.transferSize : 0);
+return [bytes, resources.length + 1];
+"""
+
+
+class ResourcePolicy:
+    def __init__(self, block=('images', 'fonts', 'media', 'trackers'), allow=()):
+        """
+        block - категорії з RESOURCE_PATTERNS або власні шаблони URL, що блокуються
+        allow - категорії чи шаблони, які потрібні сайту і не блокуються
+        """
+        self.block = tuple(block)
+        self.allow = tuple(allow)
+
+    def blocked_urls(self):
+        """Список шаблонів URL для блокування"""
+        allowed = set()
+        for entry in self.allow:
+            allowed.update(RESOURCE_PATTERNS.get(entry, [entry]))
+
+        patterns = []
+        for entry in self.block:
+            for pattern in RESOURCE_PATTERNS.get(entry, [entry]):
+                if pattern not in allowed and pattern not in patterns:
+                    patterns.append(pattern)
+        return patterns
+
+    def apply(self, driver):
+        """Вмикає блокування для драйвера (діє до кінця сесії браузера)"""
+        patterns = self.blocked_urls()
+        if not patterns:
+            return
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+
+
+class PageStats:
+    """Час завантаження та трафік сторінок за типами (спільний для всіх воркерів)"""
+
+    def __init__(self, weight=False):
+        """weight - також рахувати трафік сторінки (ще один execute_script на кожну сторінку)"""
+        self.weight = weight
+        self.lock = threading.Lock()
+        self.pages = {}
+
+    def record(self, page_type, seconds, driver):
+        """Записує час завантаження сторінки та (з weight) її вагу з браузера"""
+        transferred, requests = 0, 0
+        if self.weight:
+            try:
+                transferred, requests = driver.execute_script(PAGE_WEIGHT_JS)
+            except Exception:
+                pass
+
+        with self.lock:
+            stats = self.pages.setdefault(page_type, [0, 0.0, 0, 0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] += transferred
+            stats[3] += requests
+
+    def report(self):
+        """Друкує середній час і трафік на сторінку кожного типу"""
+        with self.lock:
+            pages = dict(self.pages)
+        if not pages:
+            return
+
+        print("\n📶 Завантаження сторінок у браузері:")
+        for page_type, (count, seconds, transferred, requests) in pages.items():
+            weight = (f", {transferred / count / 1024:.0f} КБ, {requests / count:.0f} запитів на сторінку"
+                      if self.weight else '')
+            print(f"   {page_type}: {count} сторінок, {seconds / count:.2f} с{weight}")
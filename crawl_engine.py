@@ -0,0 +1,256 @@
+"""
+Asyncio рушій для сторінок, що завантажуються без браузера
+Обмежена кількість одночасних запитів до кожного хоста, token bucket
+на кожен домен, спільні keep-alive з'єднання та таймаути; тимчасові збої
+повторюються з паузою з джитером, запобіжник (CircuitBreaker) призупиняє хост, що лежить
+"""
+
+from urllib.parse import urlparse
+import aiohttp
+import asyncio
+import threading
+import time
+from fetcher import DEFAULT_HEADERS, HTTP
+from page_cache import CacheMiss
+from retry_policy import classify, backoff_delay, FATAL
+from run_metrics import RunMetrics
+
+
+def host_key(url):
+    """Домен сторінки без 'www.' - ключ для лімітів"""
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+async def read_prefix(response, size):
+    """Читає не більше size перших байтів тіла відповіді"""
+    data = b''
+    while len(data) < size:
+        chunk = await response.content.read(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        """rate - запитів на секунду, capacity - допустимий короткий сплеск"""
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+        self.guard = threading.Lock()
+
+    def take(self):
+        """Забирає токен, якщо він є (None), інакше повертає, скільки секунд чекати наступного"""
+        with self.guard:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return None
+            return (1 - self.tokens) / self.rate
+
+    async def acquire(self):
+        """Чекає, поки з'явиться токен, і забирає його"""
+        async with self.lock:
+            delay = self.take()
+            while delay is not None:
+                await asyncio.sleep(delay)
+                delay = self.take()
+
+    def wait(self):
+        """Те саме для потоків (воркери пулу браузерів, HTTP режим PageFetcher)"""
+        delay = self.take()
+        while delay is not None:
+            time.sleep(delay)
+            delay = self.take()
+
+
+class AsyncCrawlEngine:
+    def __init__(self, rate_limits=None, default_rate=2.0, concurrency_per_host=4,
+                 timeout=20, retries=2, headers=None, cache=None, cache_only=False, metrics=None,
+                 breaker=None):
+        """
+        rate_limits - словник {домен: запитів на секунду}, напр. {'ascale.es': 2.0}
+        concurrency_per_host - максимум одночасних запитів до одного хоста
+        retries - повторів тимчасових збоїв (5xx, 429, мережа, таймаут) на запит
+        breaker - CircuitBreaker, спільний з браузерними воркерами парсера (None - без запобіжника)
+        cache / cache_only - PageCache і режим повтору лише з кешу (як у PageFetcher)
+        metrics - RunMetrics парсера (час запитів, сторінки, байти, повтори)
+        """
+        self.rate_limits = dict(rate_limits or {})
+        self.default_rate = default_rate
+        self.concurrency_per_host = concurrency_per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.headers = dict(headers or DEFAULT_HEADERS)
+        self.cache = cache
+        self.cache_only = cache_only
+        self.metrics = metrics or RunMetrics(None, enabled=False)
+        self.breaker = breaker
+        self.buckets = {}
+        self.semaphores = {}
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit_per_host=self.concurrency_per_host, ttl_dns_cache=300)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+        self.session = None
+
+    def limits_for(self, url):
+        """Повертає (семафор, token bucket) для домену сторінки"""
+        host = host_key(url)
+        if host not in self.semaphores:
+            self.semaphores[host] = asyncio.Semaphore(self.concurrency_per_host)
+            self.buckets[host] = TokenBucket(self.rate_limits.get(host, self.default_rate))
+        return self.semaphores[host], self.buckets[host]
+
+    async def before_request(self, url):
+        """Чекає дозволу запобіжника хоста і токена ліміту"""
+        if self.breaker is not None:
+            await self.breaker.wait_async(host_key(url))
+        try:
+            await self.limits_for(url)[1].acquire()
+        except BaseException:
+            self.request_aborted(url)
+            raise
+
+    def request_failed(self, url, error, attempt):
+        """
+        Облік невдалого запиту; повертає паузу перед повтором або None, якщо
+        помилка остаточна (4xx) чи спроби вичерпано
+        """
+        kind = classify(error)
+        if self.breaker is not None:
+            if kind == FATAL:
+                self.breaker.record_success(host_key(url))
+            else:
+                self.breaker.record_failure(host_key(url))
+        if kind == FATAL or attempt == self.retries:
+            return None
+        self.metrics.count('retries', stage='http', error=kind)
+        return backoff_delay(attempt + 1)
+
+    def request_succeeded(self, url):
+        """Облік успішної відповіді хоста"""
+        if self.breaker is not None:
+            self.breaker.record_success(host_key(url))
+
+    def request_aborted(self, url):
+        """Запит перервано без відповіді хоста (скасування, збій розбору): звільняє пробний запит запобіжника"""
+        if self.breaker is not None:
+            self.breaker.release(host_key(url))
+
+    async def fetch(self, url):
+        """Завантажує сторінку з урахуванням лімітів, повторюючи тимчасові збої"""
+        if self.cache is not None:
+            html = self.cache.find(url, HTTP, replay=self.cache_only)
+            if html is not None:
+                self.metrics.count('cache_hits', type='async')
+                return html
+        if self.cache_only:
+            raise CacheMiss(f"Сторінки немає в кеші: {url}")
+
+        html = await self.fetch_remote(url)
+        if self.cache is not None:
+            self.cache.put(url, HTTP, html)
+        return html
+
+    async def fetch_remote(self, url, binary=False):
+        """
+        Запит до сайту з урахуванням лімітів, повторюючи тимчасові збої
+        binary - повернути тіло відповіді як bytes (картинки) замість тексту
+        """
+        semaphore, _ = self.limits_for(url)
+
+        async with semaphore:
+            for attempt in range(self.retries + 1):
+                await self.before_request(url)
+                started = time.perf_counter()
+                try:
+                    async with self.session.get(url) as response:
+                        response.raise_for_status()
+                        if binary:
+                            body = await response.read()
+                        else:
+                            body = await response.text()
+                            self.metrics.observe('http', time.perf_counter() - started)
+                            self.metrics.count('pages', type='async', mode=HTTP)
+                            if self.metrics.enabled:
+                                self.metrics.count('bytes', len(body.encode('utf-8')), source='http')
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    # 4xx не виправиться повтором
+                    delay = self.request_failed(url, e, attempt)
+                    if delay is None:
+                        raise
+                    await asyncio.sleep(delay)
+                    continue
+                except BaseException:
+                    # Інакше хост назавжди лишиться "на пробі" і запобіжник не закриється
+                    self.request_aborted(url)
+                    raise
+                self.request_succeeded(url)
+                return body
+
+    async def fetch_range(self, url, size):
+        """
+        Перші size байтів ресурсу одним Range запитом (якщо сервер віддає весь файл,
+        читається лише початок): (HTTP статус, Content-Type, байти)
+        4xx повертається статусом без винятку, тимчасові збої повторюються
+        """
+        semaphore, _ = self.limits_for(url)
+        headers = {'Range': f'bytes=0-{size - 1}'}
+
+        async with semaphore:
+            for attempt in range(self.retries + 1):
+                await self.before_request(url)
+                try:
+                    async with self.session.get(url, headers=headers) as response:
+                        if response.status < 500 and response.status != 429:
+                            data = await read_prefix(response, size) if response.status < 300 else b''
+                            result = response.status, response.headers.get('Content-Type', ''), data
+                        else:
+                            response.raise_for_status()
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    delay = self.request_failed(url, e, attempt)
+                    if delay is None:
+                        raise
+                    await asyncio.sleep(delay)
+                    continue
+                except BaseException:
+                    # Інакше хост назавжди лишиться "на пробі" і запобіжник не закриється
+                    self.request_aborted(url)
+                    raise
+                self.request_succeeded(url)
+                return result
+
+    async def fetch_each(self, items, url_of, on_page):
+        """
+        Завантажує сторінки для всіх елементів паралельно
+        on_page(item, html, error) викликається в циклі подій по мірі готовності,
+        тому запис результатів залишається однопотоковим; якщо on_page - корутина,
+        наступна сторінка передається лише після її завершення
+        """
+        async def fetch_item(item):
+            try:
+                return item, await self.fetch(url_of(item)), None
+            except Exception as e:
+                return item, None, e
+
+        for future in asyncio.as_completed([fetch_item(item) for item in items]):
+            item, html, error = await future
+            result = on_page(item, html, error)
+            if asyncio.iscoroutine(result):
+                await result
@@ -0,0 +1,101 @@
+"""
+Черга помилок (dead-letter queue) товарів
+Товар, детальну сторінку якого не вдалось обробити, не записується порожнім рядком
+і не стає обробленим: помилка з класом і кількістю спроб зберігається у сховищі,
+а товар повторюється окремим проходом наприкінці запуску (або наступного запуску)
+з експоненційною паузою; після max_attempts невдач товар вважається остаточно невдалим
+Запуск: python dead_letters.py topovi ascale [--revive]
+"""
+
+import argparse
+import time
+from product_store import ProductStore
+
+
+class DeadLetterQueue:
+    def __init__(self, store, site, max_attempts=3, backoff=30.0, max_wait=120.0, metrics=None):
+        """
+        store / site - сховище товарів і ключ сайту
+        max_attempts - після стількох невдач товар більше не повторюється
+        backoff - пауза перед першим повтором, с (далі подвоюється)
+        max_wait - скільки секунд прохід повторів готовий чекати найближчого повтору
+        (0 - повтори, час яких ще не настав, відкладаються до наступного запуску)
+        """
+        self.store = store
+        self.site = site
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_wait = max_wait
+        self.metrics = metrics
+
+    def record(self, product, context, error):
+        """Записує невдачу обробки товару, повертає True, якщо товар остаточно невдалий"""
+        attempts, retry_at = self.store.record_failure(
+            self.site, product['url'], {'product': product, 'context': context},
+            type(error).__name__, str(error), self.max_attempts, self.backoff
+        )
+        dead = retry_at is None
+        if self.metrics is not None:
+            self.metrics.count('product_failures', error=type(error).__name__)
+            if dead:
+                self.metrics.count('dead_products')
+        if dead:
+            print(f"☠️ Товар остаточно не вдалось обробити після {attempts} спроб: {product['url']}")
+        else:
+            print(f"🔁 Повтор через {retry_at - time.time():.0f} с (спроба {attempts + 1}/{self.max_attempts}): "
+                  f"{product['url']}")
+        return dead
+
+    def resolve(self, urls):
+        """Прибирає з черги товари, рядки яких записано"""
+        self.store.resolve_failures(self.site, urls)
+
+    def due(self):
+        """Товари, час повтору яких настав: список (товар, контекст)"""
+        return [(payload['product'], payload['context'])
+                for _, payload in self.store.due_failures(self.site, time.time())]
+
+    def next_delay(self):
+        """Секунд до найближчого повтору, якщо він у межах max_wait, інакше None"""
+        retry_at = self.store.next_retry_at(self.site)
+        if retry_at is None:
+            return None
+        delay = max(0.0, retry_at - time.time())
+        return delay if delay <= self.max_wait else None
+
+    def dead_urls(self):
+        """URL остаточно невдалих товарів (не обробляються, доки їх не повернуть у чергу)"""
+        return self.store.dead_failures(self.site)
+
+    def report(self):
+        """Друкує підсумок черги помилок, повертає кількість остаточно невдалих товарів"""
+        waiting, dead = self.store.failure_counts(self.site)
+        if waiting or dead:
+            print(f"☠️ Остаточно невдалих товарів: {dead}, чекають повтору: {waiting} "
+                  f"(python dead_letters.py {self.site})")
+        return dead
+
+
+def main():
+    """Перелік невдалих товарів і повернення остаточно невдалих у чергу повторів"""
+    parser = argparse.ArgumentParser(description="Черга помилок обробки товарів")
+    parser.add_argument('sites', nargs='+')
+    parser.add_argument('--store', default='products.sqlite')
+    parser.add_argument('--revive', action='store_true', help="повернути остаточно невдалі товари у чергу")
+    args = parser.parse_args()
+
+    store = ProductStore(args.store)
+    try:
+        for site in args.sites:
+            if args.revive:
+                print(f"🔁 {site}: повернуто у чергу {store.revive_failures(site)} товарів")
+            for url, error_class, error, attempts, retry_at in store.failures(site):
+                state = 'остаточно' if retry_at is None else time.strftime('повтор %Y-%m-%d %H:%M',
+                                                                          time.localtime(retry_at))
+                print(f"{site}\t{attempts}\t{state}\t{error_class}: {error}\t{url}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
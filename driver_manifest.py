@@ -0,0 +1,70 @@
+"""
+Закріплений chromedriver
+Шлях до драйвера визначається через webdriver-manager один раз і зберігається
+в локальному маніфесті, тож наступні запуски й перезапуски працюють без мережі
+Оновлення маніфесту (напр. після оновлення Chrome): python driver_manifest.py --refresh
+"""
+
+from datetime import datetime
+import argparse
+import threading
+import json
+import os
+
+MANIFEST_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chromedriver.json')
+
+_lock = threading.Lock()
+_resolved = {}
+
+
+def read_manifest(manifest_file=MANIFEST_FILE):
+    """Повертає закріплений шлях до драйвера, якщо файл драйвера ще існує"""
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            path = json.load(f).get('path')
+    except (OSError, ValueError):
+        return None
+    return path if path and os.path.exists(path) else None
+
+
+def write_manifest(path, manifest_file=MANIFEST_FILE):
+    """Атомарно записує маніфест з шляхом до драйвера"""
+    tmp_file = manifest_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            'path': path,
+            'resolved_at': datetime.now().isoformat(timespec='seconds'),
+        }, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, manifest_file)
+
+
+def resolve_driver_path(manifest_file=MANIFEST_FILE, refresh=False):
+    """
+    Шлях до chromedriver: з пам'яті процесу, з маніфесту або (лише якщо їх немає
+    чи refresh=True) через webdriver-manager з записом нового маніфесту
+    """
+    with _lock:
+        if not refresh and manifest_file in _resolved:
+            return _resolved[manifest_file]
+
+        path = None if refresh else read_manifest(manifest_file)
+        if path is None:
+            from webdriver_manager.chrome import ChromeDriverManager
+            path = ChromeDriverManager().install()
+            write_manifest(path, manifest_file)
+            print(f"📌 Chromedriver закріплено: {path}")
+
+        _resolved[manifest_file] = path
+        return path
+
+
+def main():
+    """Головна функція"""
+    parser = argparse.ArgumentParser(description="Закріплення chromedriver у локальному маніфесті")
+    parser.add_argument('--refresh', action='store_true', help="визначити драйвер заново через мережу")
+    args = parser.parse_args()
+    print(resolve_driver_path(refresh=args.refresh))
+
+
+if __name__ == "__main__":
+    main()
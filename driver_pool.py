@@ -0,0 +1,285 @@
+"""
+Браузерні сесії та пул браузерів для паралельної обробки товарів
+Кожен воркер має власний браузер; при збої перезапускається лише він
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+import queue
+import threading
+import time
+import json
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+class SessionMetrics:
+    """
+    Час запуску та перезапуску браузерів (спільний для всіх сесій парсера)
+    Тривалості потрапляють в етапи browser_<подія> RunMetrics парсера, а події та заміри
+    пам'яті за бажанням дописуються в журнал log_file (JSONL)
+    """
+
+    def __init__(self, log_file=None, run_metrics=None):
+        self.log_file = log_file
+        self.run_metrics = run_metrics
+        self.lock = threading.Lock()
+        self.events = {}
+
+    def log(self, session_name, event, **fields):
+        """Дописує подію браузерної сесії в журнал"""
+        if not self.log_file:
+            return
+        entry = {'time': datetime.now().isoformat(timespec='seconds'), 'session': session_name, 'event': event}
+        entry.update(fields)
+        with self.lock:
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def record(self, kind, seconds, session_name=None, **fields):
+        """kind - 'start' (холодний запуск), 'restart', 'standby_swap' або 'recycle'"""
+        with self.lock:
+            count, total, worst = self.events.get(kind, (0, 0.0, 0.0))
+            self.events[kind] = (count + 1, total + seconds, max(worst, seconds))
+        if self.run_metrics is not None:
+            self.run_metrics.observe(f'browser_{kind}', seconds)
+        self.log(session_name, kind, seconds=round(seconds, 3), **fields)
+
+    def report(self):
+        """Друкує кількість і середню/максимальну тривалість подій"""
+        with self.lock:
+            events = dict(self.events)
+        if not events:
+            return
+
+        print("\n🚀 Браузери:")
+        for kind, (count, total, worst) in events.items():
+            print(f"   {kind}: {count} разів, в середньому {total / count:.2f} с, максимум {worst:.2f} с")
+
+
+class BrowserSession:
+    def __init__(self, create_driver, name='main', metrics=None, standby=False,
+                 recycle_after=None, max_rss_mb=None, sample_every=10):
+        """
+        create_driver - функція, що запускає новий браузер і повертає драйвер
+        metrics - SessionMetrics для часу запуску та перезапуску
+        standby - тримати у фоні запасний запущений браузер, який замінює впалий при перезапуску
+        recycle_after / max_rss_mb - плановий перезапуск між товарами після стількох сторінок
+        або коли браузер займає більше стількох МБ (замір кожні sample_every сторінок, потрібен psutil)
+        """
+        self.create_driver = create_driver
+        self.name = name
+        self.metrics = metrics
+        self.standby = standby
+        self.recycle_after = recycle_after
+        self.max_rss_mb = max_rss_mb if psutil is not None else None
+        self.sample_every = sample_every
+        self.pages = 0
+        self.sampled_at = 0
+        self._driver = None
+        self._standby_driver = None
+        self._standby_thread = None
+
+    @property
+    def driver(self):
+        """Драйвер сесії; браузер запускається при першому зверненні"""
+        if self._driver is None:
+            self.start()
+        return self._driver
+
+    def record(self, kind, started, **fields):
+        """Записує тривалість події від моменту started"""
+        if self.metrics is not None:
+            self.metrics.record(kind, time.monotonic() - started, self.name, **fields)
+
+    def start(self):
+        """Запускає браузер (з резерву, якщо він готовий)"""
+        started = time.monotonic()
+        driver = self.take_standby()
+        if driver is not None:
+            self._driver = driver
+            self.record('standby_swap', started)
+        else:
+            self._driver = self.create_driver()
+            self.record('start', started)
+        self.pages = 0
+        self.sampled_at = 0
+        self.prepare_standby()
+
+    def prepare_standby(self):
+        """Запускає запасний браузер у фоновому потоці"""
+        if not self.standby or self._standby_driver is not None:
+            return
+        if self._standby_thread is not None and self._standby_thread.is_alive():
+            return
+
+        def warm_up():
+            try:
+                self._standby_driver = self.create_driver()
+            except Exception as e:
+                print(f"⚠️ Не вдалось запустити резервний браузер [{self.name}]: {e}")
+
+        self._standby_thread = threading.Thread(target=warm_up, name=f"standby-{self.name}", daemon=True)
+        self._standby_thread.start()
+
+    def take_standby(self):
+        """Забирає запасний браузер (дочекавшись, якщо він ще стартує) або повертає None"""
+        if self._standby_thread is not None:
+            self._standby_thread.join()
+            self._standby_thread = None
+        driver, self._standby_driver = self._standby_driver, None
+        return driver
+
+    def quit(self):
+        """Закриває браузер, ігноруючи помилки вже мертвої сесії"""
+        try:
+            if self._driver:
+                self._driver.quit()
+        except Exception:
+            pass
+        self._driver = None
+
+    def restart(self):
+        """Перезапуск браузера при помилках: заміна на резервний або холодний старт"""
+        print(f"🔄 Перезапуск браузера [{self.name}]...")
+        started = time.monotonic()
+        self.quit()
+        self.start()
+        self.record('restart', started)
+
+    def page_loaded(self):
+        """Враховує завантажену в браузері сторінку"""
+        self.pages += 1
+
+    def rss_mb(self):
+        """Пам'ять браузера (chromedriver і всі процеси Chrome), МБ, або None"""
+        if psutil is None or self._driver is None:
+            return None
+        try:
+            process = psutil.Process(self._driver.service.process.pid)
+            processes = [process] + process.children(recursive=True)
+        except (AttributeError, psutil.Error):
+            return None
+
+        total = 0
+        for child in processes:
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / 1024 / 1024
+
+    def maybe_recycle(self):
+        """
+        Викликається між товарами: перезапускає браузер після recycle_after сторінок
+        або при перевищенні max_rss_mb, не чекаючи, поки він впаде посеред сторінки
+        """
+        if self._driver is None:
+            return
+
+        reason = None
+        if self.recycle_after and self.pages >= self.recycle_after:
+            reason = f"{self.pages} сторінок"
+        elif self.pages - self.sampled_at >= self.sample_every:
+            self.sampled_at = self.pages
+            rss = self.rss_mb()
+            if rss is not None:
+                if self.metrics is not None:
+                    self.metrics.log(self.name, 'memory', pages=self.pages, rss_mb=round(rss))
+                if self.max_rss_mb and rss > self.max_rss_mb:
+                    reason = f"{rss:.0f} МБ > {self.max_rss_mb} МБ"
+
+        if reason:
+            print(f"♻️ Плановий перезапуск браузера [{self.name}]: {reason}")
+            started = time.monotonic()
+            pages = self.pages
+            self.quit()
+            self.start()
+            self.record('recycle', started, reason=reason, pages=pages)
+
+    def close(self):
+        """Закриває браузер і резервний браузер"""
+        self.quit()
+        standby = self.take_standby()
+        try:
+            if standby:
+                standby.quit()
+        except Exception:
+            pass
+
+
+class DriverPool:
+    def __init__(self, create_driver, size, sessions=None, **session_options):
+        """
+        size - максимальна кількість одночасно працюючих браузерів
+        sessions - вже запущені сесії, які пул використає першими
+        session_options - параметри нових сесій (див. BrowserSession)
+        """
+        self.create_driver = create_driver
+        self.session_options = session_options
+        self.size = max(1, size)
+        self.owned = []
+        self.idle = queue.Queue()
+        self.created = 0
+        self.lock = threading.Lock()
+        for session in (sessions or [])[:self.size]:
+            self.idle.put(session)
+            self.created += 1
+
+    def acquire(self):
+        """Бере вільну сесію або створює нову (браузер стартує лише при потребі)"""
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        # Кількість потоків дорівнює size, тож нових сесій не буде більше ліміту
+        with self.lock:
+            self.created += 1
+            name = f"worker-{self.created}"
+        session = BrowserSession(self.create_driver, name=name, **self.session_options)
+        with self.lock:
+            self.owned.append(session)
+        return session
+
+    def release(self, session):
+        """Повертає сесію до пулу"""
+        self.idle.put(session)
+
+    def run(self, items, task, on_result):
+        """
+        Виконує task(session, item) для кожного елемента в size потоках
+        on_result(item, result, error) викликається у потоці, що викликав run,
+        тому запис результатів залишається однопотоковим
+        """
+        def work(item):
+            session = self.acquire()
+            try:
+                return task(session, item)
+            finally:
+                # Плановий перезапуск - лише між товарами
+                try:
+                    session.maybe_recycle()
+                except Exception as e:
+                    print(f"⚠️ Не вдалось перезапустити браузер [{session.name}]: {e}")
+                self.release(session)
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            futures = {executor.submit(work, item): item for item in items}
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    on_result(item, None, e)
+                else:
+                    on_result(item, result, None)
+
+    def close(self):
+        """Закриває браузери, запущені пулом"""
+        for session in self.owned:
+            session.close()
+        self.owned = []
@@ -0,0 +1,205 @@
+"""
+Буферизований запис товарів
+Рядки накопичуються в пам'яті та скидаються пакетами у сховище товарів (SQLite),
+Excel файл будується з нього одним потоковим проходом openpyxl (write-only)
+"""
+
+from openpyxl import load_workbook
+import time
+import os
+import json
+import uuid
+from product_store import ProductStore
+from exporter import export_xlsx
+from run_metrics import RunMetrics
+
+# Префікси синтетичних ключів рядків, перенесених з Excel файлу чи журналу без URL
+LEGACY_PREFIXES = ('legacy:', 'legacy-journal:')
+
+
+class BufferedExcelWriter:
+    def __init__(self, output_file, columns, site, store=None, batch_size=10, flush_interval=30,
+                 sheet_name='Products', on_flush=None, metrics=None, export_columns=None,
+                 before_flush=None, identity_columns=None):
+        """
+        columns - список пар (назва колонки, ширина) у порядку запису
+        site - ключ сайту у сховищі; store - спільний ProductStore
+        (якщо не вказаний, відкривається власний і закривається разом з writer)
+        batch_size / flush_interval - скидання буфера кожні N рядків або T секунд
+        on_flush - викликається зі списком ключів (URL) після запису пакета на диск
+        before_flush - викликається зі списком рядків (словників) пакета перед записом і може їх змінювати
+        metrics - RunMetrics парсера (час запису у сховище та експорту в Excel)
+        export_columns - колонки Excel файлу, якщо відрізняються від columns (напр. шляхи картинок)
+        identity_columns - колонки, за якими рядок з URL замінює перенесений рядок того самого
+        товару без URL (інакше після повторного парсингу товар експортується двічі)
+        """
+        self.output_file = output_file
+        self.journal_file = output_file + '.rows.jsonl'
+        self.columns = columns
+        self.export_columns = export_columns or columns
+        self.site = site
+        self.own_store = store is None
+        self.store = store if store is not None else ProductStore()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sheet_name = sheet_name
+        self.on_flush = on_flush
+        self.before_flush = before_flush
+        self.identity_columns = identity_columns
+        self.metrics = metrics or RunMetrics(None, enabled=False)
+        self.buffer = []
+        # False - add не скидає буфер сам, власник перевіряє flush_due (напр. поза циклом подій asyncio)
+        self.auto_flush = True
+        self.dirty = False
+        self.changed_count = 0
+        self.last_flush = time.monotonic()
+
+        self.import_legacy()
+        self.legacy = self.load_legacy()
+
+    def add(self, product_data, key=None, card_hash=None):
+        """
+        Додає рядок у буфер, при потребі скидає пакет на диск
+        card_hash - відбиток картки товару у списку (для інкрементального оновлення)
+        """
+        data = {name: product_data.get(name, '') for name, _ in self.columns}
+        self.buffer.append((key, data, card_hash))
+
+        if self.auto_flush and self.flush_due():
+            self.flush()
+
+    def flush_due(self):
+        """Чи настав час скинути буфер: набралось batch_size рядків або минуло flush_interval секунд"""
+        return bool(self.buffer) and (len(self.buffer) >= self.batch_size
+                                      or time.monotonic() - self.last_flush >= self.flush_interval)
+
+    def flush(self):
+        """
+        Записує пакет рядків у сховище однією транзакцією, повертає кількість рядків
+        Excel файл перебудовується лише якщо дані хоча б одного рядка змінились
+        """
+        if not self.buffer:
+            return 0
+
+        if self.before_flush:
+            self.before_flush([data for _, data, _ in self.buffer])
+
+        # Рядки без URL теж зберігаємо, але під унікальним синтетичним ключем
+        with self.metrics.timer('store_write'):
+            changed = self.store.upsert_many(self.site, [
+                (key or f'unkeyed:{uuid.uuid4().hex}', data, card_hash) for key, data, card_hash in self.buffer
+            ])
+
+        # Рядок з URL замінює перенесений рядок того самого товару
+        if self.legacy:
+            replaced = [legacy_key for key, data, _ in self.buffer if key
+                        for legacy_key in self.legacy.pop(self.identity(data), [])]
+            if replaced:
+                self.store.delete_products(self.site, replaced)
+                self.dirty = True
+
+        count = len(self.buffer)
+        keys = [key for key, _, _ in self.buffer if key]
+        self.buffer = []
+        self.changed_count += changed
+        self.dirty = self.dirty or changed > 0
+        self.last_flush = time.monotonic()
+
+        if self.on_flush:
+            self.on_flush(keys)
+        return count
+
+    def read_existing_rows(self):
+        """Читає рядки з уже існуючого Excel файлу (без заголовка)"""
+        if not os.path.exists(self.output_file):
+            return
+
+        wb = load_workbook(self.output_file, read_only=True)
+        try:
+            ws = wb[self.sheet_name]
+            for index, row in enumerate(ws.iter_rows(values_only=True)):
+                if index == 0:
+                    continue
+                yield list(row)
+        finally:
+            wb.close()
+
+    def read_journal_rows(self):
+        """Читає (ключ, рядок) з журналу попередньої версії, пропускаючи обірваний запис"""
+        if not os.path.exists(self.journal_file):
+            return
+
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    yield entry['key'], entry['row']
+                except (ValueError, KeyError):
+                    continue
+
+    def import_legacy(self):
+        """
+        Одноразова міграція: рядки існуючого Excel файлу (під синтетичними ключами,
+        бо URL у ньому немає) і незавершений журнал рядків переносяться у сховище
+        """
+        names = [name for name, _ in self.columns]
+        products = []
+
+        if self.store.count(self.site) == 0:
+            base = os.path.basename(self.output_file)
+            for index, row in enumerate(self.read_existing_rows()):
+                products.append((f'legacy:{base}:{index}', dict(zip(names, row)), None))
+
+        for index, (key, row) in enumerate(self.read_journal_rows()):
+            products.append((key or f'legacy-journal:{index}', dict(zip(names, row)), None))
+
+        if products:
+            self.store.upsert_many(self.site, products)
+            self.dirty = True
+            print(f"📂 Перенесено у сховище {len(products)} рядків з {self.output_file}")
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+
+    def identity(self, data):
+        """Значення identity_columns рядка для зіставлення з перенесеними рядками"""
+        return tuple(str(data.get(name) or '').strip() for name in self.identity_columns)
+
+    def load_legacy(self):
+        """Ключі перенесених рядків сайту за значеннями identity_columns"""
+        legacy = {}
+        if not self.identity_columns:
+            return legacy
+        for key, data in self.store.products_by_prefix(self.site, LEGACY_PREFIXES):
+            identity = self.identity(data)
+            if any(identity):
+                legacy.setdefault(identity, []).append(key)
+        return legacy
+
+    def export(self):
+        """Скидає буфер і перебудовує Excel файл, якщо у сховищі є нові рядки"""
+        self.flush()
+        missing = not os.path.exists(self.output_file) and self.store.count(self.site) > 0
+        if self.dirty or missing:
+            with self.metrics.timer('excel_export'):
+                count = export_xlsx(self.store, self.site, self.export_columns, self.output_file, self.sheet_name)
+            self.dirty = False
+            print(f"   ✅ Файл збережено: {self.output_file} ({count} рядків)")
+
+    def close(self):
+        """Записує фінальний Excel файл і закриває власне сховище"""
+        if self.store is None:
+            return
+        self.export()
+        if self.own_store:
+            self.store.close()
+        self.store = None
+
+    def reset(self):
+        """Видаляє буфер, товари сайту у сховищі та файл результату"""
+        self.buffer = []
+        self.legacy = {}
+        self.dirty = False
+        self.store.delete_site(self.site)
+        for path in (self.journal_file, self.output_file):
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,202 @@
+"""
+Експорт товарів зі сховища в Excel, CSV або Parquet
+Один потоковий прохід по базі без завантаження всіх товарів у пам'ять
+Запуск: python exporter.py topovi ascale sapienstone --formats xlsx csv parquet
+"""
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, Side
+from openpyxl.utils import get_column_letter
+from datetime import datetime
+import argparse
+import importlib
+import csv
+import os
+from product_store import ProductStore
+
+# Службові колонки, що додаються до полів товару за потреби
+URL_COLUMN = 'URL'
+SCRAPED_AT_COLUMN = 'Scraped at'
+
+# Суфікс колонки з локальним шляхом завантаженої картинки ('Gallery1' -> 'Gallery1 file')
+IMAGE_PATH_SUFFIX = ' file'
+
+# Сайт: (модуль парсера, клас, файл Excel за замовчуванням)
+SITES = {
+    'topovi': ('topovi_parser', 'TopoviParser', 'topovi_products.xlsx'),
+    'ascale': ('ascale_parser', 'AscaleParser', 'ascale_ceramic.xlsx'),
+    'sapienstone': ('sapienstone_parser', 'SapienstoneParser', 'sapienstone_ceramic.xlsx'),
+}
+
+
+def with_image_paths(columns, image_columns, width=45):
+    """Колонки з локальними шляхами картинок одразу після колонок з їх URL"""
+    result = []
+    for name, column_width in columns:
+        result.append((name, column_width))
+        if name in image_columns:
+            result.append((name + IMAGE_PATH_SUFFIX, width))
+    return result
+
+
+def product_rows(store, site, names):
+    """Рядки товарів сайту у порядку колонок names"""
+    image_paths = store.image_paths(site) if any(name.endswith(IMAGE_PATH_SUFFIX) for name in names) else {}
+
+    for url, data, scraped_at in store.iter_products(site):
+        row = []
+        for name in names:
+            if name == URL_COLUMN:
+                row.append(url)
+            elif name == SCRAPED_AT_COLUMN:
+                row.append(datetime.fromtimestamp(scraped_at).isoformat(timespec='seconds'))
+            elif name.endswith(IMAGE_PATH_SUFFIX) and name not in data:
+                row.append(image_paths.get(data.get(name[:-len(IMAGE_PATH_SUFFIX)]), ''))
+            else:
+                row.append(data.get(name, ''))
+        yield row
+
+
+def header_cells(ws, names):
+    """Заголовок у стилі pandas: жирний шрифт, рамка, вирівнювання по центру"""
+    thin = Side(style='thin')
+    cells = []
+    for name in names:
+        cell = WriteOnlyCell(ws, value=name)
+        cell.font = Font(bold=True)
+        cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        cell.alignment = Alignment(horizontal='center', vertical='top')
+        cells.append(cell)
+    return cells
+
+
+def export_xlsx(store, site, columns, output_file, sheet_name='Products'):
+    """Будує Excel файл у режимі write-only і атомарно замінює попередній"""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_name)
+
+    for index, (_, width) in enumerate(columns):
+        ws.column_dimensions[get_column_letter(index + 1)].width = width
+
+    names = [name for name, _ in columns]
+    ws.append(header_cells(ws, names))
+
+    count = 0
+    for row in product_rows(store, site, names):
+        ws.append(row)
+        count += 1
+
+    tmp_file = f'{output_file}.{os.getpid()}.tmp'
+    wb.save(tmp_file)
+    os.replace(tmp_file, output_file)
+    return count
+
+
+def export_csv(store, site, columns, output_file):
+    """Записує CSV (UTF-8 з BOM, щоб Excel правильно показав кирилицю)"""
+    names = [name for name, _ in columns]
+    count = 0
+
+    tmp_file = f'{output_file}.{os.getpid()}.tmp'
+    with open(tmp_file, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        for row in product_rows(store, site, names):
+            writer.writerow(row)
+            count += 1
+    os.replace(tmp_file, output_file)
+    return count
+
+
+def export_parquet(store, site, columns, output_file, batch_size=1000):
+    """Записує Parquet пакетами (потрібен pyarrow)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Для експорту в Parquet встановіть pyarrow: pip install pyarrow")
+
+    names = [name for name, _ in columns]
+    schema = pa.schema([(name, pa.string()) for name in names])
+    count = 0
+
+    def write_batch(writer, batch):
+        arrays = [pa.array([None if row[i] is None else str(row[i]) for row in batch], pa.string())
+                  for i in range(len(names))]
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+    tmp_file = f'{output_file}.{os.getpid()}.tmp'
+    with pq.ParquetWriter(tmp_file, schema) as writer:
+        batch = []
+        for row in product_rows(store, site, names):
+            batch.append(row)
+            count += 1
+            if len(batch) >= batch_size:
+                write_batch(writer, batch)
+                batch = []
+        if batch or not count:
+            write_batch(writer, batch)
+    os.replace(tmp_file, output_file)
+    return count
+
+
+EXPORTERS = {
+    'xlsx': export_xlsx,
+    'csv': export_csv,
+    'parquet': export_parquet,
+}
+
+
+def export(store, site, columns, output_file):
+    """Експортує товари сайту у формат за розширенням файлу"""
+    extension = os.path.splitext(output_file)[1].lstrip('.').lower()
+    if extension not in EXPORTERS:
+        raise ValueError(f"Невідомий формат експорту '{extension}'")
+
+    count = EXPORTERS[extension](store, site, columns, output_file)
+    print(f"   ✅ Файл збережено: {output_file} ({count} рядків)")
+    return count
+
+
+def site_columns(site, with_meta=False, with_images=False):
+    """
+    Колонки парсера сайту (для CSV/Parquet можна додати URL і час парсингу,
+    with_images - шляхи завантажених картинок поруч з їх URL)
+    """
+    module_name, class_name, _ = SITES[site]
+    parser_class = getattr(importlib.import_module(module_name), class_name)
+    columns = list(parser_class.COLUMNS)
+    if with_images:
+        columns = with_image_paths(columns, parser_class.IMAGE_COLUMNS)
+    if with_meta:
+        columns += [(URL_COLUMN, 60), (SCRAPED_AT_COLUMN, 20)]
+    return columns
+
+
+def main():
+    """Головна функція"""
+    parser = argparse.ArgumentParser(description="Експорт товарів зі сховища")
+    parser.add_argument('sites', nargs='+', choices=sorted(SITES))
+    parser.add_argument('--formats', nargs='+', choices=sorted(EXPORTERS), default=['xlsx'])
+    parser.add_argument('--store', default='products.sqlite')
+    parser.add_argument('--with-meta', action='store_true',
+                        help="додати колонки URL і Scraped at (окрім xlsx)")
+    parser.add_argument('--with-images', action='store_true',
+                        help="додати колонки з локальними шляхами завантажених картинок")
+    args = parser.parse_args()
+
+    store = ProductStore(args.store)
+    try:
+        for site in args.sites:
+            base = os.path.splitext(SITES[site][2])[0]
+            for file_format in args.formats:
+                columns = site_columns(site, with_meta=args.with_meta and file_format != 'xlsx',
+                                       with_images=args.with_images)
+                export(store, site, columns, f"{base}.{file_format}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
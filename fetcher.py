@@ -0,0 +1,114 @@
+"""
+Шар завантаження сторінок
+Кожен тип сторінки може завантажуватись через браузер або звичайним HTTP запитом
+(спільна keep-alive сесія з пулом з'єднань і gzip)
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from page_cache import CacheMiss
+from run_metrics import RunMetrics
+
+BROWSER = 'browser'
+HTTP = 'http'
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+
+class PageFetcher:
+    def __init__(self, modes=None, timeout=20, pool_size=10, headers=None, cache=None, cache_only=False,
+                 metrics=None, pace=None):
+        """
+        modes - словник {тип сторінки: 'http' або 'browser'},
+        типи без налаштування завантажуються браузером
+        cache - PageCache, що перевіряється перед завантаженням (закривається разом з fetcher)
+        cache_only - повтор лише з кешу, без браузера та мережі
+        metrics - RunMetrics парсера (час HTTP запитів, сторінки, байти, влучання в кеш)
+        pace - функція (URL), що чекає дозволу ліміту запитів до хоста (None - без ліміту);
+        сторінки з кешу її не чекають
+        """
+        if cache_only and cache is None:
+            raise ValueError("Режим cache_only потребує кешу сторінок")
+
+        self.modes = dict(modes or {})
+        self.cache = cache
+        self.cache_only = cache_only
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.headers = dict(headers or DEFAULT_HEADERS)
+        self.metrics = metrics or RunMetrics(None, enabled=False)
+        self.pace = pace
+        self.session = None
+
+        for page_type, mode in self.modes.items():
+            if mode not in (BROWSER, HTTP):
+                raise ValueError(f"Невідомий режим завантаження '{mode}' для '{page_type}'")
+
+    def mode_for(self, page_type):
+        """Повертає режим завантаження для типу сторінки"""
+        return self.modes.get(page_type, BROWSER)
+
+    def get_session(self):
+        """Створює спільну HTTP сесію при першому зверненні"""
+        if self.session is None:
+            self.session = requests.Session()
+            self.session.headers.update(self.headers)
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            self.session.mount('http://', adapter)
+            self.session.mount('https://', adapter)
+        return self.session
+
+    def http_get(self, url):
+        """Завантажує сторінку без браузера та повертає HTML"""
+        with self.metrics.timer('http'):
+            response = self.get_session().get(url, timeout=self.timeout)
+        response.raise_for_status()
+        self.metrics.count('bytes', len(response.content), source='http')
+
+        # Без charset у заголовках requests підставляє ISO-8859-1
+        if response.encoding is None or response.encoding.lower() == 'iso-8859-1':
+            response.encoding = response.apparent_encoding
+        return response.text
+
+    def fetch(self, url, page_type, browser_get, cacheable=None):
+        """
+        Повертає HTML сторінки згідно з режимом для її типу
+        browser_get - функція без аргументів, що завантажує сторінку в браузері
+        cacheable - функція без аргументів: чи можна кешувати щойно завантажену сторінку
+        (напр. список, завантажений не повністю, у кеш не потрапляє)
+        """
+        mode = self.mode_for(page_type)
+
+        if self.cache is not None:
+            html = self.cache.find(url, mode, replay=self.cache_only)
+            if html is not None:
+                self.metrics.count('cache_hits', type=page_type)
+                return html
+        if self.cache_only:
+            raise CacheMiss(f"Сторінки немає в кеші: {url}")
+
+        if mode == HTTP:
+            if self.pace is not None:
+                self.pace(url)
+            html = self.http_get(url)
+            self.metrics.count('pages', type=page_type, mode=HTTP)
+        else:
+            html = browser_get()
+
+        if self.cache is not None and (cacheable is None or cacheable()):
+            self.cache.put(url, mode, html)
+        return html
+
+    def close(self):
+        """Закриває HTTP сесію та кеш"""
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
@@ -0,0 +1,44 @@
+"""
+Розбір HTML для екстракторів
+Швидкий бекенд lxml (якщо встановлений) і розбір лише потрібних піддерев (SoupStrainer)
+"""
+
+from bs4 import BeautifulSoup, SoupStrainer
+import importlib.util
+import re
+
+BACKEND = 'lxml' if importlib.util.find_spec('lxml') is not None else 'html.parser'
+
+# False - повний розбір через html.parser, як раніше (для перевірки еквівалентності)
+FAST = True
+
+
+def class_strainer(name, *css_classes):
+    """
+    Фільтр тегів name з будь-яким із CSS класів.
+    Під час розбору атрибут class ще не розбитий на слова, тому порівнюємо регуляркою
+    """
+    words = '|'.join(re.escape(css_class) for css_class in css_classes)
+    return SoupStrainer(name, class_=re.compile(r'(?:^|\s)(?:' + words + r')(?:\s|$)'))
+
+
+class AnyOfStrainer(SoupStrainer):
+    """Пропускає тег, якщо його пропускає хоча б один із вкладених фільтрів"""
+
+    def __init__(self, *strainers):
+        super().__init__()
+        self.strainers = strainers
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return any(strainer.allow_tag_creation(nsprefix, name, attrs) for strainer in self.strainers)
+
+    def allow_string_creation(self, string):
+        # Текст поза потрібними тегами не зберігаємо
+        return False
+
+
+def make_soup(html, parse_only=None):
+    """Будує дерево лише з потрібних піддерев сторінки"""
+    if not FAST:
+        return BeautifulSoup(html, 'html.parser')
+    return BeautifulSoup(html, BACKEND, parse_only=parse_only)
@@ -0,0 +1,186 @@
+"""
+Завантаження картинок товарів
+URL картинок із записаних рядків потоково передаються у фоновий завантажувач
+з обмеженою чергою (запис рядків чекає, якщо завантаження не встигають)
+та лімітами на хост і частоту запитів (AsyncCrawlEngine)
+Дублікати відкидаються за URL і за хешем вмісту: файл зберігається атомарно як
+<тека>/<сайт>/<sha1[:2]>/<sha1><розширення>, тож однакові картинки - один файл
+Завантажені URL записуються у сховище товарів; при запуску докачуються картинки
+вже збережених товарів, яких ще немає на диску
+"""
+
+from urllib.parse import urlparse
+import threading
+import hashlib
+import asyncio
+import queue
+import uuid
+import os
+from crawl_engine import AsyncCrawlEngine
+from run_metrics import RunMetrics
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif', '.svg', '.bmp')
+
+
+def image_extension(url, content):
+    """Розширення файлу за сигнатурою вмісту, інакше - за URL"""
+    if content.startswith(b'\xff\xd8\xff'):
+        return '.jpg'
+    if content.startswith(b'\x89PNG'):
+        return '.png'
+    if content.startswith(b'GIF8'):
+        return '.gif'
+    if content.startswith(b'RIFF') and content[8:12] == b'WEBP':
+        return '.webp'
+
+    extension = os.path.splitext(urlparse(url).path)[1].lower()
+    return extension if extension in IMAGE_EXTENSIONS else '.bin'
+
+
+class ImageDownloader:
+    def __init__(self, store, site, images_dir='images', columns=(), concurrency_per_host=4,
+                 rate_limit=5.0, max_in_flight=16, queue_size=1000, metrics=None):
+        """
+        store / site - сховище товарів і ключ сайту (облік завантажених картинок)
+        images_dir - коренева тека картинок, файли сайту - у images_dir/<сайт>
+        columns - колонки рядка з URL картинок (для докачування збережених товарів)
+        concurrency_per_host / rate_limit - одночасних запитів і запитів/с на хост
+        max_in_flight - максимум одночасних завантажень; queue_size - місткість черги URL
+        """
+        self.store = store
+        self.site = site
+        self.site_dir = os.path.join(images_dir, site)
+        self.columns = tuple(columns)
+        self.max_in_flight = max_in_flight
+        self.metrics = metrics or RunMetrics(site, enabled=False)
+        self.engine = AsyncCrawlEngine(default_rate=rate_limit, concurrency_per_host=concurrency_per_host)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.seen = set()
+        self.stopping = False
+        self.thread = None
+        self.stats = {'downloaded': 0, 'duplicates': 0, 'failed': 0}
+
+    def start(self):
+        """Запускає завантажувач у фоновому потоці"""
+        self.seen = set(self.store.image_paths(self.site))
+        self.thread = threading.Thread(target=asyncio.run, args=(self.run(),), daemon=True)
+        self.thread.start()
+        return self
+
+    def claim(self, url):
+        """Чи URL картинки ще не завантажений і не в черзі (позначає його зайнятим)"""
+        if not url or not isinstance(url, str) or not url.startswith('http'):
+            return False
+        with self.lock:
+            if url in self.seen:
+                return False
+            self.seen.add(url)
+            return True
+
+    def submit(self, urls):
+        """
+        Ставить URL картинок у чергу (чекає, якщо черга заповнена)
+        Після зупинки URL не приймаються - вони докачаються наступного запуску
+        """
+        if self.thread is None:
+            return
+        for url in urls:
+            if self.claim(url):
+                self.queue.put(url)
+
+    def missing_urls(self):
+        """URL картинок збережених товарів сайту, яких ще немає на диску"""
+        for _, data, _ in self.store.iter_products(self.site):
+            for column in self.columns:
+                url = data.get(column)
+                if self.claim(url):
+                    yield url
+
+    async def run(self):
+        """Цикл завантаження: спершу докачування, далі URL з черги до сигналу зупинки"""
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.max_in_flight)
+        tasks = set()
+
+        async def spawn(url):
+            await slots.acquire()
+            task = asyncio.create_task(self.download(url))
+            tasks.add(task)
+            task.add_done_callback(lambda done: (tasks.discard(done), slots.release()))
+
+        async with self.engine:
+            for url in self.missing_urls():
+                if self.stopping:
+                    break
+                await spawn(url)
+
+            while True:
+                url = await loop.run_in_executor(None, self.queue.get)
+                if url is None:
+                    break
+                # Після close черга лише вичерпується - решта докачається наступного запуску
+                if not self.stopping:
+                    await spawn(url)
+
+            if tasks:
+                await asyncio.gather(*tasks)
+
+    async def download(self, url):
+        """Завантажує одну картинку і записує її у файл за хешем вмісту"""
+        try:
+            with self.metrics.timer('image_download'):
+                content = await self.engine.fetch_remote(url, binary=True)
+        except Exception as e:
+            self.stats['failed'] += 1
+            self.metrics.count('images', status='failed')
+            print(f"⚠️ Не вдалось завантажити картинку {url}: {e}")
+            return
+
+        sha1 = hashlib.sha1(content).hexdigest()
+        path = os.path.join(self.site_dir, sha1[:2], sha1 + image_extension(url, content))
+
+        if os.path.exists(path):
+            self.stats['duplicates'] += 1
+            self.metrics.count('images', status='duplicate')
+        else:
+            await asyncio.get_running_loop().run_in_executor(None, self.write_file, path, content)
+            self.stats['downloaded'] += 1
+            self.metrics.count('images', status='downloaded')
+            self.metrics.count('bytes', len(content), source='images')
+
+        self.store.record_image(self.site, url, path, sha1, len(content))
+
+    def write_file(self, path, content):
+        """Атомарний запис файлу (тимчасовий файл поруч + os.replace)"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_file = f'{path}.{uuid.uuid4().hex}.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_file, path)
+
+    def stop(self):
+        """Сигнал зупинки і очікування фонового потоку"""
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.thread = None
+
+    def finish(self):
+        """Чекає завантаження всіх URL з черги; повертає кількість нових записів про картинки"""
+        if self.thread is None:
+            return 0
+        self.stop()
+        self.report()
+        return self.stats['downloaded'] + self.stats['duplicates']
+
+    def close(self):
+        """Зупиняє завантажувач, не докачуючи чергу (незавантажене докачається наступного запуску)"""
+        self.stopping = True
+        self.stop()
+
+    def report(self):
+        """Друкує підсумок завантаження"""
+        print(f"🖼️ Картинки: {self.stats['downloaded']} завантажено, {self.stats['duplicates']} дублікатів, "
+              f"{self.stats['failed']} помилок → {self.site_dir}")
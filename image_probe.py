@@ -0,0 +1,187 @@
+"""
+Перевірка URL картинок товарів перед записом
+Кожен URL перевіряється одним невеликим Range запитом (перші кілька КБ файлу)
+паралельно з лімітами на хост (AsyncCrawlEngine); розмір у пікселях читається
+із заголовка файлу (JPEG, PNG, GIF, WebP) без завантаження картинки
+Недоступний URL (напр. вгадана збільшена версія, якої немає - 404) замінюється
+першим доступним запасним варіантом; результати кешуються у сховищі за URL
+"""
+
+import threading
+import asyncio
+import struct
+from crawl_engine import AsyncCrawlEngine
+from run_metrics import RunMetrics
+
+# Маркери JPEG з розміром кадру (SOF), крім DHT, JPG і DAC
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def jpeg_size(data):
+    """(ширина, висота) з маркера SOF JPEG або None, якщо його немає в data"""
+    index = 2
+    while index + 9 <= len(data):
+        if data[index] != 0xFF:
+            return None
+        marker = data[index + 1]
+        if marker == 0xFF:
+            index += 1
+            continue
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack('>HH', data[index + 5:index + 9])
+            return width, height
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            index += 2
+            continue
+        index += 2 + struct.unpack('>H', data[index + 2:index + 4])[0]
+    return None
+
+
+def image_size(data):
+    """(ширина, висота) картинки з перших байтів файлу або None для невідомого формату"""
+    if data.startswith(b'\xff\xd8'):
+        return jpeg_size(data)
+    if data.startswith(b'\x89PNG\r\n\x1a\n') and data[12:16] == b'IHDR':
+        return struct.unpack('>II', data[16:24])
+    if data[:6] in (b'GIF87a', b'GIF89a') and len(data) >= 10:
+        return struct.unpack('<HH', data[6:10])
+    if data.startswith(b'RIFF') and data[8:12] == b'WEBP' and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b'VP8 ':
+            width, height = struct.unpack('<HH', data[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        if chunk == b'VP8L':
+            bits = int.from_bytes(data[21:25], 'little')
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b'VP8X':
+            return int.from_bytes(data[24:27], 'little') + 1, int.from_bytes(data[27:30], 'little') + 1
+    return None
+
+
+def image_candidates(url, fallbacks):
+    """URL і запасні варіанти за парами замін (що, на що) у порядку перевірки"""
+    candidates = [url]
+    for old, new in fallbacks:
+        if old in url and url.replace(old, new) not in candidates:
+            candidates.append(url.replace(old, new))
+    return candidates
+
+
+def probe_ok(result):
+    """Чи результат перевірки - доступна картинка"""
+    status, width, _, content_type = result
+    return 200 <= status < 300 and (width is not None or content_type.startswith('image/'))
+
+
+class ImageProbe:
+    def __init__(self, store, concurrency_per_host=4, rate_limit=5.0, header_bytes=32768, metrics=None):
+        """
+        store - сховище товарів (кеш результатів перевірки за URL)
+        concurrency_per_host / rate_limit - одночасних запитів і запитів/с на хост
+        header_bytes - скільки перших байтів файлу запитувати для читання розміру
+        """
+        self.store = store
+        self.header_bytes = header_bytes
+        self.metrics = metrics or RunMetrics(None, enabled=False)
+        self.engine = AsyncCrawlEngine(default_rate=rate_limit, concurrency_per_host=concurrency_per_host)
+        self.loop = None
+        self.thread = None
+        self.stats = {'checked': 0, 'cached': 0, 'replaced': 0, 'missing': 0, 'failed': 0}
+
+    def start(self):
+        """Запускає цикл подій перевірки у фоновому потоці"""
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.call(self.engine.__aenter__())
+        return self
+
+    def call(self, coroutine):
+        """Виконує корутину в циклі подій перевірки і чекає результат (з будь-якого потоку)"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def verify_rows(self, rows, columns, fallbacks=()):
+        """
+        Перевіряє URL картинок у колонках columns пакета рядків (змінює рядки на місці):
+        недоступний URL замінюється першим доступним запасним, інакше лишається як був
+        """
+        candidates = {}
+        for row in rows:
+            for column in columns:
+                url = row.get(column)
+                if url and isinstance(url, str) and url.startswith('http'):
+                    candidates[url] = image_candidates(url, fallbacks)
+        if not candidates:
+            return
+
+        resolved = self.call(self.resolve_all(candidates))
+        for row in rows:
+            for column in columns:
+                url = row.get(column)
+                if url in resolved:
+                    row[column] = resolved[url]
+
+    async def resolve_all(self, candidates):
+        """{URL: перший доступний варіант} для всіх URL паралельно; однаковий URL перевіряється раз"""
+        known = self.store.image_probes({url for urls in candidates.values() for url in urls})
+        self.stats['cached'] += len(known)
+        probes = {}
+
+        async def check(url):
+            if url in known:
+                return known[url]
+            if url not in probes:
+                probes[url] = asyncio.ensure_future(self.probe(url))
+            return await probes[url]
+
+        async def resolve(url):
+            for candidate in candidates[url]:
+                result = await check(candidate)
+                if result is not None and probe_ok(result):
+                    if candidate != url:
+                        self.stats['replaced'] += 1
+                        self.metrics.count('image_probes', result='replaced')
+                    return url, candidate
+            self.stats['missing'] += 1
+            self.metrics.count('image_probes', result='missing')
+            print(f"⚠️ Картинка недоступна: {url}")
+            return url, url
+
+        return dict(await asyncio.gather(*(resolve(url) for url in candidates)))
+
+    async def probe(self, url):
+        """Range запит початку файлу: (статус, ширина, висота, Content-Type) або None при збої мережі"""
+        try:
+            with self.metrics.timer('image_probe'):
+                status, content_type, data = await self.engine.fetch_range(url, self.header_bytes)
+        except Exception as e:
+            # Тимчасові збої не кешуються - URL перевіриться наступного запуску
+            self.stats['failed'] += 1
+            self.metrics.count('image_probes', result='failed')
+            print(f"⚠️ Не вдалось перевірити картинку {url}: {e}")
+            return None
+
+        width, height = image_size(data) or (None, None)
+        self.stats['checked'] += 1
+        self.metrics.count('image_probes', result='checked')
+        self.metrics.count('bytes', len(data), source='image_probe')
+        self.store.record_probe(url, status, width, height, content_type)
+        return status, width, height, content_type
+
+    def close(self):
+        """Закриває з'єднання і зупиняє цикл подій"""
+        if self.loop is None:
+            return
+        self.call(self.engine.__aexit__(None, None, None))
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.loop = None
+        self.thread = None
+        self.report()
+
+    def report(self):
+        """Друкує підсумок перевірки"""
+        print(f"🔎 Картинки: {self.stats['checked']} перевірено, {self.stats['cached']} з кешу, "
+              f"{self.stats['replaced']} замінено запасними, {self.stats['missing']} недоступні, "
+              f"{self.stats['failed']} помилок")
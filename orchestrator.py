@@ -0,0 +1,308 @@
+"""
+Паралельний запуск парсерів кількох сайтів
+Кожен сайт парситься окремим процесом за конфігурацією (sites.json): ціль парсингу
+(categories / main_url / catalog_url) і параметри конструктора парсера.
+Процеси запускаються в межах загального бюджету процесів і браузерів, вивід кожного
+пишеться у logs/<сайт>.log, а прогрес усіх сайтів зводиться в один рядок стану.
+З 'frontier' (файл UrlFrontier) сайт пише знайдені товари у спільну чергу, а
+'frontier_workers' додаткових процесів <сайт>-N обробляють товари з неї (crawl_frontier)
+Запуск: python orchestrator.py --config sites.json --max-browsers 8
+"""
+
+from contextlib import redirect_stdout, redirect_stderr
+import multiprocessing
+import threading
+import argparse
+import importlib
+import queue
+import time
+import json
+import sys
+import os
+from exporter import SITES
+from url_frontier import UrlFrontier
+
+# Сайт: ключ конфігурації з ціллю парсингу (аргумент parse_all)
+TARGETS = {
+    'topovi': 'categories',
+    'ascale': 'main_url',
+    'sapienstone': 'catalog_url',
+}
+
+STATUS_ICONS = {'waiting': '⏳', 'running': '🔄', 'done': '✅', 'stopped': '⏸️', 'failed': '❌'}
+
+
+def load_config(path):
+    """Читає конфігурацію сайтів і перевіряє, що для кожного вказана ціль парсингу"""
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    for site, site_config in config.get('sites', {}).items():
+        if site not in TARGETS:
+            raise ValueError(f"Невідомий сайт '{site}' у {path}")
+        if TARGETS[site] not in site_config:
+            raise ValueError(f"Для сайту '{site}' не вказано '{TARGETS[site]}' у {path}")
+        if site_config.get('frontier_workers') and not site_config.get('frontier'):
+            raise ValueError(f"Для frontier_workers сайту '{site}' потрібен 'frontier' у {path}")
+    return config
+
+
+def browsers_needed(site_config):
+    """
+    Скільки браузерів може тримати процес сайту: 'browsers' з конфігурації або
+    по одному на воркера (удвічі більше з warm_standby)
+    """
+    if 'browsers' in site_config:
+        return site_config['browsers']
+    options = site_config.get('options', {})
+    return options.get('workers', 1) * (2 if options.get('warm_standby') else 1)
+
+
+def fit_budget(site_config, max_browsers):
+    """
+    Зменшує кількість воркерів (і вимикає резервні браузери), якщо сайт сам по собі
+    перевищує бюджет браузерів; повертає (конфігурація, браузерів)
+    """
+    needed = browsers_needed(site_config)
+    if needed <= max_browsers:
+        return site_config, needed
+
+    options = dict(site_config.get('options', {}))
+    if 'browsers' not in site_config:
+        per_worker = 2 if options.get('warm_standby') else 1
+        if max_browsers < per_worker:
+            options['warm_standby'] = False
+            per_worker = 1
+        options['workers'] = max(1, max_browsers // per_worker)
+    return dict(site_config, options=options), min(needed, max_browsers)
+
+
+def run_site(job, site, site_config, mode, log_file, events, interval):
+    """
+    Процес сайту: парсинг з виводом у журнал і періодичними подіями прогресу
+    job - ім'я процесу в подіях; mode 'frontier' - лише обробка спільної черги
+    """
+    os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+    summary = {'status': 'failed', 'products': 0, 'pages': 0, 'errors': 0, 'dead': 0, 'error': None}
+    started = time.time()
+
+    with open(log_file, 'a', encoding='utf-8', buffering=1) as log, redirect_stdout(log), redirect_stderr(log):
+        parser = None
+        reporter = None
+        stop_reporting = threading.Event()
+        try:
+            module_name, class_name, _ = SITES[site]
+            parser_class = getattr(importlib.import_module(module_name), class_name)
+            options = dict(site_config.get('options', {}))
+            if site_config.get('frontier'):
+                options['frontier'] = UrlFrontier(site_config['frontier'])
+            parser = parser_class(**options)
+            already_processed = len(parser.processed_urls)
+
+            def progress():
+                return {
+                    'products': len(parser.processed_urls) - already_processed,
+                    'pages': parser.metrics.total('pages'),
+                    'errors': parser.metrics.total('errors'),
+                    'dead': parser.metrics.total('dead_products'),
+                }
+
+            def report():
+                while not stop_reporting.wait(interval):
+                    events.put(('progress', job, progress()))
+
+            reporter = threading.Thread(target=report, daemon=True)
+            reporter.start()
+            if mode == 'frontier':
+                parser.crawl_frontier(idle_timeout=site_config.get('frontier_idle', 60))
+            elif mode == 'async':
+                parser.parse_all_async(site_config[TARGETS[site]])
+            else:
+                parser.parse_all(site_config[TARGETS[site]])
+            summary['status'] = 'done'
+
+        except KeyboardInterrupt:
+            print("\n\n⏸️ Парсинг зупинено")
+            summary['status'] = 'stopped'
+        except Exception as e:
+            print(f"\n❌ Критична помилка: {e}")
+            import traceback
+            traceback.print_exc()
+            summary['error'] = str(e)
+        finally:
+            stop_reporting.set()
+            if reporter is not None:
+                reporter.join()
+            if parser is not None:
+                try:
+                    parser.save_progress()
+                    parser.close()
+                except Exception as e:
+                    print(f"❌ Помилка закриття парсера: {e}")
+                summary.update(progress())
+            summary['seconds'] = round(time.time() - started, 1)
+            if parser is not None and parser.frontier is not None:
+                parser.frontier.close()
+            events.put(('finished', job, summary))
+
+
+class Orchestrator:
+    def __init__(self, config, sites=None, mode='pool', max_processes=None, max_browsers=None,
+                 logs_dir='logs', interval=5.0):
+        """
+        config - словник конфігурації (load_config); sites - підмножина сайтів (None - усі)
+        mode - 'pool' (parse_all) або 'async' (parse_all_async)
+        max_processes / max_browsers - загальний бюджет одночасних процесів і браузерів
+        (за замовчуванням з конфігурації, інакше кількість ядер і без обмеження браузерів)
+        interval - як часто процеси надсилають прогрес і друкується рядок стану, с
+        """
+        self.mode = mode
+        self.max_processes = max_processes or config.get('max_processes') or os.cpu_count() or 1
+        self.max_browsers = max_browsers or config.get('max_browsers') or float('inf')
+        self.logs_dir = logs_dir
+        self.interval = interval
+        self.context = multiprocessing.get_context('spawn')
+        self.events = self.context.Queue()
+
+        # Процеси: (ім'я, сайт, конфігурація, браузерів, режим)
+        self.pending = []
+        for site, site_config in config['sites'].items():
+            if sites and site not in sites:
+                continue
+            site_config, browsers = fit_budget(site_config, self.max_browsers)
+            self.pending.append((site, site, site_config, browsers, mode))
+            for number in range(1, site_config.get('frontier_workers', 0) + 1):
+                job = f'{site}-{number}'
+                # Власні файли прогресу і метрик, щоб процеси не писали в один журнал
+                worker_config = dict(site_config, options=dict(site_config.get('options', {}),
+                                                               progress_file=f'progress_{job}.json',
+                                                               worker=job))
+                self.pending.append((job, site, worker_config, browsers, 'frontier'))
+
+        self.running = {}
+        self.state = {job: {'status': 'waiting', 'products': 0, 'pages': 0, 'errors': 0, 'dead': 0}
+                      for job, _, _, _, _ in self.pending}
+        self.started = None
+        self.stopping = False
+
+    def browsers_in_use(self):
+        """Браузерів, зарезервованих запущеними процесами"""
+        return sum(browsers for _, browsers in self.running.values())
+
+    def launch_ready(self):
+        """Запускає сайти з черги, доки вистачає бюджету процесів і браузерів"""
+        for item in list(self.pending):
+            if self.stopping or len(self.running) >= self.max_processes:
+                return
+            job, site, site_config, browsers, mode = item
+            if self.browsers_in_use() + browsers > self.max_browsers:
+                continue
+
+            log_file = os.path.join(self.logs_dir, f'{job}.log')
+            process = self.context.Process(target=run_site, name=f'parser-{job}',
+                                           args=(job, site, site_config, mode, log_file,
+                                                 self.events, self.interval))
+            process.start()
+            self.pending.remove(item)
+            self.running[job] = (process, browsers)
+            self.state[job].update(status='running', log=log_file, started=time.time())
+            print(f"🚀 {job}: запущено (браузерів: {browsers}, журнал: {log_file})")
+
+    def handle(self, event):
+        """Оновлює стан сайту за подією процесу"""
+        kind, job, data = event
+        self.state[job].update(data)
+        if kind == 'finished':
+            process, _ = self.running.pop(job)
+            process.join()
+            print(f"{STATUS_ICONS[data['status']]} {job}: {data['products']} товарів "
+                  f"за {data['seconds']:.0f} с")
+
+    def reap_crashed(self):
+        """Процеси, що завершились без підсумку (напр. вбиті ззовні), вважаються невдалими"""
+        for job, (process, _) in list(self.running.items()):
+            if not process.is_alive() and process.exitcode not in (0, None):
+                self.running.pop(job)
+                self.state[job].update(status='failed', error=f"код виходу {process.exitcode}",
+                                       seconds=round(time.time() - self.state[job]['started'], 1))
+                print(f"❌ {job}: процес завершився з кодом {process.exitcode}")
+
+    def status_line(self):
+        """Зведений рядок прогресу всіх сайтів"""
+        elapsed = int(time.time() - self.started)
+        parts = [f"{STATUS_ICONS[state['status']]} {job}: {state['products']} тов., "
+                 f"{state['pages']} стор., {state['errors']} пом."
+                 for job, state in self.state.items()]
+        return f"⏱️ {elapsed // 60:02d}:{elapsed % 60:02d} | " + ' | '.join(parts)
+
+    def run(self):
+        """Запускає всі сайти і чекає їх завершення; повертає стан сайтів"""
+        self.started = time.time()
+        last_status = 0.0
+        browsers = 'без обмеження' if self.max_browsers == float('inf') else self.max_browsers
+        print(f"🌐 Процесів: {len(self.pending)}, одночасно: {self.max_processes}, браузерів: {browsers}")
+
+        while self.pending or self.running:
+            try:
+                self.launch_ready()
+                if not self.running:
+                    # Нічого не запущено і нічого не вміщується в бюджет
+                    break
+                try:
+                    self.handle(self.events.get(timeout=1.0))
+                except queue.Empty:
+                    self.reap_crashed()
+                if time.time() - last_status >= self.interval:
+                    print(self.status_line(), flush=True)
+                    last_status = time.time()
+            except KeyboardInterrupt:
+                # Процеси сайтів отримують той самий сигнал і самі зберігають прогрес
+                print("\n⏸️ Зупинка: чекаємо збереження прогресу сайтів...")
+                self.stopping = True
+                self.pending = []
+
+        return self.state
+
+    def report(self):
+        """Друкує підсумок запуску, повертає код виходу (1 - якщо хоч один сайт не завершився)"""
+        wall = time.time() - self.started
+        print(f"\n{'=' * 60}")
+        print(f"📊 Підсумок за {wall:.0f} с")
+        print(f"{'=' * 60}")
+        for job, state in self.state.items():
+            print(f"{STATUS_ICONS[state['status']]} {job:14} {state['products']:6} товарів "
+                  f"{state['pages']:6} сторінок {state['errors']:4} помилок "
+                  f"{state.get('seconds', 0):7.0f} с  {state.get('log', '')}")
+            if state.get('dead'):
+                print(f"   ☠️ остаточно невдалих товарів: {state['dead']} (python dead_letters.py {job.split('-')[0]})")
+            if state.get('error'):
+                print(f"   {state['error']}")
+
+        sequential = sum(state.get('seconds', 0) for state in self.state.values())
+        if sequential:
+            print(f"⏱️ Послідовно було б {sequential:.0f} с, паралельно - {wall:.0f} с")
+        return 0 if all(state['status'] == 'done' for state in self.state.values()) else 1
+
+
+def main():
+    """Головна функція"""
+    parser = argparse.ArgumentParser(description="Паралельний запуск парсерів сайтів")
+    parser.add_argument('--config', default='sites.json')
+    parser.add_argument('--sites', nargs='+', choices=sorted(TARGETS), help="лише ці сайти з конфігурації")
+    parser.add_argument('--mode', choices=['pool', 'async'], default='pool',
+                        help="pool - parse_all з пулом браузерів, async - parse_all_async")
+    parser.add_argument('--max-processes', type=int, help="одночасних процесів (за замовчуванням з конфігурації)")
+    parser.add_argument('--max-browsers', type=int, help="браузерів на всі процеси (за замовчуванням з конфігурації)")
+    parser.add_argument('--logs-dir', default='logs')
+    parser.add_argument('--interval', type=float, default=5.0, help="період рядка стану, с")
+    args = parser.parse_args()
+
+    orchestrator = Orchestrator(load_config(args.config), sites=args.sites, mode=args.mode,
+                                max_processes=args.max_processes, max_browsers=args.max_browsers,
+                                logs_dir=args.logs_dir, interval=args.interval)
+    orchestrator.run()
+    sys.exit(orchestrator.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Постійний кеш сторінок на диску
+Стиснений HTML за ключем (URL, режим завантаження) з часом завантаження,
+TTL та LRU витісненням у межах бюджету байтів
+"""
+
+import sqlite3
+import threading
+import time
+import zlib
+
+
+class CacheMiss(LookupError):
+    """Сторінки немає в кеші, а завантаження з мережі вимкнено"""
+
+
+class PageCache:
+    def __init__(self, path='page_cache.sqlite', ttl=7 * 24 * 3600, max_bytes=512 * 1024 * 1024,
+                 compression_level=6):
+        """
+        ttl - скільки секунд сторінка вважається свіжою (None - без обмеження)
+        max_bytes - бюджет на стиснені сторінки, найдавніше використані витісняються
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL,
+                body BLOB NOT NULL,
+                PRIMARY KEY (url, mode)
+            )
+        """)
+        self.conn.execute('CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at)')
+        self.conn.commit()
+        self.total_bytes = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+
+    def get(self, url, mode, ignore_ttl=False):
+        """Повертає HTML з кешу або None, якщо його немає чи він застарів"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT body, fetched_at FROM pages WHERE url = ? AND mode = ?', (url, mode)
+            ).fetchone()
+
+            now = time.time()
+            if row is None or (not ignore_ttl and self.ttl is not None and now - row[1] > self.ttl):
+                self.misses += 1
+                return None
+
+            self.conn.execute(
+                'UPDATE pages SET accessed_at = ? WHERE url = ? AND mode = ?', (now, url, mode)
+            )
+            self.conn.commit()
+            self.hits += 1
+
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    def find(self, url, mode, replay=False):
+        """
+        Пошук сторінки для завантажувача. У режимі replay TTL ігнорується
+        і підходить знімок, отриманий будь-яким режимом (спершу - тим самим)
+        """
+        if not replay:
+            return self.get(url, mode)
+
+        with self.lock:
+            modes = [row[0] for row in self.conn.execute('SELECT mode FROM pages WHERE url = ?', (url,))]
+        for candidate in sorted(modes, key=lambda m: m != mode):
+            html = self.get(url, candidate, ignore_ttl=True)
+            if html is not None:
+                return html
+
+        self.misses += 1
+        return None
+
+    def put(self, url, mode, html):
+        """Зберігає стиснений HTML сторінки"""
+        body = zlib.compress(html.encode('utf-8'), self.compression_level)
+        now = time.time()
+
+        with self.lock:
+            old = self.conn.execute(
+                'SELECT size FROM pages WHERE url = ? AND mode = ?', (url, mode)
+            ).fetchone()
+            self.conn.execute(
+                'INSERT OR REPLACE INTO pages (url, mode, fetched_at, accessed_at, size, body) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (url, mode, now, now, len(body), body)
+            )
+            self.total_bytes += len(body) - (old[0] if old else 0)
+            self.evict()
+            self.conn.commit()
+
+    def evict(self):
+        """Видаляє найдавніше використані сторінки, поки кеш не влізе в бюджет"""
+        while self.total_bytes > self.max_bytes:
+            rows = self.conn.execute(
+                'SELECT url, mode, size FROM pages ORDER BY accessed_at LIMIT 100'
+            ).fetchall()
+            if not rows:
+                break
+            for url, mode, size in rows:
+                if self.total_bytes <= self.max_bytes:
+                    break
+                self.conn.execute('DELETE FROM pages WHERE url = ? AND mode = ?', (url, mode))
+                self.total_bytes -= size
+
+    def close(self):
+        """Закриває базу кешу"""
+        with self.lock:
+            self.conn.close()
+        print(f"🗄️ Кеш сторінок: {self.hits} влучань, {self.misses} промахів, "
+              f"{self.total_bytes / 1024 / 1024:.1f} МБ")
@@ -0,0 +1,325 @@
+"""
+Спільне сховище товарів у SQLite
+Товари всіх сайтів за ключем (сайт, URL) з усіма полями та часом парсингу;
+пакетні upsert в одній транзакції, Excel/CSV/Parquet будуються з нього експортом
+Відбитки картки списку та даних товару дозволяють оновлювати лише змінене
+Завантажені картинки товарів - за URL з локальним шляхом і хешем вмісту,
+результати перевірки URL картинок (статус і розмір у пікселях) - за URL
+Невдалі товари (черга помилок) - з класом помилки, кількістю спроб і часом повтору
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+import json
+
+
+def fingerprint(data):
+    """Стабільний відбиток словника (порядок ключів не впливає)"""
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class ProductStore:
+    def __init__(self, path='products.sqlite'):
+        """path - файл бази, спільний для всіх парсерів"""
+        self.path = path
+        self.lock = threading.Lock()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS products (
+                site TEXT NOT NULL,
+                url TEXT NOT NULL,
+                data TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                scraped_at REAL NOT NULL,
+                changed_at REAL,
+                card_hash TEXT,
+                data_hash TEXT,
+                PRIMARY KEY (site, url)
+            )
+        """)
+        # Бази попередньої версії - без колонок відбитків
+        existing = {row[1] for row in self.conn.execute('PRAGMA table_info(products)')}
+        for column, column_type in (('changed_at', 'REAL'), ('card_hash', 'TEXT'), ('data_hash', 'TEXT')):
+            if column not in existing:
+                self.conn.execute(f'ALTER TABLE products ADD COLUMN {column} {column_type}')
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS catalogs (
+                site TEXT NOT NULL,
+                url TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                checked_at REAL NOT NULL,
+                urls TEXT,
+                PRIMARY KEY (site, url)
+            )
+        """)
+        # Бази попередньої версії - без списку URL товарів каталогу
+        if 'urls' not in {row[1] for row in self.conn.execute('PRAGMA table_info(catalogs)')}:
+            self.conn.execute('ALTER TABLE catalogs ADD COLUMN urls TEXT')
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS images (
+                site TEXT NOT NULL,
+                url TEXT NOT NULL,
+                path TEXT NOT NULL,
+                sha1 TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                downloaded_at REAL NOT NULL,
+                PRIMARY KEY (site, url)
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS image_probes (
+                url TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                width INTEGER,
+                height INTEGER,
+                content_type TEXT NOT NULL,
+                checked_at REAL NOT NULL
+            )
+        """)
+        # retry_at NULL - товар остаточно невдалий
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS failures (
+                site TEXT NOT NULL,
+                url TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                error_class TEXT NOT NULL,
+                error TEXT,
+                attempts INTEGER NOT NULL,
+                first_failed_at REAL NOT NULL,
+                failed_at REAL NOT NULL,
+                retry_at REAL,
+                PRIMARY KEY (site, url)
+            )
+        """)
+        self.conn.commit()
+
+    def upsert_many(self, site, products, scraped_at=None):
+        """
+        Зберігає пакет товарів однією транзакцією, повертає кількість змінених рядків
+        products - список (URL, словник полів, відбиток картки або None);
+        у товарів з тими самими даними оновлюються лише час парсингу та відбиток картки
+        """
+        now = scraped_at or time.time()
+        hashed = [(url, data, card_hash, fingerprint(data)) for url, data, card_hash in products]
+
+        with self.lock, self.conn:
+            known = {}
+            urls = [url for url, _, _, _ in hashed]
+            for start in range(0, len(urls), 500):
+                chunk = urls[start:start + 500]
+                known.update(self.conn.execute(
+                    f'SELECT url, data_hash FROM products WHERE site = ? AND url IN ({",".join("?" * len(chunk))})',
+                    [site] + chunk
+                ))
+
+            changed = [item for item in hashed if known.get(item[0]) != item[3]]
+            unchanged = [item for item in hashed if known.get(item[0]) == item[3]]
+
+            self.conn.executemany(
+                'INSERT INTO products (site, url, data, first_seen, scraped_at, changed_at, card_hash, data_hash) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (site, url) DO UPDATE SET data = excluded.data, scraped_at = excluded.scraped_at, '
+                'changed_at = excluded.changed_at, card_hash = excluded.card_hash, data_hash = excluded.data_hash',
+                [(site, url, json.dumps(data, ensure_ascii=False), now, now, now, card_hash, data_hash)
+                 for url, data, card_hash, data_hash in changed]
+            )
+            self.conn.executemany(
+                'UPDATE products SET scraped_at = ?, card_hash = ? WHERE site = ? AND url = ?',
+                [(now, card_hash, site, url) for url, _, card_hash, _ in unchanged]
+            )
+        return len(changed)
+
+    def fingerprints(self, site):
+        """Словник {URL: (відбиток картки, час останнього парсингу)} для товарів сайту"""
+        with self.lock:
+            return {url: (card_hash, scraped_at) for url, card_hash, scraped_at in self.conn.execute(
+                'SELECT url, card_hash, scraped_at FROM products WHERE site = ?', (site,)
+            )}
+
+    def catalog_size(self, site, url):
+        """Кількість товарів у каталозі за останнім повним обходом або None"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT size FROM catalogs WHERE site = ? AND url = ?', (site, url)
+            ).fetchone()
+        return row[0] if row else None
+
+    def catalog_urls(self, site, url):
+        """URL товарів каталогу за останнім повним обходом (порожня множина, якщо невідомі)"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT urls FROM catalogs WHERE site = ? AND url = ?', (site, url)
+            ).fetchone()
+        return set(json.loads(row[0])) if row and row[0] else set()
+
+    def record_catalog(self, site, url, size, urls=None):
+        """Запам'ятовує розмір каталогу та URL його товарів після повного обходу"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO catalogs (site, url, size, checked_at, urls) VALUES (?, ?, ?, ?, ?)',
+                (site, url, size, time.time(), json.dumps(urls) if urls is not None else None)
+            )
+
+    def record_image(self, site, url, path, sha1, size):
+        """Запам'ятовує завантажену картинку: локальний шлях, хеш і розмір вмісту"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO images (site, url, path, sha1, size, downloaded_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (site, url, path, sha1, size, time.time())
+            )
+
+    def image_paths(self, site):
+        """Словник {URL картинки: локальний шлях} для завантажених картинок сайту"""
+        with self.lock:
+            return dict(self.conn.execute('SELECT url, path FROM images WHERE site = ?', (site,)))
+
+    def record_probe(self, url, status, width, height, content_type):
+        """Запам'ятовує результат перевірки URL картинки: HTTP статус, розмір у пікселях, Content-Type"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO image_probes (url, status, width, height, content_type, checked_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (url, status, width, height, content_type, time.time())
+            )
+
+    def image_probes(self, urls):
+        """Словник {URL: (статус, ширина, висота, Content-Type)} для вже перевірених URL картинок"""
+        urls = list(urls)
+        probes = {}
+        with self.lock:
+            for start in range(0, len(urls), 500):
+                chunk = urls[start:start + 500]
+                for url, *result in self.conn.execute(
+                    f'SELECT url, status, width, height, content_type FROM image_probes '
+                    f'WHERE url IN ({",".join("?" * len(chunk))})', chunk
+                ):
+                    probes[url] = tuple(result)
+        return probes
+
+    def record_failure(self, site, url, payload, error_class, error, max_attempts, backoff):
+        """
+        Записує невдачу обробки товару з даними для повтору; повертає (кількість невдач, час повтору)
+        Повтор через backoff * 2^(невдач - 1) секунд; після max_attempts невдач час повтору None
+        """
+        now = time.time()
+        with self.lock, self.conn:
+            row = self.conn.execute(
+                'SELECT attempts, first_failed_at FROM failures WHERE site = ? AND url = ?', (site, url)
+            ).fetchone()
+            attempts, first_failed_at = (row[0] + 1, row[1]) if row else (1, now)
+            retry_at = None if attempts >= max_attempts else now + backoff * 2 ** (attempts - 1)
+            self.conn.execute(
+                'INSERT OR REPLACE INTO failures (site, url, payload, error_class, error, attempts, '
+                'first_failed_at, failed_at, retry_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (site, url, json.dumps(payload, ensure_ascii=False), error_class, error[:500], attempts,
+                 first_failed_at, now, retry_at)
+            )
+        return attempts, retry_at
+
+    def resolve_failures(self, site, urls):
+        """Прибирає товари з черги помилок (після успішного запису)"""
+        with self.lock, self.conn:
+            self.conn.executemany('DELETE FROM failures WHERE site = ? AND url = ?', [(site, url) for url in urls])
+
+    def due_failures(self, site, now):
+        """Невдалі товари, час повтору яких настав: список (URL, дані для повтору)"""
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT url, payload FROM failures WHERE site = ? AND retry_at <= ? ORDER BY retry_at',
+                (site, now)
+            ).fetchall()
+        return [(url, json.loads(payload)) for url, payload in rows]
+
+    def next_retry_at(self, site):
+        """Час найближчого повтору невдалих товарів сайту або None"""
+        with self.lock:
+            return self.conn.execute('SELECT MIN(retry_at) FROM failures WHERE site = ?', (site,)).fetchone()[0]
+
+    def dead_failures(self, site):
+        """Множина URL остаточно невдалих товарів сайту"""
+        with self.lock:
+            return {row[0] for row in self.conn.execute(
+                'SELECT url FROM failures WHERE site = ? AND retry_at IS NULL', (site,)
+            )}
+
+    def failure_counts(self, site):
+        """(чекають повтору, остаточно невдалі) для товарів сайту"""
+        with self.lock:
+            waiting, dead = self.conn.execute(
+                'SELECT COUNT(retry_at), COUNT(*) - COUNT(retry_at) FROM failures WHERE site = ?', (site,)
+            ).fetchone()
+        return waiting, dead
+
+    def failures(self, site):
+        """Невдалі товари сайту: (URL, клас помилки, помилка, невдач, час повтору)"""
+        with self.lock:
+            return self.conn.execute(
+                'SELECT url, error_class, error, attempts, retry_at FROM failures WHERE site = ? '
+                'ORDER BY retry_at IS NULL, retry_at, url', (site,)
+            ).fetchall()
+
+    def revive_failures(self, site):
+        """Повертає остаточно невдалі товари у чергу повторів з новим лічильником спроб"""
+        with self.lock, self.conn:
+            return self.conn.execute(
+                'UPDATE failures SET attempts = 0, retry_at = ? WHERE site = ? AND retry_at IS NULL',
+                (time.time(), site)
+            ).rowcount
+
+    def count(self, site):
+        """Кількість товарів сайту"""
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM products WHERE site = ?', (site,)).fetchone()[0]
+
+    def iter_products(self, site, batch_size=1000):
+        """Товари сайту в порядку першого запису: (URL, поля, час парсингу)"""
+        last_rowid = 0
+        while True:
+            with self.lock:
+                rows = self.conn.execute(
+                    'SELECT rowid, url, data, scraped_at FROM products '
+                    'WHERE site = ? AND rowid > ? ORDER BY rowid LIMIT ?',
+                    (site, last_rowid, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for rowid, url, data, scraped_at in rows:
+                yield url, json.loads(data), scraped_at
+            last_rowid = rows[-1][0]
+
+    def products_by_prefix(self, site, prefixes):
+        """Товари сайту, ключ яких починається з одного з prefixes: список (ключ, поля)"""
+        condition = ' OR '.join('substr(url, 1, ?) = ?' for _ in prefixes)
+        params = [value for prefix in prefixes for value in (len(prefix), prefix)]
+        with self.lock:
+            rows = self.conn.execute(
+                f'SELECT url, data FROM products WHERE site = ? AND ({condition})', [site] + params
+            ).fetchall()
+        return [(url, json.loads(data)) for url, data in rows]
+
+    def delete_products(self, site, urls):
+        """Видаляє товари сайту за ключами, повертає кількість видалених"""
+        with self.lock, self.conn:
+            return self.conn.executemany(
+                'DELETE FROM products WHERE site = ? AND url = ?', [(site, url) for url in urls]
+            ).rowcount
+
+    def delete_site(self, site):
+        """Видаляє всі товари сайту"""
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM products WHERE site = ?', (site,))
+            self.conn.execute('DELETE FROM catalogs WHERE site = ?', (site,))
+            self.conn.execute('DELETE FROM images WHERE site = ?', (site,))
+            self.conn.execute('DELETE FROM failures WHERE site = ?', (site,))
+
+    def close(self):
+        """Закриває базу"""
+        with self.lock:
+            self.conn.close()
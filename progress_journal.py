@@ -0,0 +1,95 @@
+"""
+Журнал прогресу парсингу
+Оброблені URL дописуються в кінець журналу (JSONL) пакетами з fsync,
+а знімок (файл прогресу у старому JSON форматі) періодично атомарно замінюється
+"""
+
+import os
+import json
+
+
+class ProgressJournal:
+    def __init__(self, snapshot_file, compact_every=1000):
+        """
+        snapshot_file - файл прогресу {'processed_urls': [...]}; існуючі файли
+        попередніх версій читаються як знімок, тож міграція відбувається сама
+        compact_every - після скількох записів у журналі переписувати знімок
+        """
+        self.snapshot_file = snapshot_file
+        self.journal_file = snapshot_file + '.journal'
+        self.compact_every = compact_every
+        self.urls = set()
+        self.pending = 0
+
+    def load(self):
+        """Відновлює множину оброблених URL зі знімка та журналу"""
+        self.urls = set()
+        if os.path.exists(self.snapshot_file):
+            try:
+                with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                    self.urls.update(json.load(f).get('processed_urls', []))
+            except (ValueError, OSError) as e:
+                print(f"⚠️ Не вдалось прочитати знімок прогресу: {e}")
+
+        self.pending = 0
+        if os.path.exists(self.journal_file):
+            self.truncate_torn_tail()
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        self.urls.add(json.loads(line)['url'])
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    self.pending += 1
+
+        return set(self.urls)
+
+    def truncate_torn_tail(self):
+        """Обрізає обірваний останній запис після аварійного завершення, щоб нові не злиплися з ним"""
+        with open(self.journal_file, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+
+    def append(self, urls):
+        """Дописує нові URL у журнал одним пакетом з fsync"""
+        new_urls = [url for url in dict.fromkeys(urls) if url not in self.urls]
+        if not new_urls:
+            return 0
+
+        with open(self.journal_file, 'a', encoding='utf-8') as f:
+            for url in new_urls:
+                f.write(json.dumps({'url': url}, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.urls.update(new_urls)
+        self.pending += len(new_urls)
+        if self.pending >= self.compact_every:
+            self.compact()
+        return len(new_urls)
+
+    def compact(self):
+        """Атомарно замінює знімок повною множиною URL і очищає журнал"""
+        if not self.pending and os.path.exists(self.snapshot_file):
+            return
+
+        tmp_file = self.snapshot_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'processed_urls': sorted(self.urls)}, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.snapshot_file)
+
+        # Журнал видаляємо лише після заміни знімка - його записи вже там
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+        self.pending = 0
+
+    def reset(self):
+        """Видаляє знімок і журнал"""
+        for path in (self.snapshot_file, self.journal_file):
+            if os.path.exists(path):
+                os.remove(path)
+        self.urls = set()
+        self.pending = 0
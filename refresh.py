@@ -0,0 +1,41 @@
+"""
+Інкрементальне оновлення вже зібраних товарів
+Детальна сторінка завантажується повторно лише для нових товарів, товарів зі зміненою
+карткою у списку або тих, що не оновлювались довше заданого віку
+"""
+
+import time
+from product_store import fingerprint
+
+
+class RefreshPolicy:
+    def __init__(self, store, site, max_age=None):
+        """
+        store / site - сховище товарів і ключ сайту з відбитками попереднього парсингу
+        max_age - через скільки секунд товар оновлюється навіть без змін у картці (None - ніколи)
+        """
+        self.max_age = max_age
+        self.known = store.fingerprints(site)
+        self.due = 0
+        self.skipped = 0
+
+    def is_current(self, product):
+        """Чи збережений товар актуальний: картка не змінилась і він не застарів"""
+        known = self.known.get(product['url'])
+        return not (known is None
+                    or known[0] != fingerprint(product)
+                    or (self.max_age is not None and time.time() - known[1] > self.max_age))
+
+    def is_due(self, product):
+        """Чи потрібно повторно завантажити детальну сторінку товару з картки списку"""
+        due = not self.is_current(product)
+        if due:
+            self.due += 1
+        else:
+            self.skipped += 1
+        return due
+
+    def report(self, writer):
+        """Друкує підсумок оновлення"""
+        print(f"🔁 Оновлення: {self.due} товарів перевірено, {self.skipped} пропущено без змін, "
+              f"{writer.changed_count} рядків змінено")
@@ -0,0 +1,225 @@
+"""
+Спільна політика повторів і запобіжник (circuit breaker) для хостів
+Помилки класифікуються: таймаут навігації та тимчасові збої мережі чи HTTP (5xx, 429)
+повторюються після експоненційної паузи з джитером без перезапуску браузера,
+браузер перезапускається лише тоді, коли його сесія мертва; решта (4xx, помилки
+розбору сторінки) не повторюється
+Запобіжник рахує невдалі поспіль запити до хоста: після threshold обхід хоста
+призупиняється на cooldown секунд для всіх воркерів, потім проходить один пробний
+запит - успіх закриває запобіжник, невдача подвоює паузу (до max_cooldown)
+"""
+
+from selenium.common.exceptions import (WebDriverException, TimeoutException, InvalidSessionIdException,
+                                        NoSuchWindowException, NoSuchElementException,
+                                        StaleElementReferenceException, ElementNotInteractableException,
+                                        JavascriptException)
+import urllib3
+import requests
+import aiohttp
+import asyncio
+import threading
+import random
+import time
+from page_cache import CacheMiss
+from run_metrics import RunMetrics
+
+# Класи помилок
+NAVIGATION = 'navigation'
+SESSION = 'session'
+HTTP_ERROR = 'http'
+FATAL = 'fatal'
+
+# Ознаки мертвої сесії браузера у повідомленнях WebDriverException
+SESSION_MARKERS = ('invalid session id', 'no such window', 'chrome not reachable', 'disconnected',
+                   'session deleted', 'target window already closed', 'tab crashed', 'no such session')
+
+
+def status_class(status):
+    """Клас помилки за HTTP статусом: 5xx і 429 минають, решта - ні"""
+    return HTTP_ERROR if status is None or status >= 500 or status == 429 else FATAL
+
+
+def classify(error):
+    """Клас помилки: NAVIGATION, SESSION, HTTP_ERROR або FATAL (повтор не допоможе)"""
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException)):
+        return SESSION
+    if isinstance(error, TimeoutException):
+        return NAVIGATION
+    # Помилки сторінки, а не браузера: повтор тієї самої сторінки не допоможе
+    if isinstance(error, (NoSuchElementException, StaleElementReferenceException, ElementNotInteractableException,
+                          JavascriptException)):
+        return FATAL
+    if isinstance(error, requests.HTTPError):
+        return status_class(error.response.status_code if error.response is not None else None)
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return HTTP_ERROR
+    if isinstance(error, aiohttp.ClientResponseError):
+        return status_class(error.status)
+    if isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError)):
+        return HTTP_ERROR
+    if isinstance(error, WebDriverException):
+        message = (error.msg or '').lower()
+        if any(marker in message for marker in SESSION_MARKERS):
+            return SESSION
+        if 'timeout' in message or 'timed out' in message:
+            return NAVIGATION
+        # Мережеві помилки Chrome (net::ERR_CONNECTION_REFUSED тощо) - проблема сайту
+        if 'net::err_' in message:
+            return HTTP_ERROR
+        # Невідомий збій драйвера - безпечніше перезапустити браузер
+        return SESSION
+    if isinstance(error, urllib3.exceptions.HTTPError):
+        # Selenium не достукався до chromedriver
+        return SESSION
+    return FATAL
+
+
+def describe(error):
+    """Короткий опис помилки для журналу (без стеку WebDriverException)"""
+    message = getattr(error, 'msg', None) or str(error) or error.__class__.__name__
+    return message.strip().splitlines()[0][:150]
+
+
+def backoff_delay(attempt, base_delay=1.0, max_delay=30.0):
+    """Пауза перед повтором номер attempt (з 1): експоненційна, з джитером від половини до повної"""
+    delay = min(max_delay, base_delay * 2 ** (attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class CircuitBreaker:
+    def __init__(self, threshold=5, cooldown=30.0, max_cooldown=300.0, metrics=None):
+        """
+        threshold - після стількох невдалих поспіль запитів до хоста обхід призупиняється
+        cooldown / max_cooldown - початкова і найбільша пауза, с
+        """
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.metrics = metrics or RunMetrics(None, enabled=False)
+        self.lock = threading.Lock()
+        self.failures = {}
+        self.open_until = {}
+        self.cooldowns = {}
+        self.probing = set()
+
+    def poll(self, host):
+        """None - запит до хоста можна виконувати, інакше скільки секунд ще чекати"""
+        with self.lock:
+            open_until = self.open_until.get(host)
+            if open_until is None:
+                return None
+            remaining = open_until - time.monotonic()
+            if remaining <= 0 and host not in self.probing:
+                # Пауза минула: пропускаємо один пробний запит, решта чекає його результату
+                self.probing.add(host)
+                return None
+        return min(max(remaining, 0.2), 1.0)
+
+    def wait(self, host):
+        """Чекає, поки запобіжник хоста дозволить запит"""
+        delay = self.poll(host)
+        while delay is not None:
+            time.sleep(delay)
+            delay = self.poll(host)
+
+    async def wait_async(self, host):
+        """Те саме для asyncio рушія"""
+        delay = self.poll(host)
+        while delay is not None:
+            await asyncio.sleep(delay)
+            delay = self.poll(host)
+
+    def record_success(self, host):
+        """Хост відповів: запобіжник закривається"""
+        with self.lock:
+            self.failures.pop(host, None)
+            self.cooldowns.pop(host, None)
+            self.probing.discard(host)
+            was_open = self.open_until.pop(host, None) is not None
+        if was_open:
+            print(f"✅ {host} знову відповідає - обхід продовжено")
+
+    def record_failure(self, host):
+        """Невдалий запит до хоста (збій мережі, 5xx або таймаут)"""
+        with self.lock:
+            was_probe = host in self.probing
+            self.probing.discard(host)
+            failures = self.failures.get(host, 0) + 1
+            self.failures[host] = failures
+            if was_probe:
+                cooldown = min(self.max_cooldown, self.cooldowns[host] * 2)
+            elif host in self.open_until or failures < self.threshold:
+                return
+            else:
+                cooldown = self.cooldown
+            self.cooldowns[host] = cooldown
+            self.open_until[host] = time.monotonic() + cooldown
+        self.metrics.count('circuit_open', host=host)
+        print(f"🛑 {host}: {failures} невдалих запитів поспіль - пауза обходу {cooldown:.0f} с")
+
+    def release(self, host):
+        """Запит завершився без відповіді про стан хоста (напр. впав браузер)"""
+        with self.lock:
+            self.probing.discard(host)
+
+
+class RetryPolicy:
+    def __init__(self, attempts=3, base_delay=1.0, max_delay=30.0, breaker=None, metrics=None):
+        """
+        attempts - спроб разом з першою
+        base_delay / max_delay - пауза перед першим повтором і найбільша пауза, с (див. backoff_delay)
+        breaker - CircuitBreaker для хостів (None - без запобіжника)
+        """
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker
+        self.metrics = metrics or RunMetrics(None, enabled=False)
+
+    def backoff(self, attempt):
+        """Пауза перед повтором номер attempt"""
+        return backoff_delay(attempt, self.base_delay, self.max_delay)
+
+    def call(self, action, stage, host=None, restart=None):
+        """
+        Виконує action() з повторами згідно з класом помилки: тимчасові - після паузи,
+        мертва сесія браузера - після restart(); повертає результат або піднімає помилку
+        stage - мітка етапу в метриках, host - ключ запобіжника
+        """
+        breaker = self.breaker if host else None
+        for attempt in range(1, self.attempts + 1):
+            if breaker is not None:
+                breaker.wait(host)
+            try:
+                result = action()
+            except CacheMiss:
+                if breaker is not None:
+                    breaker.release(host)
+                raise
+            except Exception as e:
+                kind = classify(e)
+                if breaker is not None:
+                    if kind in (NAVIGATION, HTTP_ERROR):
+                        breaker.record_failure(host)
+                    elif kind == SESSION:
+                        breaker.release(host)
+                    else:
+                        # Сайт відповів (4xx або сторінка, яку не вдалось розібрати)
+                        breaker.record_success(host)
+                if kind == FATAL or attempt == self.attempts:
+                    raise
+
+                self.metrics.count('retries', stage=stage, error=kind)
+                if kind == SESSION and restart is not None:
+                    print(f"⚠️ Сесія браузера втрачена ({describe(e)}), перезапуск, "
+                          f"спроба {attempt + 1}/{self.attempts}...")
+                    restart()
+                else:
+                    delay = self.backoff(attempt)
+                    print(f"⚠️ {describe(e)} - повтор через {delay:.1f} с, спроба {attempt + 1}/{self.attempts}...")
+                    self.metrics.sleep(delay)
+                continue
+
+            if breaker is not None:
+                breaker.record_success(host)
+            return result
@@ -0,0 +1,176 @@
+"""
+Метрики запуску парсера
+Час етапів (навігація, паузи, передача page_source, розбір HTML, HTTP запити,
+запис у сховище, Excel, прогрес) у гістограмах і лічильники сторінок, повторів,
+перезапусків та байтів. Наприкінці запуску експортуються у текстовий файл
+Prometheus (для node_exporter textfile collector) і JSON підсумок
+Вимкнені метрики (enabled=False) не вимірюють нічого
+"""
+
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+import threading
+import time
+import json
+import os
+
+# Межі кошиків гістограми, с
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_disabled_timer = nullcontext()
+
+
+def format_labels(labels):
+    """Мітки у форматі Prometheus: {name="value",...}"""
+    if not labels:
+        return ''
+    escaped = [(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+               for name, value in labels]
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+class RunMetrics:
+    def __init__(self, site, enabled=True, prefix='parser', worker=None):
+        """
+        site - мітка сайту в усіх метриках
+        enabled - False вимикає всі заміри (timer повертає порожній контекст)
+        prefix - префікс назв метрик Prometheus
+        worker - ім'я одного з кількох процесів сайту: мітка worker в усіх метриках
+        і власні файли metrics_<worker>.* замість metrics_<сайт>.*
+        """
+        self.site = site
+        self.worker = worker
+        self.enabled = enabled
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.histograms = {}
+        self.counters = {}
+
+    def observe(self, stage, seconds):
+        """Додає тривалість етапу в гістограму"""
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = {'buckets': [0] * len(BUCKETS), 'count': 0,
+                                                      'sum': 0.0, 'max': 0.0}
+            for index, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    histogram['buckets'][index] += 1
+                    break
+            histogram['count'] += 1
+            histogram['sum'] += seconds
+            histogram['max'] = max(histogram['max'], seconds)
+
+    def timer(self, stage):
+        """Контекст, що вимірює тривалість етапу"""
+        if not self.enabled:
+            return _disabled_timer
+        return self._timer(stage)
+
+    @contextmanager
+    def _timer(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def sleep(self, seconds):
+        """Фіксована пауза, що враховується як етап 'sleep'"""
+        time.sleep(seconds)
+        self.observe('sleep', seconds)
+
+    def count(self, name, value=1, **labels):
+        """Збільшує лічильник name з мітками labels"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def total(self, name):
+        """Сума лічильника name за всіма мітками"""
+        with self.lock:
+            return sum(value for (counter_name, _), value in self.counters.items() if counter_name == name)
+
+    def prometheus(self):
+        """Метрики у текстовому форматі Prometheus"""
+        site = (('site', self.site),) + ((('worker', self.worker),) if self.worker else ())
+        lines = [
+            f'# HELP {self.prefix}_stage_seconds Тривалість етапів парсингу',
+            f'# TYPE {self.prefix}_stage_seconds histogram',
+        ]
+        with self.lock:
+            histograms = {stage: dict(histogram, buckets=list(histogram['buckets']))
+                          for stage, histogram in self.histograms.items()}
+            counters = dict(self.counters)
+
+        for stage, histogram in sorted(histograms.items()):
+            labels = site + (('stage', stage),)
+            cumulative = 0
+            for bound, bucket in zip(BUCKETS, histogram['buckets']):
+                cumulative += bucket
+                lines.append(f'{self.prefix}_stage_seconds_bucket{format_labels(labels + (("le", bound),))} '
+                             f'{cumulative}')
+            lines.append(f'{self.prefix}_stage_seconds_bucket{format_labels(labels + (("le", "+Inf"),))} '
+                         f'{histogram["count"]}')
+            lines.append(f'{self.prefix}_stage_seconds_sum{format_labels(labels)} {histogram["sum"]:.6f}')
+            lines.append(f'{self.prefix}_stage_seconds_count{format_labels(labels)} {histogram["count"]}')
+
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f'# TYPE {self.prefix}_{name}_total counter')
+            for (counter_name, labels), value in sorted(counters.items()):
+                if counter_name == name:
+                    lines.append(f'{self.prefix}_{name}_total{format_labels(site + labels)} {value}')
+
+        lines.append(f'# TYPE {self.prefix}_run_started_seconds gauge')
+        lines.append(f'{self.prefix}_run_started_seconds{format_labels(site)} {self.started:.0f}')
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        """Підсумок запуску для JSON: етапи з кількістю і часом, лічильники"""
+        with self.lock:
+            stages = {
+                stage: {
+                    'count': histogram['count'],
+                    'total_seconds': round(histogram['sum'], 3),
+                    'mean_seconds': round(histogram['sum'] / histogram['count'], 4),
+                    'max_seconds': round(histogram['max'], 4),
+                }
+                for stage, histogram in sorted(self.histograms.items())
+            }
+            counters = {}
+            for (name, labels), value in sorted(self.counters.items()):
+                label = ','.join(f'{key}={label_value}' for key, label_value in labels)
+                counters.setdefault(name, {})[label or 'total'] = value
+
+        return {
+            'site': self.site,
+            'worker': self.worker,
+            'started_at': datetime.fromtimestamp(self.started).isoformat(timespec='seconds'),
+            'duration_seconds': round(time.time() - self.started, 3),
+            'stages': stages,
+            'counters': counters,
+        }
+
+    def export(self, prometheus_file=None, summary_file=None):
+        """
+        Атомарно записує метрики Prometheus і JSON підсумок
+        (за замовчуванням metrics_<сайт>.prom і metrics_<сайт>.json, для воркера - metrics_<worker>.*)
+        """
+        if not self.enabled:
+            return
+        name = self.worker or self.site
+        prometheus_file = prometheus_file or f'metrics_{name}.prom'
+        summary_file = summary_file or f'metrics_{name}.json'
+
+        for path, content in ((prometheus_file, self.prometheus()),
+                              (summary_file, json.dumps(self.summary(), ensure_ascii=False, indent=2))):
+            tmp_file = path + '.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp_file, path)
+        print(f"📈 Метрики збережено: {prometheus_file}, {summary_file}")
@@ -4,156 +4,85 @@
 Результат: sapienstone_ceramic.xlsx
 """
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
-from bs4 import BeautifulSoup
-import pandas as pd
-import time
 from tqdm import tqdm
-import os
-import json
+from urllib.parse import urlparse
+from product_store import fingerprint
+from site_parser import SiteParser, cli_options
+from crawl_engine import host_key
+from html_parsing import make_soup, class_strainer
 
-class SapienstoneParser:
-    def __init__(self, output_file='sapienstone_ceramic.xlsx'):
-        """Ініціалізація парсера"""
-        self.output_file = output_file
-        self.progress_file = 'progress_sapienstone.json'
-        self.driver = None
-        self.wait = None
-        self.processed_urls = set()
-        self.brand = 'Sapienstone'
-        self.category = 'Керамограніт'
-        self.base_url = 'https://www.sapienstone.com'
-        self.init_driver()
-        self.load_progress()
-        
-    def init_driver(self):
-        """Ініціалізація драйвера браузера"""
-        options = webdriver.ChromeOptions()
-        # Закоментуйте наступний рядок, якщо хочете бачити браузер
-        options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--window-size=1920,1080')
-        
-        try:
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=options)
-            self.wait = WebDriverWait(self.driver, 15)
-            print("✅ Браузер успішно запущено")
-        except Exception as e:
-            print(f"❌ Помилка запуску браузера: {e}")
-            raise
+class SapienstoneParser(SiteParser):
+    # Колонки Excel файлу та їх ширина
+    COLUMNS = [
+        ('Brand', 20), ('Category', 25), ('Title', 30), ('Type', 20),
+        ('Feature photo', 50), ('Gallery1', 50), ('Gallery2', 50), ('Gallery3', 50),
+    ]
     
-    def load_progress(self):
-        """Завантажує прогрес з файлу"""
-        if os.path.exists(self.progress_file):
-            try:
-                with open(self.progress_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.processed_urls = set(data.get('processed_urls', []))
-                print(f"📂 Завантажено прогрес: {len(self.processed_urls)} товарів вже оброблено")
-            except Exception as e:
-                print(f"⚠️ Не вдалось завантажити прогрес: {e}")
-                self.processed_urls = set()
-        else:
-            print("🆕 Початок нового парсингу")
+    # Колонки з URL картинок товару (для images_dir і verify_images)
+    IMAGE_COLUMNS = ('Feature photo', 'Gallery1', 'Gallery2', 'Gallery3')
     
-    def save_progress(self):
-        """Зберігає прогрес у файл"""
-        try:
-            with open(self.progress_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'processed_urls': list(self.processed_urls)
-                }, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"⚠️ Помилка збереження прогресу: {e}")
+    # Запасні URL картинки (заміни в URL), якщо перевірений URL недоступний
+    IMAGE_FALLBACKS = ()
     
-    def restart_driver(self):
-        """Перезапуск драйвера при помилках"""
-        print("🔄 Перезапуск браузера...")
-        try:
-            if self.driver:
-                self.driver.quit()
-        except:
-            pass
-        
-        time.sleep(3)
-        self.init_driver()
+    # Ресурси, потрібні сайту попри блокування (категорії або шаблони URL)
+    RESOURCE_ALLOW = ()
+    
+    # Ключ сайту у сховищі товарів
+    SITE = 'sapienstone'
+    
+    # Назва сайту в повідомленнях
+    TITLE = 'Sapienstone керамограніту'
+    
+    # Умови готовності сторінок (CSS селектор, що має з'явитися)
+    READY_SELECTORS = {
+        'catalog': '.product-container',
+        'detail': '.slick-track .slick-slide a',
+    }
+    
+    # Піддерева сторінок, які потрібні екстракторам (решта сторінки не розбирається)
+    STRAINERS = {
+        'catalog': class_strainer('div', 'product-container'),
+        'detail': class_strainer('div', 'slick-track'),
+    }
+    
+    # Поля детальної сторінки одним викликом у браузері (ті самі, що й detail_fields_from_html)
+    DETAIL_JS = """
+        const track = document.querySelector('div.slick-track');
+        const slides = track ? Array.from(track.querySelectorAll('div.slick-slide')).slice(0, 3) : [];
+        return {
+            links: slides.map(slide => {
+                const link = slide.querySelector('a');
+                return link ? (link.getAttribute('href') || '') : '';
+            })
+        };
+    """
+    
+    # Прокручуємо сторінки для завантаження всіх елементів, а детальну - до слайдера
+    SCROLL_TO = 'document.body.scrollHeight'
+    DETAIL_SCROLL_TO = 500
+    
+    def __init__(self, output_file='sapienstone_ceramic.xlsx', batch_size=5,
+                 progress_file='progress_sapienstone.json', **options):
+        """
+        Ініціалізація парсера (решта параметрів - див. SiteParser.__init__)
+        fetch_modes - режим завантаження для типів сторінок ('catalog', 'detail'): 'browser' або 'http'
+        """
+        self.brand = 'Sapienstone'
+        self.category = 'Керамограніт'
+        self.base_url = 'https://www.sapienstone.com'
+        super().__init__(output_file, batch_size=batch_size, progress_file=progress_file, **options)
     
     def parse_catalog_page(self, catalog_url):
         """Парсить сторінку каталогу та отримує всі товари"""
         print("🌐 Завантаження каталогу...")
         
         try:
-            self.driver.get(catalog_url)
-            time.sleep(3)
-            
             # Прокручуємо сторінку для завантаження всіх елементів
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-            
-            html = self.driver.page_source
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Шукаємо всі контейнери товарів
-            product_containers = soup.find_all('div', class_='product-container')
-            
-            print(f"✅ Знайдено товарів: {len(product_containers)}")
-            
-            products = []
-            for container in product_containers:
-                try:
-                    # Посилання на товар
-                    link = container.find('a')
-                    if not link or not link.get('href'):
-                        continue
-                    
-                    product_url = self.base_url + link['href']
-                    
-                    # Пропускаємо вже оброблені
-                    if product_url in self.processed_urls:
-                        continue
-                    
-                    # Назва товару
-                    title = ''
-                    p_tag = container.find('p')
-                    if p_tag:
-                        strong = p_tag.find('strong')
-                        if strong:
-                            title = strong.text.strip()
-                    
-                    # Тип поверхні (Cashmere, тощо)
-                    surface_type = ''
-                    if p_tag:
-                        i_tag = p_tag.find('i')
-                        if i_tag:
-                            surface_type = i_tag.text.strip()
-                    
-                    # Картинка (превью)
-                    feature_photo = ''
-                    img = container.find('img')
-                    if img and img.get('src'):
-                        feature_photo = self.base_url + img['src']
-                    
-                    products.append({
-                        'url': product_url,
-                        'title': title,
-                        'surface_type': surface_type,
-                        'feature_photo': feature_photo
-                    })
-                    
-                except Exception as e:
-                    print(f"⚠️ Помилка обробки контейнера: {e}")
-                    continue
+            html = self.retry.call(
+                lambda: self.fetcher.fetch(catalog_url, 'catalog', lambda: self.browser_get(catalog_url, 'catalog')),
+                'catalog', host=host_key(catalog_url), restart=self.restart_driver
+            )
+            products = self.extract_catalog_products(html)
             
             print(f"✨ Нових товарів для обробки: {len(products)}")
             return products
@@ -162,54 +91,95 @@ class SapienstoneParser:
             print(f"❌ Помилка завантаження каталогу: {e}")
             return []
     
-    def parse_product_detail(self, url):
-        """Парсить детальну сторінку товару та отримує галерею"""
-        max_retries = 3
+    def extract_catalog_products(self, html):
+        """Витягує товари з HTML сторінки каталогу"""
+        with self.metrics.timer('parse'):
+            soup = make_soup(html, self.STRAINERS['catalog'])
         
-        for attempt in range(max_retries):
+        # Шукаємо всі контейнери товарів
+        product_containers = soup.find_all('div', class_='product-container')
+        
+        print(f"✅ Знайдено товарів: {len(product_containers)}")
+        
+        products = []
+        for container in product_containers:
             try:
-                self.driver.get(url)
-                time.sleep(3)
+                # Посилання на товар
+                link = container.find('a')
+                if not link or not link.get('href'):
+                    continue
                 
-                # Прокручуємо до слайдера
-                self.driver.execute_script("window.scrollTo(0, 500);")
-                time.sleep(1)
+                product_url = self.base_url + link['href']
                 
-                html = self.driver.page_source
-                soup = BeautifulSoup(html, 'html.parser')
+                # Пропускаємо вже оброблені
+                if self.refresh is None and product_url in self.processed_urls:
+                    continue
                 
-                # Шукаємо slick-slider
-                gallery_images = []
-                slick_track = soup.find('div', class_='slick-track')
+                # Назва товару
+                title = ''
+                p_tag = container.find('p')
+                if p_tag:
+                    strong = p_tag.find('strong')
+                    if strong:
+                        title = strong.text.strip()
                 
-                if slick_track:
-                    slides = slick_track.find_all('div', class_='slick-slide')
-                    
-                    for slide in slides[:3]:  # Беремо перші 3 слайди
-                        # Шукаємо посилання на велике зображення
-                        link = slide.find('a')
-                        if link and link.get('href'):
-                            # Беремо big зображення, а не thumb
-                            img_url = self.base_url + link['href']
-                            gallery_images.append(img_url)
+                # Тип поверхні (Cashmere, тощо)
+                surface_type = ''
+                if p_tag:
+                    i_tag = p_tag.find('i')
+                    if i_tag:
+                        surface_type = i_tag.text.strip()
                 
-                # Доповнюємо до 3 елементів
-                while len(gallery_images) < 3:
-                    gallery_images.append('')
+                # Картинка (превью)
+                feature_photo = ''
+                img = container.find('img')
+                if img and img.get('src'):
+                    feature_photo = self.base_url + img['src']
                 
-                return gallery_images[:3]
+                products.append({
+                    'url': product_url,
+                    'title': title,
+                    'surface_type': surface_type,
+                    'feature_photo': feature_photo
+                })
                 
-            except WebDriverException as e:
-                if attempt < max_retries - 1:
-                    print(f"⚠️ Помилка з'єднання, спроба {attempt + 2}/{max_retries}...")
-                    self.restart_driver()
-                    time.sleep(2)
-                else:
-                    print(f"❌ Не вдалось обробити {url}: {e}")
-                    return ['', '', '']
             except Exception as e:
-                print(f"⚠️ Помилка обробки {url}: {e}")
-                return ['', '', '']
+                print(f"⚠️ Помилка обробки контейнера: {e}")
+                continue
+        
+        return products
+    
+    def detail_fields_from_html(self, html):
+        """Сирі поля детальної сторінки з HTML (аналог DETAIL_JS)"""
+        with self.metrics.timer('parse'):
+            soup = make_soup(html, self.STRAINERS['detail'])
+        
+        # Посилання на великі зображення перших 3 слайдів slick-slider
+        links = []
+        slick_track = soup.find('div', class_='slick-track')
+        if slick_track:
+            for slide in slick_track.find_all('div', class_='slick-slide')[:3]:
+                link = slide.find('a')
+                links.append(link.get('href', '') if link else '')
+        
+        return {'links': links}
+    
+    def build_product_detail(self, fields, base_url=None):
+        """
+        Галерея товару з сирих полів детальної сторінки
+        base_url - адреса сайту каталогу (контекст товару у спільній черзі та черзі помилок)
+        """
+        gallery_images = []
+        for href in fields['links']:
+            if href:
+                # Беремо big зображення, а не thumb
+                gallery_images.append((base_url or self.base_url) + href)
+        
+        # Доповнюємо до 3 елементів
+        while len(gallery_images) < 3:
+            gallery_images.append('')
+        
+        return gallery_images[:3]
     
     def translate_surface_type(self, surface_type):
         """Перекладає тип поверхні на українську"""
@@ -225,62 +195,35 @@ class SapienstoneParser:
         
         return translations.get(surface_type, surface_type)
     
-    def save_product_to_excel(self, product_data):
-        """Додає один товар до Excel файлу"""
-        try:
-            print(f"💾 Збереження: {product_data.get('Title', 'Без назви')}")
-            
-            # Якщо файл існує, дописуємо
-            if os.path.exists(self.output_file):
-                from openpyxl import load_workbook
-                
-                wb = load_workbook(self.output_file)
-                ws = wb['Products']
-                
-                ws.append([
-                    product_data['Brand'],
-                    product_data['Category'],
-                    product_data['Title'],
-                    product_data['Type'],
-                    product_data['Feature photo'],
-                    product_data['Gallery1'],
-                    product_data['Gallery2'],
-                    product_data['Gallery3']
-                ])
-                
-                wb.save(self.output_file)
-                wb.close()
-                print(f"   ✅ Збережено!")
-            else:
-                # Створюємо новий файл
-                df = pd.DataFrame([product_data])
-                with pd.ExcelWriter(self.output_file, engine='openpyxl') as writer:
-                    df.to_excel(writer, index=False, sheet_name='Products')
-                    
-                    worksheet = writer.sheets['Products']
-                    column_widths = {
-                        'A': 20,  # Brand
-                        'B': 25,  # Category
-                        'C': 30,  # Title
-                        'D': 20,  # Type
-                        'E': 50,  # Feature photo
-                        'F': 50,  # Gallery1
-                        'G': 50,  # Gallery2
-                        'H': 50,  # Gallery3
-                    }
-                    for col, width in column_widths.items():
-                        worksheet.column_dimensions[col].width = width
-                        
-                print(f"   ✅ Файл створено: {self.output_file}")
-                        
-        except Exception as e:
-            print(f"❌ Помилка збереження: {e}")
-            import traceback
-            traceback.print_exc()
+    def use_catalog_site(self, catalog_url):
+        """Відносні посилання каталогу доповнюються адресою сайту, з якого завантажено каталог"""
+        parts = urlparse(catalog_url)
+        self.base_url = f'{parts.scheme}://{parts.netloc}'
+    
+    def save_product(self, product, gallery):
+        """Формує рядок товару та зберігає його у файл"""
+        # Перекладаємо тип поверхні
+        surface_type_ua = self.translate_surface_type(product['surface_type'])
+        
+        product_data = {
+            'Brand': self.brand,
+            'Category': self.category,
+            'Title': product['title'],
+            'Type': surface_type_ua,
+            'Feature photo': product['feature_photo'],
+            'Gallery1': gallery[0],
+            'Gallery2': gallery[1],
+            'Gallery3': gallery[2]
+        }
+        
+        print(f"   📋 Дані зібрано: Type={surface_type_ua}")
+        
+        # URL стане обробленим після скидання пакета на диск
+        self.save_product_to_excel(product_data, url=product['url'], card_hash=fingerprint(product))
     
-    def parse_all(self, catalog_url):
-        """Основна функція парсингу"""
-        print("🚀 Початок парсингу Sapienstone керамограніту\n")
+    def crawl(self, catalog_url, pool):
+        """Каталог -> детальні сторінки пулом браузерів"""
+        self.use_catalog_site(catalog_url)
         
         # Отримуємо всі товари з каталогу
         products = self.parse_catalog_page(catalog_url)
@@ -289,67 +232,53 @@ class SapienstoneParser:
             print("❌ Не знайдено товарів!")
             return
         
-        # Обробляємо кожен товар
-        print(f"\n📦 Обробка товарів...")
+        # Обробляємо товари пулом браузерів, запис - лише в цьому потоці; адреса сайту -
+        # контекст товару, щоб воркер спільної черги обробив його без завантаження каталогу
+        pending = self.discover_pending(products, self.base_url)
+        print(f"\n📦 Обробка товарів ({self.workers} воркерів)...")
         
-        for product in tqdm(products, desc="Прогрес"):
-            if product['url'] and product['url'] not in self.processed_urls:
+        with tqdm(total=len(pending), desc="Прогрес") as progress:
+            def on_result(product, gallery, error):
+                progress.update(1)
                 try:
-                    print(f"\n🔍 Обробка: {product['title']}")
-                    
-                    # Отримуємо галерею з детальної сторінки
-                    gallery = self.parse_product_detail(product['url'])
-                    
-                    # Перекладаємо тип поверхні
-                    surface_type_ua = self.translate_surface_type(product['surface_type'])
-                    
-                    # Формуємо дані товару
-                    product_data = {
-                        'Brand': self.brand,
-                        'Category': self.category,
-                        'Title': product['title'],
-                        'Type': surface_type_ua,
-                        'Feature photo': product['feature_photo'],
-                        'Gallery1': gallery[0],
-                        'Gallery2': gallery[1],
-                        'Gallery3': gallery[2]
-                    }
-                    
-                    print(f"   📋 Дані зібрано: Type={surface_type_ua}")
-                    
-                    # Зберігаємо товар
-                    self.save_product_to_excel(product_data)
-                    
-                    # Додаємо до оброблених
-                    self.processed_urls.add(product['url'])
-                    
-                    # Зберігаємо прогрес
-                    if len(self.processed_urls) % 5 == 0:
-                        self.save_progress()
-                    
-                    time.sleep(0.5)
-                    
+                    if error:
+                        raise error
+                    self.save_product(product, gallery)
                 except Exception as e:
                     print(f"\n❌ Помилка обробки товару: {e}")
                     self.save_progress()
-                    continue
-        
-        # Фінальне збереження
-        self.save_progress()
-        
-        print(f"\n✅ Парсинг завершено!")
-        print(f"📊 Всього оброблено товарів: {len(self.processed_urls)}")
-        print(f"💾 Файл збережено: {self.output_file}")
+                    self.product_failed(product, e, self.base_url)
+            
+            self.run_pool(pool, pending, self.fetch_product, on_result)
     
-    def close(self):
-        """Закриває браузер"""
-        if self.driver:
-            self.driver.quit()
+    async def crawl_async(self, engine, catalog_url):
+        """Каталог -> детальні сторінки -> запис"""
+        self.use_catalog_site(catalog_url)
+        async with engine:
+            products = self.extract_catalog_products(await engine.fetch(catalog_url))
+            pending = self.discover_pending(products, self.base_url)
+            print(f"\n📦 Обробка товарів: {len(pending)}...")
+            
+            with tqdm(total=len(pending), desc='Прогрес') as progress:
+                def on_detail(product, html, error):
+                    progress.update(1)
+                    try:
+                        if error:
+                            raise error
+                        self.save_product(product, self.extract_product_detail(html))
+                    except Exception as e:
+                        print(f"\n❌ Помилка обробки товару: {e}")
+                        self.save_progress()
+                        self.product_failed(product, e, self.base_url)
+                
+                await self.fetch_pending(engine, pending, on_detail)
 
 
 def main():
     """Головна функція"""
-    parser = SapienstoneParser(output_file='sapienstone_ceramic.xlsx')
+    # Галерея slick-track є у HTML від сервера, браузер для неї не потрібен
+    parser = SapienstoneParser(output_file='sapienstone_ceramic.xlsx', fetch_modes={'detail': 'http'},
+                               **cli_options("Парсер sapienstone.com"))
     
     try:
         # URL каталогу
@@ -370,4 +299,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,670 @@
+"""
+Спільний конвеєр парсерів сайтів
+SiteParser - браузерні сесії, прогрес, буферизований запис, спільна черга (frontier),
+черга помилок, повтори і запобіжник, пул браузерів та asyncio рушій.
+Парсер сайту наслідує SiteParser і задає лише своє: колонки та умови готовності
+сторінок (атрибути класу), обхід списку товарів (crawl / crawl_async), розбір
+сторінок (detail_fields_from_html, build_product_detail) і рядок товару (save_product)
+"""
+
+from selenium import webdriver
+from selenium.common.exceptions import JavascriptException
+from driver_manifest import resolve_driver_path
+from selenium.webdriver.chrome.service import Service
+import argparse
+import time
+import threading
+import asyncio
+from tqdm import tqdm
+from excel_writer import BufferedExcelWriter
+from exporter import with_image_paths
+from image_downloader import ImageDownloader
+from image_probe import ImageProbe
+from url_frontier import LEASED
+from dead_letters import DeadLetterQueue
+from retry_policy import RetryPolicy, CircuitBreaker
+from progress_journal import ProgressJournal
+from refresh import RefreshPolicy
+from browser_profile import ResourcePolicy, PageStats
+from fetcher import PageFetcher, BROWSER
+from driver_pool import BrowserSession, DriverPool, SessionMetrics
+from run_metrics import RunMetrics
+from crawl_engine import AsyncCrawlEngine, TokenBucket, host_key
+from waits import element_ready, wait_for
+from page_cache import CacheMiss
+
+
+def cli_options(description):
+    """
+    Параметри запуску парсера з командного рядка (main() сайтів): за замовчуванням один
+    браузер без резервного, більше - лише на вимогу (або через sites.json оркестратора)
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--workers', type=int, default=1, help="браузерів для детальних сторінок")
+    parser.add_argument('--warm-standby', action='store_true',
+                        help="резервний запущений браузер для кожного воркера (вдвічі більше браузерів)")
+    args = parser.parse_args()
+    return {'workers': args.workers, 'warm_standby': args.warm_standby}
+
+
+class SiteParser:
+    # Колонки Excel файлу та їх ширина
+    COLUMNS = []
+
+    # Колонки з URL картинок товару (для images_dir і verify_images)
+    IMAGE_COLUMNS = ()
+
+    # Колонки, за якими товар упізнається серед рядків старого Excel файлу без URL
+    IDENTITY_COLUMNS = ('Title',)
+
+    # Запасні URL картинки (заміни в URL), якщо перевірений URL недоступний
+    IMAGE_FALLBACKS = ()
+
+    # Ресурси, потрібні сайту попри блокування (категорії або шаблони URL)
+    RESOURCE_ALLOW = ()
+
+    # Додаткові аргументи запуску Chrome
+    BROWSER_ARGS = ()
+
+    # Ключ сайту у сховищі товарів
+    SITE = None
+
+    # Назва сайту в повідомленнях
+    TITLE = None
+
+    # Умови готовності сторінок (CSS селектор, що має з'явитися)
+    READY_SELECTORS = {}
+
+    # Піддерева сторінок, які потрібні екстракторам (решта сторінки не розбирається)
+    STRAINERS = {}
+
+    # Поля детальної сторінки одним викликом у браузері (ті самі, що й detail_fields_from_html)
+    DETAIL_JS = None
+
+    # Прокрутка сторінки після завантаження в браузері (None - без прокрутки)
+    SCROLL_TO = None
+
+    # Прокрутка детальної сторінки (до галереї), None - як SCROLL_TO
+    DETAIL_SCROLL_TO = None
+
+    def __init__(self, output_file, batch_size=5, fetch_modes=None, workers=1, rate_limit=2.0,
+                 http_concurrency=4, page_load_strategy='normal', ready_timeout=10, cache=None,
+                 cache_only=False, store=None, refresh=False, max_age=None, resource_policy=None,
+                 warm_standby=False, recycle_after=500, max_rss_mb=1500, extraction='js',
+                 metrics=True, images_dir=None, verify_images=False, frontier=None,
+                 retry_backoff=30, retry_wait=120, retry_policy=None, worker=None, browser_log=None,
+                 page_weight=False, progress_file='progress.json'):
+        """
+        Ініціалізація парсера
+        fetch_modes - режим завантаження для типів сторінок сайту: 'browser' або 'http'
+        workers - кількість браузерів для паралельної обробки детальних сторінок
+        rate_limit - запитів/с до сайту (спільний ліміт воркерів пулу браузерів, HTTP режиму та asyncio рушія)
+        http_concurrency - одночасних запитів до сайту asyncio рушія
+        page_load_strategy - 'normal' або 'eager' (не чекати картинок і стилів)
+        ready_timeout - жорсткий таймаут очікування готовності сторінки, с
+        store - спільний ProductStore (за замовчуванням products.sqlite)
+        refresh - режим оновлення: повторно завантажуються лише нові товари, товари зі зміненою
+        карткою у списку або старші за max_age секунд; у файл записуються лише змінені рядки
+        resource_policy - ResourcePolicy браузера (за замовчуванням блокуються картинки, шрифти,
+        медіа та трекери, крім RESOURCE_ALLOW); ResourcePolicy(block=()) - без блокування
+        page_weight - у підсумку сторінок також трафік і кількість запитів на сторінку (для оцінки
+        resource_policy; коштує ще одного виклику execute_script на кожну сторінку)
+        warm_standby - кожна браузерна сесія тримає запущений резервний браузер,
+        який миттєво замінює впалий при перезапуску (вдвічі більше браузерів)
+        recycle_after / max_rss_mb - плановий перезапуск браузера між товарами після стількох
+        сторінок або при перевищенні пам'яті (потрібен psutil)
+        browser_log - файл журналу подій браузерів і замірів пам'яті (JSONL; None - без журналу),
+        тривалості запуску та перезапуску й так потрапляють у метрики (етапи browser_<подія>)
+        extraction - 'js': поля детальної сторінки в браузері збирає один execute_script (DETAIL_JS);
+        'html': розбір page_source через BeautifulSoup (також запасний варіант і режим для HTTP/кешу)
+        metrics - час етапів і лічильники сторінок, повторів, перезапусків та байтів; після parse_all
+        записуються в metrics_<сайт>.prom (Prometheus) і metrics_<сайт>.json (False - вимкнено)
+        worker - ім'я процесу серед кількох процесів сайту (воркери спільної черги): мітка worker
+        у метриках і власні файли metrics_<worker>.*, щоб процеси не перезаписували метрики один одного
+        images_dir - тека для паралельного завантаження картинок з IMAGE_COLUMNS у фоні
+        (файли images_dir/<сайт>/..., шляхи - у колонках '<колонка> file' поруч з URL; None - вимкнено)
+        verify_images - перед записом пакета URL картинок перевіряються паралельними Range запитами
+        (статус і розмір у пікселях кешуються у сховищі); недоступні замінюються варіантами з IMAGE_FALLBACKS
+        frontier - UrlFrontier: знайдені товари записуються у спільну чергу, а детальні сторінки
+        обробляються лише взяті в оренду, тож кілька процесів чи машин не дублюють роботу
+        (crawl_frontier - воркер лише для черги); None - лише локальний прогрес
+        retry_backoff - товар з помилкою не записується, а потрапляє в чергу помилок сховища і
+        повторюється наприкінці запуску через retry_backoff секунд (далі пауза подвоюється),
+        після 3 невдач стає остаточно невдалим; retry_wait - скільки секунд чекати найближчого
+        повтору наприкінці запуску (пізніші повтори - наступного запуску)
+        retry_policy - RetryPolicy для сторінок: таймаути та збої мережі повторюються після паузи
+        з джитером, браузер перезапускається лише при мертвій сесії, а запобіжник призупиняє
+        обхід сайту, що не відповідає (за замовчуванням 3 спроби і CircuitBreaker на хост)
+        cache - PageCache для знімків сторінок; cache_only - повторний розбір лише з кешу
+        (без браузера і мережі; варто вказати окремі output_file і progress_file)
+        """
+        self.output_file = output_file
+        self.workers = workers
+        self.rate_limit = rate_limit
+        self.http_concurrency = http_concurrency
+        self.page_load_strategy = page_load_strategy
+        self.ready_timeout = ready_timeout
+        self.progress_file = progress_file
+        self.session = None
+        self.processed_urls = set()
+        self.metrics = RunMetrics(self.SITE, enabled=metrics, worker=worker)
+        self.frontier = frontier
+        self.started_at = time.time()
+        self.progress = ProgressJournal(progress_file)
+        export_columns = with_image_paths(self.COLUMNS, self.IMAGE_COLUMNS) if images_dir else None
+        self.writer = BufferedExcelWriter(output_file, self.COLUMNS, self.SITE, store=store,
+                                          batch_size=batch_size, on_flush=self.on_rows_flushed,
+                                          before_flush=self.prepare_rows,
+                                          metrics=self.metrics, export_columns=export_columns,
+                                          identity_columns=self.IDENTITY_COLUMNS)
+        # save_progress під час обходу asyncio рушієм (див. fetch_pages)
+        self.flush_requested = False
+        self.images = ImageDownloader(self.writer.store, self.SITE, images_dir, self.IMAGE_COLUMNS,
+                                      metrics=self.metrics).start() if images_dir else None
+        self.image_probe = ImageProbe(self.writer.store, metrics=self.metrics).start() if verify_images else None
+        self.refresh = RefreshPolicy(self.writer.store, self.SITE, max_age) if refresh else None
+        self.dead_letters = DeadLetterQueue(self.writer.store, self.SITE, backoff=retry_backoff,
+                                            max_wait=retry_wait, metrics=self.metrics)
+        self.dead_urls = self.dead_letters.dead_urls()
+        self.retry = retry_policy or RetryPolicy(breaker=CircuitBreaker(metrics=self.metrics), metrics=self.metrics)
+        # Ліміт запитів/с до хоста для браузерних воркерів і HTTP режиму (як у asyncio рушія)
+        self.buckets = {}
+        self.buckets_lock = threading.Lock()
+        self.fetcher = PageFetcher(fetch_modes, cache=cache, cache_only=cache_only, metrics=self.metrics,
+                                   pace=self.pace)
+        self.resource_policy = resource_policy or ResourcePolicy(allow=self.RESOURCE_ALLOW)
+        self.page_stats = PageStats(weight=page_weight)
+        self.warm_standby = warm_standby
+        if extraction not in ('js', 'html'):
+            raise ValueError(f"Невідомий режим витягу даних '{extraction}'")
+        self.extraction = extraction
+        self.recycle_after = recycle_after
+        self.max_rss_mb = max_rss_mb
+        self.session_metrics = SessionMetrics(log_file=browser_log, run_metrics=self.metrics)
+        self.init_driver()
+        self.load_progress()
+
+    @property
+    def driver(self):
+        """Драйвер основної браузерної сесії"""
+        return self.session.driver
+
+    def init_driver(self):
+        """Ініціалізація основної браузерної сесії (браузер стартує при першому зверненні)"""
+        self.session = BrowserSession(self.create_driver, **self.session_options())
+
+    def session_options(self):
+        """Параметри браузерних сесій: резерв, плановий перезапуск і метрики"""
+        return {
+            'metrics': self.session_metrics,
+            'standby': self.warm_standby,
+            'recycle_after': self.recycle_after,
+            'max_rss_mb': self.max_rss_mb,
+        }
+
+    def create_driver(self):
+        """Запускає новий екземпляр браузера та повертає драйвер"""
+        options = webdriver.ChromeOptions()
+        # Закоментуйте наступний рядок, якщо хочете бачити браузер
+        options.add_argument('--headless')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--disable-blink-features=AutomationControlled')
+        options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+        options.add_argument('--disable-gpu')
+        options.add_argument('--window-size=1920,1080')
+        options.page_load_strategy = self.page_load_strategy
+        for argument in self.BROWSER_ARGS:
+            options.add_argument(argument)
+
+        try:
+            # Драйвер закріплений у маніфесті - без мережевих запитів на кожен запуск
+            service = Service(resolve_driver_path())
+            driver = webdriver.Chrome(service=service, options=options)
+            self.resource_policy.apply(driver)
+            print("✅ Браузер успішно запущено")
+            return driver
+        except Exception as e:
+            print(f"❌ Помилка запуску браузера: {e}")
+            raise
+
+    def load_progress(self):
+        """Завантажує прогрес зі знімка та журналу"""
+        self.processed_urls = self.progress.load()
+        if self.processed_urls:
+            print(f"📂 Завантажено прогрес: {len(self.processed_urls)} товарів вже оброблено")
+        else:
+            print("🆕 Початок нового парсингу")
+
+    def save_progress(self):
+        """Скидає буфер запису на диск (прогрес журналюється разом з рядками)"""
+        if not self.writer.auto_flush:
+            # Обхід asyncio рушієм: буфер скине fetch_pages після поточної сторінки
+            self.flush_requested = True
+            return
+        self.writer.flush()
+
+    def prepare_rows(self, rows):
+        """Перед записом пакета: перевірка URL картинок і передача їх на завантаження"""
+        if self.image_probe is not None:
+            self.image_probe.verify_rows(rows, self.IMAGE_COLUMNS, self.IMAGE_FALLBACKS)
+        if self.images is not None:
+            for row in rows:
+                self.images.submit(row.get(column) for column in self.IMAGE_COLUMNS)
+
+    def on_rows_flushed(self, urls):
+        """Позначає товари обробленими лише після запису їх рядків на диск"""
+        self.processed_urls.update(urls)
+        self.write_progress(urls)
+        self.dead_letters.resolve(urls)
+        if self.frontier is not None:
+            self.frontier.complete(self.SITE, urls)
+
+    def write_progress(self, urls):
+        """Дописує оброблені URL у журнал прогресу"""
+        try:
+            with self.metrics.timer('progress_save'):
+                self.progress.append(urls)
+        except OSError as e:
+            print(f"⚠️ Помилка збереження прогресу: {e}")
+
+    def is_pending(self, product):
+        """Чи потрібно завантажувати детальну сторінку товару (остаточно невдалі - ні)"""
+        if product['url'] in self.dead_urls:
+            return False
+        if self.refresh is not None:
+            return self.refresh.is_due(product)
+        return product['url'] not in self.processed_urls
+
+    def discover_pending(self, products, context=None):
+        """
+        Ще не оброблені товари; з frontier вони також записуються у спільну чергу
+        context - дані для обробки товару іншим воркером (напр. категорія)
+        """
+        pending = [p for p in products if p['url'] and self.is_pending(p)]
+        if self.frontier is not None:
+            self.frontier.add_many(self.SITE, [(p['url'], {'product': p, 'context': context}) for p in pending],
+                                   reopen_before=self.started_at if self.refresh is not None else None)
+        return pending
+
+    def run_pool(self, pool, products, task, on_result):
+        """
+        Обробляє товари пулом браузерів (див. DriverPool.run); з frontier - порціями,
+        взятими в оренду, щоб решту паралельно розбирали воркери спільної черги
+        """
+        if self.frontier is None:
+            pool.run(products, task, on_result)
+            return
+
+        remaining = {p['url']: p for p in products}
+        while remaining:
+            leased = self.frontier.lease(self.SITE, limit=self.workers * 4, urls=list(remaining))
+            if not leased:
+                break
+            pool.run([remaining.pop(url) for url, _ in leased], task, on_result)
+            # Рядки записуються на диск, а товари в черзі позначаються завершеними
+            self.save_progress()
+
+    async def fetch_pending(self, engine, products, on_detail):
+        """
+        Завантажує детальні сторінки товарів asyncio рушієм (див. AsyncCrawlEngine.fetch_each);
+        з frontier - порціями, взятими в оренду (як run_pool), щоб оренда не спливала, поки
+        товар чекає своєї черги, а решту паралельно розбирали воркери спільної черги
+        """
+        if self.frontier is None:
+            await self.fetch_pages(engine, products, lambda product: product['url'], on_detail)
+            return
+
+        remaining = {p['url']: p for p in products}
+        while remaining:
+            leased = self.frontier.lease(self.SITE, limit=self.http_concurrency * 4, urls=list(remaining))
+            if not leased:
+                break
+            # Після порції рядки вже на диску, а товари в черзі позначені завершеними
+            await self.fetch_pages(engine, [remaining.pop(url) for url, _ in leased], lambda product: product['url'],
+                                   on_detail)
+
+    async def fetch_pages(self, engine, items, url_of, on_page):
+        """
+        engine.fetch_each, але пакети рядків скидаються на диск в окремому потоці: перевірка
+        URL картинок і запис у сховище не зупиняють цикл подій, поки вантажаться інші сторінки
+        Записувач і далі використовує один потік за раз - наступна сторінка чекає скидання
+        """
+        async def on_fetched(item, html, error):
+            on_page(item, html, error)
+            if self.flush_requested or self.writer.flush_due():
+                self.flush_requested = False
+                await asyncio.to_thread(self.writer.flush)
+
+        self.writer.auto_flush = False
+        try:
+            await engine.fetch_each(items, url_of, on_fetched)
+        finally:
+            self.writer.auto_flush = True
+            self.flush_requested = False
+        await asyncio.to_thread(self.writer.flush)
+
+    def product_failed(self, product, error, context=None):
+        """
+        Помилка обробки товару: він записується в чергу помилок для відкладеного повтору,
+        а з frontier також повертається у спільну чергу
+        """
+        # Відсутній знімок у кеші - не помилка сайту
+        if not isinstance(error, CacheMiss):
+            self.dead_letters.record(product, context, error)
+        if self.frontier is not None:
+            self.frontier.fail(self.SITE, product['url'], error)
+
+    def failed_batches(self):
+        """
+        Порції товарів для проходу повторів черги помилок (зокрема невдач попередніх запусків):
+        чекає найближчого повтору (до retry_wait секунд) і повертає товари, час яких настав,
+        як список (товар, контекст); з frontier - лише взяті в оренду
+        """
+        # Скільки разів товар уже віддано на повтор: не більше max_attempts (товар,
+        # рядок якого не записався без помилки обробки, не повторюється нескінченно)
+        offered = {}
+        while True:
+            delay = self.dead_letters.next_delay()
+            if delay is None:
+                return
+            if delay > 0:
+                print(f"\n⏳ Повтор товарів з помилками через {delay:.0f} с...")
+                time.sleep(delay)
+
+            items = [item for item in self.dead_letters.due()
+                     if offered.get(item[0]['url'], 0) < self.dead_letters.max_attempts]
+            if self.frontier is not None and items:
+                leased = {url for url, _ in self.frontier.lease(self.SITE, limit=len(items),
+                                                                urls=[p['url'] for p, _ in items])}
+                items = [item for item in items if item[0]['url'] in leased]
+            if not items:
+                return
+            for product, _ in items:
+                offered[product['url']] = offered.get(product['url'], 0) + 1
+            print(f"\n🔁 Повтор товарів з черги помилок: {len(items)}")
+            yield items
+
+    def restart_driver(self, session=None):
+        """Перезапуск драйвера при помилках (лише вказаної сесії)"""
+        self.metrics.count('restarts')
+        (session or self.session).restart()
+
+    def browser_get(self, url, page_type, scroll_to=None, session=None):
+        """Завантажує сторінку в браузері, чекає її готовності, прокручує та повертає HTML"""
+        driver = self.browser_load(url, page_type, scroll_to=scroll_to, session=session)
+        return self.page_source(driver)
+
+    def page_source(self, driver):
+        """HTML поточної сторінки браузера (з обліком часу передачі та розміру)"""
+        with self.metrics.timer('page_source'):
+            html = driver.page_source
+        # Кодування всієї сторінки лише заради розміру - тільки коли метрики збираються
+        if self.metrics.enabled:
+            self.metrics.count('bytes', len(html.encode('utf-8')), source='page_source')
+        return html
+
+    def browser_load(self, url, page_type, scroll_to=None, session=None):
+        """
+        Завантажує сторінку в браузері, чекає її готовності, прокручує (scroll_to,
+        за замовчуванням SCROLL_TO) та повертає драйвер
+        """
+        session = session or self.session
+        driver = session.driver
+        self.pace(url)
+        started = time.monotonic()
+        driver.get(url)
+        self.wait_ready(driver, page_type)
+        elapsed = time.monotonic() - started
+        self.page_stats.record(page_type, elapsed, driver)
+        self.metrics.observe('navigation', elapsed)
+        self.metrics.count('pages', type=page_type, mode=BROWSER)
+        session.page_loaded()
+
+        scroll_to = scroll_to if scroll_to is not None else self.SCROLL_TO
+        if scroll_to is not None:
+            driver.execute_script(f"window.scrollTo(0, {scroll_to});")
+
+        return driver
+
+    def pace(self, url):
+        """Чекає токена ліміту rate_limit запитів/с до хоста сторінки (спільного для всіх воркерів)"""
+        host = host_key(url)
+        with self.buckets_lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate_limit)
+            bucket = self.buckets[host]
+        bucket.wait()
+
+    def wait_ready(self, driver, page_type):
+        """Чекає умову готовності для типу сторінки (не довше ready_timeout)"""
+        selector = self.READY_SELECTORS.get(page_type)
+        if selector and not wait_for(driver, element_ready(selector), self.ready_timeout):
+            print(f"⚠️ Сторінка не готова за {self.ready_timeout} с: {driver.current_url}")
+
+    def parse_product_detail(self, url, context=None, session=None):
+        """
+        Парсить детальну сторінку товару (context - як у discover_pending)
+        (повтори - за self.retry, після вичерпання спроб - виняток)
+        """
+        try:
+            return self.retry.call(
+                lambda: self.build_product_detail(self.fetch_detail_fields(url, session=session), context),
+                'detail', host=host_key(url), restart=lambda: self.restart_driver(session)
+            )
+        except CacheMiss:
+            # Без знімка сторінки товар не можна вважати обробленим
+            raise
+        except Exception as e:
+            print(f"❌ Не вдалось обробити {url}: {e}")
+            self.metrics.count('errors', stage='detail')
+            # Порожній рядок не записується: товар потрапить у чергу помилок
+            raise
+
+    def fetch_detail_fields(self, url, session=None):
+        """
+        Сирі поля детальної сторінки: у браузері - одним execute_script (без передачі page_source),
+        інакше (HTTP, кеш сторінок, режим 'html' або збій скрипта) - розбором HTML
+        """
+        if self.extraction == 'js' and self.fetcher.mode_for('detail') == BROWSER and self.fetcher.cache is None:
+            driver = self.browser_load(url, 'detail', scroll_to=self.DETAIL_SCROLL_TO, session=session)
+            try:
+                with self.metrics.timer('extract_js'):
+                    return driver.execute_script(self.DETAIL_JS)
+            except JavascriptException as e:
+                print(f"⚠️ Скрипт витягу не спрацював, розбір HTML: {e.msg}")
+                self.metrics.count('js_fallbacks')
+                return self.detail_fields_from_html(self.page_source(driver))
+
+        html = self.fetcher.fetch(
+            url, 'detail', lambda: self.browser_get(url, 'detail', scroll_to=self.DETAIL_SCROLL_TO, session=session)
+        )
+        return self.detail_fields_from_html(html)
+
+    def extract_product_detail(self, html, context=None):
+        """Дані товару з HTML детальної сторінки"""
+        return self.build_product_detail(self.detail_fields_from_html(html), context)
+
+    def detail_fields_from_html(self, html):
+        """Сирі поля детальної сторінки з HTML (аналог DETAIL_JS)"""
+        raise NotImplementedError
+
+    def build_product_detail(self, fields, context=None):
+        """Дані товару з сирих полів детальної сторінки"""
+        raise NotImplementedError
+
+    def save_product(self, product, details):
+        """Формує рядок товару та зберігає його у файл"""
+        raise NotImplementedError
+
+    def save_product_to_excel(self, product_data, url=None, card_hash=None):
+        """Додає один товар до буфера запису в Excel"""
+        try:
+            print(f"💾 Збереження: {product_data.get('Title', 'Без назви')}")
+            self.writer.add(product_data, key=url, card_hash=card_hash)
+        except Exception as e:
+            print(f"❌ Помилка збереження: {e}")
+            import traceback
+            traceback.print_exc()
+
+    def fetch_product(self, session, product, context=None):
+        """Завдання воркера: завантажує детальну сторінку товару"""
+        print(f"\n🔍 Обробка: {product['title']}")
+        # Паузу між запитами до сайту тримає pace: сторінки з кешу не чекають
+        return self.parse_product_detail(product['url'], context, session=session)
+
+    def parse_all(self, target):
+        """Основна функція парсингу: обхід сайту (crawl) пулом браузерів і повтори черги помилок"""
+        print(f"🚀 Початок парсингу {self.TITLE}\n")
+
+        # Основний браузер стає першим воркером пулу
+        pool = DriverPool(self.create_driver, self.workers, sessions=[self.session],
+                          **self.session_options())
+        try:
+            self.crawl(target, pool)
+            for items in self.failed_batches():
+                self.process_items(items, pool)
+        finally:
+            pool.close()
+
+        self.finish_run()
+        print("\n✅ Парсинг завершено!")
+        print(f"📊 Всього оброблено товарів: {len(self.processed_urls)}")
+        print(f"💾 Файл збережено: {self.output_file}")
+
+    def crawl(self, target, pool):
+        """Список товарів сайту і їх детальні сторінки пулом браузерів (див. run_pool)"""
+        raise NotImplementedError
+
+    def parse_all_async(self, target):
+        """Парсинг з asyncio рушієм (див. crawl_all_async) і повтори черги помилок"""
+        print(f"🚀 Початок парсингу {self.TITLE} (asyncio)\n")
+
+        self.crawl_all_async(target)
+        site_url = self.entry_url(target)
+        if site_url:
+            asyncio.run(self.retry_failed_async(self.create_engine(site_url)))
+
+        self.finish_run()
+        print("\n✅ Парсинг завершено!")
+        print(f"📊 Всього оброблено товарів: {len(self.processed_urls)}")
+        print(f"💾 Файл збережено: {self.output_file}")
+
+    def crawl_all_async(self, target):
+        """Парсинг без браузера: усі сторінки завантажує asyncio рушій з лімітами на сайт"""
+        asyncio.run(self.crawl_async(self.create_engine(target), target))
+
+    async def crawl_async(self, engine, target):
+        """Список товарів сайту -> детальні сторінки -> запис"""
+        raise NotImplementedError
+
+    def entry_url(self, target):
+        """URL сайту для asyncio рушія повторів (None - обходити нічого)"""
+        return target
+
+    async def retry_failed_async(self, engine):
+        """Прохід повторів черги помилок asyncio рушієм (див. failed_batches)"""
+        async with engine:
+            for items in self.failed_batches():
+                with tqdm(total=len(items), desc="Повтор") as progress:
+                    def on_detail(item, html, error):
+                        progress.update(1)
+                        try:
+                            if error:
+                                raise error
+                            self.save_product(item[0], self.extract_product_detail(html, item[1]))
+                        except Exception as e:
+                            print(f"\n❌ Помилка обробки товару: {e}")
+                            self.product_failed(item[0], e, item[1])
+
+                    # Записані товари прибираються з черги помилок
+                    await self.fetch_pages(engine, items, lambda item: item[0]['url'], on_detail)
+
+    def crawl_frontier(self, idle_timeout=0, poll_interval=5):
+        """
+        Воркер спільної черги: обробляє товари сайту, знайдені будь-яким процесом, без
+        завантаження каталогу; поки інші воркери тримають оренди, або idle_timeout секунд
+        у порожній черзі, чекає нових товарів
+        """
+        if self.frontier is None:
+            raise ValueError("Для обробки спільної черги потрібен frontier")
+        print(f"🚀 Обробка спільної черги {self.TITLE}\n")
+
+        pool = DriverPool(self.create_driver, self.workers, sessions=[self.session],
+                          **self.session_options())
+        try:
+            idle_since = time.monotonic()
+            while True:
+                leased = self.frontier.lease(self.SITE, limit=self.workers * 4)
+                if leased:
+                    self.process_items([(data['product'], data['context']) for _, data in leased], pool)
+                    idle_since = time.monotonic()
+                elif (self.frontier.counts(self.SITE).get(LEASED)
+                      or time.monotonic() - idle_since < idle_timeout):
+                    time.sleep(poll_interval)
+                else:
+                    break
+        finally:
+            pool.close()
+
+        self.finish_run()
+        print("\n✅ Чергу оброблено!")
+        print(f"📊 Всього оброблено товарів: {len(self.processed_urls)}")
+
+    def process_items(self, items, pool):
+        """Обробляє пари (товар, контекст) зі спільної черги або черги помилок пулом браузерів"""
+        with tqdm(total=len(items), desc="Черга") as progress:
+            def on_result(item, details, error):
+                progress.update(1)
+                try:
+                    if error:
+                        raise error
+                    self.save_product(item[0], details)
+                except Exception as e:
+                    print(f"\n❌ Помилка обробки товару: {e}")
+                    self.product_failed(item[0], e, item[1])
+
+            pool.run(items, lambda session, item: self.fetch_product(session, item[0], item[1]), on_result)
+
+        # Рядки записуються на диск, а товари в чергах позначаються завершеними
+        self.save_progress()
+
+    def finish_run(self):
+        """Фінальне збереження прогресу та Excel файлу, метрики і підсумки черг"""
+        self.save_progress()
+        self.finish_images()
+        self.writer.export()
+        self.metrics.export()
+        if self.refresh is not None:
+            self.refresh.report(self.writer)
+        if self.frontier is not None:
+            self.frontier.report(self.SITE)
+        self.dead_letters.report()
+
+    def finish_images(self):
+        """Чекає завершення завантаження картинок (їх шляхи потрапляють в експорт)"""
+        if self.images is not None and self.images.finish():
+            self.writer.dirty = True
+
+    def create_engine(self, site_url):
+        """Створює asyncio рушій з лімітами для домену сайту"""
+        return AsyncCrawlEngine(rate_limits={host_key(site_url): self.rate_limit},
+                                concurrency_per_host=self.http_concurrency,
+                                cache=self.fetcher.cache, cache_only=self.fetcher.cache_only,
+                                metrics=self.metrics, breaker=self.retry.breaker)
+
+    def close(self):
+        """Записує Excel файл і закриває браузер"""
+        self.page_stats.report()
+        if self.images is not None:
+            self.images.close()
+        self.writer.close()
+        if self.frontier is not None:
+            self.frontier.release(self.SITE)
+        if self.image_probe is not None:
+            self.image_probe.close()
+        self.progress.compact()
+        self.fetcher.close()
+        if self.session:
+            self.session.close()
+        self.session_metrics.report()
@@ -3,110 +3,203 @@
 Версія 3.0 - з записом у файл та продовженням з місця зупинки
 """
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
-from bs4 import BeautifulSoup
-import pandas as pd
-import time
+from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from bs4 import SoupStrainer
 from tqdm import tqdm
-import os
-import json
+from product_store import fingerprint
+from site_parser import SiteParser, cli_options
+from retry_policy import classify, describe, SESSION
+from crawl_engine import host_key
+from waits import count_increased, wait_for
+from html_parsing import make_soup, class_strainer, AnyOfStrainer
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+import aiohttp
+import asyncio
 
-class TopoviParser:
-    def __init__(self, output_file='topovi_products.xlsx'):
-        """Ініціалізація парсера"""
-        self.output_file = output_file
-        self.progress_file = 'progress.json'
-        self.driver = None
-        self.wait = None
-        self.processed_urls = set()
-        self.init_driver()
-        self.load_progress()
-        
-    def init_driver(self):
-        """Ініціалізація драйвера браузера"""
-        options = webdriver.ChromeOptions()
-        # Закоментуйте наступний рядок, якщо хочете бачити браузер
-        options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--window-size=1920,1080')
-        
-        try:
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=options)
-            self.wait = WebDriverWait(self.driver, 15)
-            print("✅ Браузер успішно запущено")
-        except Exception as e:
-            print(f"❌ Помилка запуску браузера: {e}")
-            raise
+class TopoviParser(SiteParser):
+    # Колонки Excel файлу та їх ширина
+    COLUMNS = [
+        ('Brand', 20), ('Category', 25), ('Title', 30), ('Code', 20),
+        ('Feature photo', 50), ('Type', 15), ('Gallery1', 50), ('Gallery2', 50),
+        ('Gallery3', 50), ('Gallery4', 50), ('Gallery5', 50),
+    ]
     
-    def load_progress(self):
-        """Завантажує прогрес з файлу"""
-        if os.path.exists(self.progress_file):
-            try:
-                with open(self.progress_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.processed_urls = set(data.get('processed_urls', []))
-                print(f"📂 Завантажено прогрес: {len(self.processed_urls)} товарів вже оброблено")
-            except Exception as e:
-                print(f"⚠️ Не вдалось завантажити прогрес: {e}")
-                self.processed_urls = set()
-        else:
-            print("🆕 Початок нового парсингу")
+    # Колонки з URL картинок товару (для images_dir і verify_images)
+    IMAGE_COLUMNS = ('Feature photo', 'Gallery1', 'Gallery2', 'Gallery3', 'Gallery4', 'Gallery5')
     
-    def save_progress(self):
-        """Зберігає прогрес у файл"""
-        try:
-            with open(self.progress_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'processed_urls': list(self.processed_urls)
-                }, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"⚠️ Помилка збереження прогресу: {e}")
+    # Колонки, за якими товар упізнається серед рядків старого Excel файлу без URL
+    IDENTITY_COLUMNS = ('Title', 'Code')
     
-    def restart_driver(self):
-        """Перезапуск драйвера при помилках"""
-        print("🔄 Перезапуск браузера...")
-        try:
-            if self.driver:
-                self.driver.quit()
-        except:
-            pass
-        
-        time.sleep(3)
-        self.init_driver()
+    # Запасні URL картинки (заміни в URL), якщо перевірений URL недоступний:
+    # збільшена версія 1280 вгадується з 320/540 і є не для всіх картинок
+    IMAGE_FALLBACKS = (('/1280/', '/540/'), ('/1280/', '/320/'))
+    
+    # Ресурси, потрібні сайту попри блокування (категорії або шаблони URL)
+    RESOURCE_ALLOW = ()
+    
+    # Ключ сайту у сховищі товарів
+    SITE = 'topovi'
+    
+    # Назва сайту в повідомленнях
+    TITLE = 'topovi.com.ua'
+    
+    # Умови готовності сторінок (CSS селектор, що має з'явитися)
+    READY_SELECTORS = {
+        'listing': '.stone_card',
+        'detail': '.gellery_for img',
+    }
+    
+    # Піддерева сторінок, які потрібні екстракторам (решта сторінки не розбирається)
+    STRAINERS = {
+        'listing': class_strainer('div', 'stone_card'),
+        'detail': AnyOfStrainer(SoupStrainer('h1'), class_strainer('div', 'gellery_for')),
+    }
+    
+    # Поля детальної сторінки одним викликом у браузері (ті самі, що й detail_fields_from_html)
+    DETAIL_JS = """
+        const h1 = document.querySelector('h1');
+        const gallery = document.querySelector('div.gellery_for');
+        const images = gallery ? Array.from(gallery.querySelectorAll('img[data-fancybox="gallery"]')).slice(0, 5) : [];
+        return {
+            code: h1 ? h1.textContent : '',
+            images: images.map(img => img.getAttribute('href') || img.getAttribute('src') || '')
+        };
+    """
+    
+    def __init__(self, output_file='topovi_products.xlsx', batch_size=10, listing_mode='click',
+                 page_param='page', early_stop_blocks=2, progress_file='progress.json', **options):
+        """
+        Ініціалізація парсера (решта параметрів - див. SiteParser.__init__)
+        fetch_modes - режим завантаження для типів сторінок ('detail'): 'browser' або 'http'.
+        listing_mode - 'click': список категорії завантажується браузером через кнопку 'Load more';
+        'pages': сторінки каталогу (?page_param=N) завантажуються напряму паралельними HTTP запитами
+        early_stop_blocks - кнопка 'Load more' більше не натискається після стількох блоків поспіль
+        лише з уже обробленими товарами; діє лише після повного обходу категорії, усі товари якого
+        вже оброблені (None - завжди завантажувати весь каталог)
+        """
+        if listing_mode not in ('click', 'pages'):
+            raise ValueError(f"Невідомий режим списку категорії '{listing_mode}'")
         
+        self.listing_mode = listing_mode
+        self.page_param = page_param
+        self.early_stop_blocks = early_stop_blocks
+        self.listing_complete = True
+        super().__init__(output_file, batch_size=batch_size, progress_file=progress_file, **options)
+    
+    def is_known(self, product):
+        """Чи товар з картки вже оброблений і не потребує оновлення"""
+        if product['url'] in self.dead_urls:
+            return True
+        if self.refresh is not None:
+            return self.refresh.is_current(product)
+        return product['url'] in self.processed_urls
+    
     def load_all_products(self, url):
-        """Завантажує всі товари, натискаючи кнопку 'Load more'"""
+        """Повертає HTML категорії з усіма товарами (з кешу або через кнопку 'Load more')"""
         print("🌐 Завантаження сторінки категорії...")
+        # Список, обірваний раннім завершенням, у кеш не потрапляє
+        return self.fetcher.fetch(url, 'listing', lambda: self.click_load_more(url),
+                                  cacheable=lambda: self.listing_complete)
+    
+    def list_products(self, url):
+        """Нові товари категорії згідно з режимом завантаження списку"""
+        if self.listing_mode == 'pages':
+            return self.load_products_paginated(url)
+        return self.parse_product_list(self.load_all_products(url))
+    
+    def page_url(self, url, page):
+        """URL сторінки каталогу з номером page"""
+        parts = urlparse(url)
+        query = dict(parse_qsl(parts.query))
+        query[self.page_param] = str(page)
+        return urlunparse(parts._replace(query=urlencode(query)))
+    
+    def load_products_paginated(self, url):
+        """Товари категорії через пряму пагінацію замість кнопки 'Load more'"""
+        print("🌐 Завантаження сторінок категорії...")
+        cards = asyncio.run(self.crawl_listing_pages(self.create_engine(url), url))
+        print(f"\n🔍 Знайдено товарів у категорії: {len(cards)}")
         
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                self.driver.get(url)
-                time.sleep(3)
-                break
-            except WebDriverException as e:
-                if attempt < max_retries - 1:
-                    print(f"⚠️ Помилка завантаження сторінки, спроба {attempt + 2}/{max_retries}...")
-                    self.restart_driver()
-                else:
-                    raise
+        products = self.filter_new_products(cards)
+        print(f"✨ Нових товарів для обробки: {len(products)}")
+        return products
+    
+    async def crawl_listing_pages(self, engine, url):
+        """
+        Завантажує сторінки каталогу хвилями по http_concurrency запитів
+        і розбирає кожну окремо, доки не трапиться сторінка без нових карток
+        """
+        cards = []
+        seen = set()
+        first_page = 1
+        
+        async with engine:
+            while True:
+                numbers = list(range(first_page, first_page + self.http_concurrency))
+                pages = {}
+                
+                def on_page(number, html, error):
+                    pages[number] = (html, error)
+                
+                await engine.fetch_each(numbers, lambda number: self.page_url(url, number), on_page)
+                
+                for number in numbers:
+                    html, error = pages[number]
+                    # 404 за останньою сторінкою - кінець каталогу
+                    if isinstance(error, aiohttp.ClientResponseError) and error.status == 404:
+                        return cards
+                    if error:
+                        raise error
+                    
+                    # Порожня сторінка або повтор останньої - кінець каталогу
+                    new_cards = [card for card in self.extract_product_cards(html)
+                                 if card['url'] and card['url'] not in seen]
+                    if not new_cards:
+                        return cards
+                    
+                    seen.update(card['url'] for card in new_cards)
+                    cards.extend(new_cards)
+                    print(f"📥 Сторінка {number}: {len(new_cards)} товарів")
+                
+                first_page += len(numbers)
+    
+    def click_load_more(self, url):
+        """Завантажує всі товари в браузері, натискаючи кнопку 'Load more'"""
+        # Таймаут навігації - повтор після паузи, перезапуск браузера - лише при мертвій сесії
+        self.retry.call(lambda: self.browser_load(url, 'listing'), 'listing', host=host_key(url),
+                        restart=self.restart_driver)
         
         # Натискаємо кнопку "Load more" доки вона є
         click_count = 0
         consecutive_errors = 0
         
-        while consecutive_errors < 3:
+        # Раннє завершення: кілька блоків поспіль лише з уже обробленими товарами
+        self.listing_complete = True
+        cards_seen = 0
+        known_blocks = 0
+        catalog_size = self.writer.store.catalog_size(self.SITE, url)
+        early_stop = self.can_stop_early(url, catalog_size)
+        
+        def reached_known_tail():
+            nonlocal cards_seen, known_blocks
+            if not early_stop:
+                return False
+            known, total = self.check_new_cards(cards_seen)
+            # Після невдалого натискання нових карток немає - блок не рахується
+            if total == cards_seen:
+                return False
+            cards_seen = total
+            known_blocks = known_blocks + 1 if known else 0
+            if known_blocks < self.early_stop_blocks:
+                return False
+            
+            skipped = f", пропущено ~{catalog_size - cards_seen}" if catalog_size else ''
+            print(f"⏩ {known_blocks} блоки поспіль без нових товарів - зупинка ({cards_seen} карток{skipped})")
+            self.listing_complete = False
+            return True
+        
+        while consecutive_errors < 3 and not reached_known_tail():
             try:
                 # Шукаємо кнопку load-more
                 load_more_btn = self.driver.find_element(By.CSS_SELECTOR, '.btn.load-more')
@@ -115,13 +208,18 @@ class TopoviParser:
                 if load_more_btn.is_displayed():
                     # Скролимо до кнопки
                     self.driver.execute_script("arguments[0].scrollIntoView(true);", load_more_btn)
-                    time.sleep(0.5)
+                    cards_before = len(self.driver.find_elements(By.CSS_SELECTOR, '.stone_card'))
+                    
+                    # Клікаємо і чекаємо, поки додадуться нові картки
+                    with self.metrics.timer('load_more'):
+                        load_more_btn.click()
+                        loaded = wait_for(self.driver, count_increased('.stone_card', cards_before),
+                                          self.ready_timeout)
+                    if not loaded:
+                        raise TimeoutException(f"нові картки не з'явились за {self.ready_timeout} с")
                     
-                    # Клікаємо
-                    load_more_btn.click()
                     click_count += 1
                     print(f"📥 Завантажено блок #{click_count}...")
-                    time.sleep(2)
                     consecutive_errors = 0  # Скидаємо лічильник помилок
                 else:
                     break
@@ -131,29 +229,94 @@ class TopoviParser:
                 break
             except Exception as e:
                 consecutive_errors += 1
-                print(f"⚠️ Помилка при натисканні ({consecutive_errors}/3): {e}")
-                time.sleep(2)
+                kind = classify(e)
+                print(f"⚠️ Помилка при натисканні ({consecutive_errors}/3): {describe(e)}")
+                if kind == SESSION:
+                    # Мертвий браузер не натисне кнопку - список лишається неповним
+                    consecutive_errors = 3
+                    break
+                self.metrics.count('retries', stage='load_more', error=kind)
+                self.metrics.sleep(self.retry.backoff(consecutive_errors))
         
-        # Отримуємо HTML після завантаження всіх товарів
-        return self.driver.page_source
+        if consecutive_errors >= 3:
+            self.listing_complete = False
+        
+        # Розмір каталогу запам'ятовуємо лише після повного обходу
+        if self.listing_complete:
+            size, urls = self.driver.execute_script(
+                "const cards = document.querySelectorAll('.stone_card');"
+                "return [cards.length, Array.from(cards, c => c.querySelector('a.info'))"
+                ".filter(link => link).map(link => link.getAttribute('href'))];"
+            )
+            self.writer.store.record_catalog(self.SITE, url, size, urls)
+            if catalog_size is not None and size != catalog_size:
+                print(f"📏 Розмір каталогу змінився: {catalog_size} → {size}")
+        
+        # Отримуємо HTML після завантаження товарів
+        return self.page_source(self.driver)
+    
+    def can_stop_early(self, url, catalog_size):
+        """
+        Чи можна обірвати список категорії на вже відомих товарах: лише після повного обходу,
+        усі товари якого вже оброблені (інакше, напр. після перерваного запуску, необроблені
+        товари з кінця списку ніколи не потрапили б в обробку)
+        """
+        if not self.early_stop_blocks:
+            return False
+        if catalog_size is None:
+            print("ℹ️ Повного обходу категорії ще не було - список завантажується повністю")
+            return False
+        
+        known = self.processed_urls | self.dead_urls
+        if self.refresh is not None:
+            known = known | self.refresh.known.keys()
+        known_count = sum(1 for product_url in self.writer.store.catalog_urls(self.SITE, url)
+                          if product_url in known)
+        if catalog_size > known_count:
+            print(f"ℹ️ Відомо {known_count} з {catalog_size} товарів категорії - список завантажується повністю")
+            return False
+        return True
+    
+    def check_new_cards(self, start):
+        """
+        Розбирає картки, додані після перших start, і повертає
+        (чи всі вони вже оброблені, загальна кількість карток)
+        """
+        total, html = self.driver.execute_script(
+            "const cards = document.querySelectorAll('.stone_card');"
+            "return [cards.length, Array.from(cards).slice(arguments[0]).map(c => c.outerHTML).join('')];",
+            start
+        )
+        cards = self.extract_product_cards(html)
+        return bool(cards) and all(self.is_known(card) for card in cards), total
     
     def parse_product_list(self, html):
         """Парсить список товарів з категорії"""
-        soup = BeautifulSoup(html, 'html.parser')
-        cards = soup.find_all('div', class_='stone_card')
-        
+        cards = self.extract_product_cards(html)
         print(f"\n🔍 Знайдено товарів на сторінці: {len(cards)}")
         
+        products = self.filter_new_products(cards)
+        print(f"✨ Нових товарів для обробки: {len(products)}")
+        
+        return products
+    
+    def filter_new_products(self, cards):
+        """Пропускає вже оброблені товари (у режимі оновлення рішення приймає RefreshPolicy)"""
+        if self.refresh is not None:
+            return cards
+        return [card for card in cards if card['url'] not in self.processed_urls]
+    
+    def extract_product_cards(self, html):
+        """Дані всіх карток товарів зі сторінки списку"""
+        with self.metrics.timer('parse'):
+            soup = make_soup(html, self.STRAINERS['listing'])
+        
         products = []
-        for card in cards:
+        for card in soup.find_all('div', class_='stone_card'):
             try:
                 link = card.find('a', class_='info')
                 product_url = link['href'] if link else None
                 
-                # Пропускаємо вже оброблені товари
-                if product_url in self.processed_urls:
-                    continue
-                
                 # Назва товару
                 title = card.find('p', class_='stone_name')
                 title_text = title.get('title', '') if title else ''
@@ -182,222 +345,163 @@ class TopoviParser:
                 print(f"⚠️ Помилка обробки картки: {e}")
                 continue
         
-        new_products = len(products)
-        print(f"✨ Нових товарів для обробки: {new_products}")
-        
         return products
     
-    def parse_product_detail(self, url, category_name):
-        """Парсить детальну сторінку товару"""
-        max_retries = 3
+    def detail_fields_from_html(self, html):
+        """Сирі поля детальної сторінки з HTML (аналог DETAIL_JS)"""
+        with self.metrics.timer('parse'):
+            soup = make_soup(html, self.STRAINERS['detail'])
         
-        for attempt in range(max_retries):
-            try:
-                self.driver.get(url)
-                time.sleep(2)
-                
-                html = self.driver.page_source
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                # Код товару з h1
-                h1 = soup.find('h1')
-                code = h1.text.strip() if h1 else ''
-                
-                # Використовуємо передану категорію
-                category = category_name
-                
-                # Галерея зображень
-                gallery_images = []
-                gallery = soup.find('div', class_='gellery_for')
-                
-                if gallery:
-                    # Шукаємо всі зображення в слайдері
-                    images = gallery.find_all('img', {'data-fancybox': 'gallery'})
-                    
-                    for img in images[:5]:  # Максимум 5 зображень
-                        img_url = img.get('href') or img.get('src', '')
-                        # Беремо великі зображення (1280)
-                        if img_url and '1280' in img_url:
-                            gallery_images.append(img_url)
-                        elif img_url:
-                            # Якщо немає 1280, намагаємось замінити розмір
-                            img_url = img_url.replace('/320/', '/1280/').replace('/540/', '/1280/')
-                            gallery_images.append(img_url)
-                
-                # Доповнюємо до 5 елементів порожніми значеннями
-                while len(gallery_images) < 5:
-                    gallery_images.append('')
-                
-                return {
-                    'code': code,
-                    'category': category,
-                    'gallery': gallery_images[:5]
-                }
-                
-            except WebDriverException as e:
-                if attempt < max_retries - 1:
-                    print(f"⚠️ Помилка з'єднання, спроба {attempt + 2}/{max_retries}...")
-                    self.restart_driver()
-                    time.sleep(2)
-                else:
-                    print(f"❌ Не вдалось обробити {url}: {e}")
-                    return {
-                        'code': '',
-                        'category': '',
-                        'gallery': ['', '', '', '', '']
-                    }
-            except Exception as e:
-                print(f"⚠️ Помилка обробки {url}: {e}")
-                return {
-                    'code': '',
-                    'category': '',
-                    'gallery': ['', '', '', '', '']
-                }
-    
-    def save_product_to_excel(self, product_data):
-        """Додає один товар до Excel файлу"""
-        try:
-            print(f"💾 Збереження товару: {product_data.get('Title', 'Без назви')}")
-            
-            # Якщо файл існує, дописуємо до нього
-            if os.path.exists(self.output_file):
-                print(f"   📂 Файл існує, дописуємо...")
-                # Використовуємо openpyxl для швидкого дописування
-                from openpyxl import load_workbook
-                
-                wb = load_workbook(self.output_file)
-                ws = wb['Products']
-                
-                # Додаємо новий рядок
-                ws.append([
-                    product_data['Brand'],
-                    product_data['Category'],
-                    product_data['Title'],
-                    product_data['Code'],
-                    product_data['Feature photo'],
-                    product_data['Type'],
-                    product_data['Gallery1'],
-                    product_data['Gallery2'],
-                    product_data['Gallery3'],
-                    product_data['Gallery4'],
-                    product_data['Gallery5']
-                ])
-                
-                wb.save(self.output_file)
-                wb.close()
-                print(f"   ✅ Збережено!")
-            else:
-                print(f"   🆕 Створюємо новий файл...")
-                # Створюємо новий файл з заголовками
-                df = pd.DataFrame([product_data])
-                with pd.ExcelWriter(self.output_file, engine='openpyxl') as writer:
-                    df.to_excel(writer, index=False, sheet_name='Products')
-                    
-                    # Налаштовуємо ширину колонок
-                    worksheet = writer.sheets['Products']
-                    column_widths = {
-                        'A': 20, 'B': 25, 'C': 30, 'D': 20, 'E': 50,
-                        'F': 15, 'G': 50, 'H': 50, 'I': 50, 'J': 50, 'K': 50
-                    }
-                    for col, width in column_widths.items():
-                        worksheet.column_dimensions[col].width = width
-                print(f"   ✅ Файл створено: {self.output_file}")
-                        
-        except Exception as e:
-            print(f"❌ Помилка збереження в Excel: {e}")
-            import traceback
-            traceback.print_exc()
+        # Код товару з h1
+        h1 = soup.find('h1')
+        
+        # Зображення слайдера галереї (максимум 5)
+        images = []
+        gallery = soup.find('div', class_='gellery_for')
+        if gallery:
+            for img in gallery.find_all('img', {'data-fancybox': 'gallery'})[:5]:
+                images.append(img.get('href') or img.get('src', ''))
+        
+        return {
+            'code': h1.text if h1 else '',
+            'images': images,
+        }
     
-    def parse_all(self, categories):
-        """Основна функція парсингу"""
-        print("🚀 Початок парсингу topovi.com.ua\n")
+    def build_product_detail(self, fields, category_name=None):
+        """Код, категорія та галерея товару з сирих полів детальної сторінки"""
+        code = fields['code'].strip()
+        
+        # Використовуємо передану категорію
+        category = category_name
+        
+        # Галерея зображень
+        gallery_images = []
+        for img_url in fields['images']:
+            # Беремо великі зображення (1280)
+            if img_url and '1280' in img_url:
+                gallery_images.append(img_url)
+            elif img_url:
+                # Якщо немає 1280, намагаємось замінити розмір
+                img_url = img_url.replace('/320/', '/1280/').replace('/540/', '/1280/')
+                gallery_images.append(img_url)
         
-        # Обробляємо кожну категорію
+        # Доповнюємо до 5 елементів порожніми значеннями
+        while len(gallery_images) < 5:
+            gallery_images.append('')
+        
+        return {
+            'code': code,
+            'category': category,
+            'gallery': gallery_images[:5]
+        }
+    
+    def crawl(self, categories, pool):
+        """Обробляє кожну категорію: список товарів і детальні сторінки пулом браузерів"""
         for category_name, category_url in categories.items():
             print(f"\n{'='*60}")
             print(f"📂 Обробка категорії: {category_name}")
             print(f"🔗 URL: {category_url}")
             print(f"{'='*60}\n")
             
-            # Завантажуємо всі товари з категорії
-            html = self.load_all_products(category_url)
-            
-            # Парсимо список товарів
-            products = self.parse_product_list(html)
+            # Завантажуємо та парсимо список товарів категорії
+            products = self.list_products(category_url)
             
             if not products:
                 print(f"✅ Немає нових товарів у категорії '{category_name}'")
                 continue
             
-            # Обробляємо кожен товар
-            print(f"\n📦 Обробка детальних сторінок товарів з категорії '{category_name}'...")
+            # Обробляємо товари пулом браузерів, запис - лише в цьому потоці
+            pending = self.discover_pending(products, category_name)
+            print(f"\n📦 Обробка детальних сторінок товарів з категорії '{category_name}' "
+                  f"({self.workers} воркерів)...")
             
-            for product in tqdm(products, desc=f"{category_name}"):
-                if product['url'] and product['url'] not in self.processed_urls:
+            with tqdm(total=len(pending), desc=f"{category_name}") as progress:
+                def on_result(product, details, error):
+                    progress.update(1)
                     try:
-                        print(f"\n🔍 Обробка: {product['title']}")
-                        details = self.parse_product_detail(product['url'], category_name)
-                        
-                        # Формуємо дані товару
-                        product_data = {
-                            'Brand': product['brand'],
-                            'Category': details['category'],
-                            'Title': product['title'],
-                            'Code': details['code'],
-                            'Feature photo': product['feature_photo'],
-                            'Type': product['type'],
-                            'Gallery1': details['gallery'][0],
-                            'Gallery2': details['gallery'][1],
-                            'Gallery3': details['gallery'][2],
-                            'Gallery4': details['gallery'][3],
-                            'Gallery5': details['gallery'][4],
-                        }
-                        
-                        print(f"   📋 Дані зібрано: Brand={product_data['Brand']}, Code={product_data['Code']}")
-                        
-                        # Зберігаємо товар у файл
-                        self.save_product_to_excel(product_data)
-                        
-                        # Додаємо URL до оброблених
-                        self.processed_urls.add(product['url'])
-                        
-                        # Зберігаємо прогрес кожні 10 товарів
-                        if len(self.processed_urls) % 10 == 0:
-                            self.save_progress()
-                        
-                        # Невелика затримка між запитами
-                        time.sleep(0.5)
-                        
+                        if error:
+                            raise error
+                        self.save_product(product, details)
                     except Exception as e:
                         print(f"\n❌ Критична помилка при обробці товару: {e}")
                         self.save_progress()
-                        continue
+                        self.product_failed(product, e, category_name)
+                
+                self.run_pool(pool, pending,
+                              lambda session, product: self.fetch_product(session, product, category_name),
+                              on_result)
+    
+    def save_product(self, product, details):
+        """Формує рядок товару та зберігає його у файл"""
+        product_data = {
+            'Brand': product['brand'],
+            'Category': details['category'],
+            'Title': product['title'],
+            'Code': details['code'],
+            'Feature photo': product['feature_photo'],
+            'Type': product['type'],
+            'Gallery1': details['gallery'][0],
+            'Gallery2': details['gallery'][1],
+            'Gallery3': details['gallery'][2],
+            'Gallery4': details['gallery'][3],
+            'Gallery5': details['gallery'][4],
+        }
         
-        # Фінальне збереження прогресу
-        self.save_progress()
+        print(f"   📋 Дані зібрано: Brand={product_data['Brand']}, Code={product_data['Code']}")
         
-        print(f"\n✅ Парсинг завершено!")
-        print(f"📊 Всього оброблено товарів: {len(self.processed_urls)}")
-        print(f"💾 Файл збережено: {self.output_file}")
+        # URL стане обробленим після скидання пакета на диск
+        self.save_product_to_excel(product_data, url=product['url'], card_hash=fingerprint(product))
     
-    def close(self):
-        """Закриває браузер"""
-        if self.driver:
-            self.driver.quit()
+    def crawl_all_async(self, categories):
+        """
+        Парсинг з asyncio рушієм: список категорії завантажується браузером,
+        детальні сторінки - без браузера з лімітами на сайт
+        """
+        for category_name, category_url in categories.items():
+            print(f"\n{'='*60}")
+            print(f"📂 Обробка категорії: {category_name}")
+            print(f"🔗 URL: {category_url}")
+            print(f"{'='*60}\n")
+            
+            products = self.list_products(category_url)
+            asyncio.run(self.crawl_details_async(self.create_engine(category_url), products, category_name))
+    
+    def entry_url(self, categories):
+        """URL сайту для asyncio рушія повторів - перша категорія"""
+        return next(iter(categories.values()), None)
+    
+    async def crawl_details_async(self, engine, products, category_name):
+        """Детальні сторінки товарів категорії -> запис"""
+        async with engine:
+            pending = self.discover_pending(products, category_name)
+            print(f"\n📦 Обробка детальних сторінок товарів з категорії '{category_name}'...")
+            
+            with tqdm(total=len(pending), desc=category_name) as progress:
+                def on_detail(product, html, error):
+                    progress.update(1)
+                    try:
+                        if error:
+                            raise error
+                        self.save_product(product, self.extract_product_detail(html, category_name))
+                    except Exception as e:
+                        print(f"\n❌ Критична помилка при обробці товару: {e}")
+                        self.save_progress()
+                        self.product_failed(product, e, category_name)
+                
+                await self.fetch_pending(engine, pending, on_detail)
     
     def reset_progress(self):
         """Скидає прогрес (для повторного парсингу)"""
-        if os.path.exists(self.progress_file):
-            os.remove(self.progress_file)
-        if os.path.exists(self.output_file):
-            os.remove(self.output_file)
+        self.progress.reset()
+        self.writer.reset()
         self.processed_urls = set()
+        self.dead_urls = set()
         print("🔄 Прогрес скинуто")
 
 
 def main():
     """Головна функція"""
-    parser = TopoviParser(output_file='topovi_products.xlsx')
+    parser = TopoviParser(output_file='topovi_products.xlsx', **cli_options("Парсер topovi.com.ua"))
     
     try:
         # Категорії для парсингу
@@ -420,4 +524,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,229 @@
+"""
+Спільна черга URL товарів (frontier) у SQLite
+Знайдені товари всіх сайтів зберігаються з даними картки та станом:
+discovered - чекає обробки, leased - взятий в оренду воркером до lease_expires,
+done - рядок товару записано, failed - вичерпано спроби
+Кілька процесів (або машин зі спільним файлом бази) беруть URL в оренду
+транзакцією BEGIN IMMEDIATE, тож один товар не обробляється двічі; оренда
+процесу, що впав, після закінчення терміну автоматично повертається в чергу
+Запуск: python url_frontier.py frontier.sqlite [--retry-failed topovi]
+"""
+
+import argparse
+import threading
+import sqlite3
+import socket
+import uuid
+import time
+import json
+import os
+
+DISCOVERED = 'discovered'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+# Ліміт параметрів SQLite в одному запиті з запасом
+CHUNK = 500
+
+
+class UrlFrontier:
+    def __init__(self, path='frontier.sqlite', owner=None, lease_seconds=600, max_attempts=3):
+        """
+        path - файл бази, спільний для всіх процесів
+        owner - ім'я воркера в орендах (за замовчуванням хост:pid:випадковий суфікс)
+        lease_seconds - термін оренди; товар, не завершений за цей час, знову стає доступним
+        max_attempts - після стількох оренд без успіху товар позначається failed
+        """
+        self.path = path
+        self.owner = owner or f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}'
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+
+        # Транзакції відкриваються вручну (BEGIN IMMEDIATE для оренди)
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS frontier (
+                site TEXT NOT NULL,
+                url TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_expires REAL,
+                error TEXT,
+                discovered_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (site, url)
+            )
+        """)
+        self.conn.execute('CREATE INDEX IF NOT EXISTS frontier_state ON frontier (site, state)')
+
+    def transaction(self, statements):
+        """Виконує statements(conn) в одній транзакції з блокуванням запису"""
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                result = statements(self.conn)
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+            self.conn.execute('COMMIT')
+            return result
+
+    def add_many(self, site, items, reopen_before=None):
+        """
+        Додає знайдені товари: items - список (URL, дані для обробки), повертає кількість нових
+        Вже відомі URL не змінюються; reopen_before - час, раніше якого завершені (done)
+        товари знову стають discovered (повторне оновлення в режимі refresh)
+        """
+        now = time.time()
+
+        def statements(conn):
+            added = 0
+            for url, payload in items:
+                cursor = conn.execute(
+                    'INSERT INTO frontier (site, url, payload, state, discovered_at, updated_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (site, url) DO NOTHING',
+                    (site, url, json.dumps(payload, ensure_ascii=False), DISCOVERED, now, now)
+                )
+                added += cursor.rowcount
+                if not cursor.rowcount and reopen_before is not None:
+                    conn.execute(
+                        'UPDATE frontier SET state = ?, payload = ?, attempts = 0, error = NULL, updated_at = ? '
+                        'WHERE site = ? AND url = ? AND state = ? AND updated_at < ?',
+                        (DISCOVERED, json.dumps(payload, ensure_ascii=False), now, site, url, DONE, reopen_before)
+                    )
+            return added
+
+        return self.transaction(statements)
+
+    def lease(self, site, limit=1, urls=None):
+        """
+        Бере в оренду до limit доступних товарів сайту (нових або з простроченою орендою),
+        лише серед urls, якщо вказано; повертає список (URL, дані для обробки)
+        """
+        now = time.time()
+        available = (f"site = ? AND (state = '{DISCOVERED}' OR (state = '{LEASED}' AND lease_expires < ?))")
+
+        def statements(conn):
+            rows = []
+            if urls is None:
+                rows = conn.execute(
+                    f'SELECT url, payload, state FROM frontier WHERE {available} ORDER BY rowid LIMIT ?',
+                    (site, now, limit)
+                ).fetchall()
+            else:
+                urls_list = list(urls)
+                for start in range(0, len(urls_list), CHUNK):
+                    chunk = urls_list[start:start + CHUNK]
+                    rows += conn.execute(
+                        f'SELECT url, payload, state FROM frontier WHERE {available} '
+                        f'AND url IN ({",".join("?" * len(chunk))}) LIMIT ?',
+                        [site, now] + chunk + [limit - len(rows)]
+                    ).fetchall()
+                    if len(rows) >= limit:
+                        break
+
+            conn.executemany(
+                'UPDATE frontier SET state = ?, lease_owner = ?, lease_expires = ?, attempts = attempts + 1, '
+                'updated_at = ? WHERE site = ? AND url = ?',
+                [(LEASED, self.owner, now + self.lease_seconds, now, site, url) for url, _, _ in rows]
+            )
+            return rows
+
+        rows = self.transaction(statements)
+        reclaimed = sum(1 for _, _, state in rows if state == LEASED)
+        if reclaimed:
+            print(f"♻️ Повернуто в роботу {reclaimed} товарів з простроченою орендою ({site})")
+        return [(url, json.loads(payload)) for url, payload, _ in rows]
+
+    def complete(self, site, urls):
+        """Позначає товари завершеними (після запису їх рядків у сховище)"""
+        now = time.time()
+        urls = list(urls)
+        self.transaction(lambda conn: conn.executemany(
+            'UPDATE frontier SET state = ?, lease_owner = NULL, lease_expires = NULL, error = NULL, '
+            'updated_at = ? WHERE site = ? AND url = ?',
+            [(DONE, now, site, url) for url in urls]
+        ))
+
+    def fail(self, site, url, error):
+        """Помилка обробки: товар повертається в чергу або стає failed після max_attempts спроб"""
+        now = time.time()
+        self.transaction(lambda conn: conn.execute(
+            'UPDATE frontier SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, '
+            'lease_owner = NULL, lease_expires = NULL, error = ?, updated_at = ? '
+            'WHERE site = ? AND url = ? AND state = ? AND lease_owner = ?',
+            (self.max_attempts, FAILED, DISCOVERED, str(error)[:500], now, site, url, LEASED, self.owner)
+        ))
+
+    def release(self, site):
+        """Повертає в чергу всі незавершені оренди цього воркера (при зупинці)"""
+        now = time.time()
+        cursor = self.transaction(lambda conn: conn.execute(
+            'UPDATE frontier SET state = ?, lease_owner = NULL, lease_expires = NULL, '
+            'attempts = MAX(attempts - 1, 0), updated_at = ? WHERE site = ? AND state = ? AND lease_owner = ?',
+            (DISCOVERED, now, site, LEASED, self.owner)
+        ))
+        return cursor.rowcount
+
+    def retry_failed(self, site):
+        """Повертає товари зі станом failed у чергу з новим лічильником спроб"""
+        now = time.time()
+        cursor = self.transaction(lambda conn: conn.execute(
+            'UPDATE frontier SET state = ?, attempts = 0, updated_at = ? WHERE site = ? AND state = ?',
+            (DISCOVERED, now, site, FAILED)
+        ))
+        return cursor.rowcount
+
+    def counts(self, site):
+        """Кількість товарів сайту за станами (прострочені оренди - окремо як 'expired')"""
+        now = time.time()
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT CASE WHEN state = ? AND lease_expires < ? THEN 'expired' ELSE state END, COUNT(*) "
+                'FROM frontier WHERE site = ? GROUP BY 1',
+                (LEASED, now, site)
+            ).fetchall()
+        return dict(rows)
+
+    def sites(self):
+        """Сайти, для яких у черзі є товари"""
+        with self.lock:
+            return [row[0] for row in self.conn.execute('SELECT DISTINCT site FROM frontier ORDER BY site')]
+
+    def report(self, site):
+        """Друкує стан черги сайту"""
+        counts = self.counts(site)
+        print(f"🧭 Черга {site}: " + ', '.join(f"{state} {counts.get(state, 0)}"
+                                              for state in (DISCOVERED, LEASED, 'expired', DONE, FAILED)))
+
+    def close(self):
+        """Закриває базу"""
+        with self.lock:
+            self.conn.close()
+
+
+def main():
+    """Стан черги та повернення товарів зі станом failed"""
+    parser = argparse.ArgumentParser(description="Стан спільної черги URL товарів")
+    parser.add_argument('path', nargs='?', default='frontier.sqlite')
+    parser.add_argument('--retry-failed', nargs='+', metavar='SITE', help="повернути failed товари сайтів у чергу")
+    args = parser.parse_args()
+
+    frontier = UrlFrontier(args.path)
+    try:
+        for site in args.retry_failed or []:
+            print(f"🔁 {site}: повернуто в чергу {frontier.retry_failed(site)} товарів")
+        for site in frontier.sites():
+            frontier.report(site)
+    finally:
+        frontier.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Очікування готовності сторінки замість фіксованих пауз
+Навігація продовжується щойно умова виконана, з жорстким таймаутом
+"""
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+import time
+
+
+def element_ready(selector, grace=1.0):
+    """
+    Умова: на сторінці є елемент за CSS селектором.
+    Якщо документ уже повністю завантажено, а елемента немає довше grace секунд,
+    вважаємо, що його на цій сторінці просто немає
+    """
+    state = {'complete_at': None}
+
+    def condition(driver):
+        if driver.find_elements(By.CSS_SELECTOR, selector):
+            return True
+        if driver.execute_script("return document.readyState") == 'complete':
+            now = time.monotonic()
+            if state['complete_at'] is None:
+                state['complete_at'] = now
+            elif now - state['complete_at'] >= grace:
+                return 'missing'
+        return False
+
+    return condition
+
+
+def count_increased(selector, previous):
+    """Умова: кількість елементів за селектором стала більшою за previous"""
+    def condition(driver):
+        return len(driver.find_elements(By.CSS_SELECTOR, selector)) > previous
+
+    return condition
+
+
+def wait_for(driver, condition, timeout=10, poll=0.1):
+    """Чекає виконання умови; повертає її результат або None після таймауту"""
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=poll).until(condition)
+    except TimeoutException:
+        return None